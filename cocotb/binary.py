@@ -32,9 +32,23 @@ from cocotb.utils import get_python_integer_types
 
 import os
 import random
+import re
+import binascii
+
+# NumPy is only needed for BinaryArray
+try:
+    import numpy as np
+    _have_numpy = True
+except ImportError:
+    _have_numpy = False
 
 resolve_x_to = os.getenv('COCOTB_RESOLVE_X', "VALUE_ERROR")
 
+if str is bytes:
+    from string import maketrans as _maketrans
+else:
+    _maketrans = str.maketrans
+
 def resolve(string):
     for char in BinaryValue._resolve_to_0:
         string = string.replace(char, "0")
@@ -63,6 +77,36 @@ def _clog2(val):
         exp += 1
 
 
+# Translations of a binary string into the resolved value bits, the bits
+# which can't be resolved and the inverted value
+_to_value   = _maketrans("01lLhH-xXzZuUwW", "010011000000000")  # noqa
+_to_unknown = _maketrans("01lLhH-xXzZuUwW", "000000011111111")  # noqa
+_to_invert  = _maketrans("01", "10")  # noqa
+
+# Simulator style encoding of each character, the value bit is set for 1 and
+# X and the unknown bit for X and Z
+_to_aval    = _maketrans("01lLhH-xXzZuUwW", "010011011001111")  # noqa
+
+_resolved_re = re.compile("[01]+$")
+
+if hasattr(int, "from_bytes"):
+    def _int_from_bytes(data, big_endian):
+        return int.from_bytes(data, "big" if big_endian else "little")
+
+    def _int_to_bytes(value, length, big_endian):
+        return value.to_bytes(length, "big" if big_endian else "little")
+else:
+    def _int_from_bytes(data, big_endian):
+        data = bytes(bytearray(data))
+        if not big_endian:
+            data = data[::-1]
+        return int(binascii.hexlify(data), 16) if data else 0
+
+    def _int_to_bytes(value, length, big_endian):
+        data = binascii.unhexlify("%0*x" % (length * 2, value))
+        return data if big_endian else data[::-1]
+
+
 class BinaryRepresentation():
     UNSIGNED         = 0  # noqa
     SIGNED_MAGNITUDE = 1  # noqa
@@ -95,6 +139,20 @@ class BinaryValue(object):
     _resolve_to_1     = "hH"  # noqa
     _resolve_to_error = "xXzZuUwW"  # Resolve to a ValueError() since these usually mean something is wrong
     _permitted_chars  = _resolve_to_0 +_resolve_to_1 + _resolve_to_error + "01"  # noqa
+    _permitted_re     = re.compile("[%s]*$" % re.escape(_permitted_chars))  # noqa
+
+    # Conversion methods for each representation, shared by every instance
+    _convert_to = {
+                    BinaryRepresentation.UNSIGNED         : "_convert_to_unsigned"   ,
+                    BinaryRepresentation.SIGNED_MAGNITUDE : "_convert_to_signed_mag" ,
+                    BinaryRepresentation.TWOS_COMPLEMENT  : "_convert_to_twos_comp"  ,
+                    }
+
+    _convert_from = {
+                    BinaryRepresentation.UNSIGNED         : "_convert_from_unsigned"   ,
+                    BinaryRepresentation.SIGNED_MAGNITUDE : "_convert_from_signed_mag" ,
+                    BinaryRepresentation.TWOS_COMPLEMENT  : "_convert_from_twos_comp"  ,
+                    }
 
     def __init__(self, value=None, bits=None, bigEndian=True,
                  binaryRepresentation=BinaryRepresentation.UNSIGNED):
@@ -108,21 +166,18 @@ class BinaryValue(object):
             bigEndian (bool): Interpret the binary as big-endian when
                                 converting to/from a string buffer.
         """
+        # The vector is held as the integer value of the resolvable bits, a
+        # mask of the bits that can't be resolved and the number of bits.
+        # The binary string is only built when asked for, except when some
+        # bits aren't 0 or 1 where the exact characters are kept in _str.
+        self._int = 0
+        self._unk = 0
+        self._n = 0
+        self._plain = True
         self._str = ""
         self._bits = bits
         self.big_endian = bigEndian
         self.binaryRepresentation = binaryRepresentation
-        self._convert_to = {
-                            BinaryRepresentation.UNSIGNED         : self._convert_to_unsigned   ,
-                            BinaryRepresentation.SIGNED_MAGNITUDE : self._convert_to_signed_mag ,
-                            BinaryRepresentation.TWOS_COMPLEMENT  : self._convert_to_twos_comp  ,
-                            }
-
-        self._convert_from = {
-                            BinaryRepresentation.UNSIGNED         : self._convert_from_unsigned   ,
-                            BinaryRepresentation.SIGNED_MAGNITUDE : self._convert_from_signed_mag ,
-                            BinaryRepresentation.TWOS_COMPLEMENT  : self._convert_from_twos_comp  ,
-                            }
 
         if value is not None:
             self.assign(value)
@@ -174,8 +229,8 @@ class BinaryValue(object):
         return int(resolve(x), 2)
 
     def _convert_from_signed_mag(self, x):
-        rv = int(resolve(self._str[1:]), 2)
-        if self._str[0] == '1':
+        rv = int(resolve(x[1:]), 2)
+        if x[0] == '1':
             rv = rv * -1
         return rv
 
@@ -191,15 +246,47 @@ class BinaryValue(object):
         return rv
 
     def _invert(self, x):
-        inverted = ''
-        for bit in x:
-            if bit == '0':
-                inverted = inverted + '1'
-            elif bit == '1':
-                inverted = inverted + '0'
-            else:
-                inverted = inverted + bit
-        return inverted
+        return str(x).translate(_to_invert)
+
+    def _set_int(self, integer, bits):
+        """Store a non-negative integer which fits in bits"""
+        self._int = integer
+        self._unk = 0
+        self._n = bits
+        self._plain = True
+        self._str = None
+
+    def _set_str(self, string):
+        """Store a binary string already known to hold permitted characters"""
+        self._n = len(string)
+        if _resolved_re.match(string):
+            self._int = int(string, 2)
+            self._unk = 0
+            self._plain = True
+        elif not string:
+            self._int = 0
+            self._unk = 0
+            self._plain = True
+        else:
+            string = str(string)
+            self._int = int(string.translate(_to_value), 2)
+            self._unk = int(string.translate(_to_unknown), 2)
+            self._plain = False
+        self._str = string
+
+    def _resolved(self):
+        """The unsigned integer value, resolving unknown bits per resolve_x_to"""
+        if not self._unk:
+            if not self._n:
+                raise ValueError("Unable to resolve an empty value to an integer")
+            return self._int
+        if resolve_x_to == "ZEROS":
+            return self._int
+        elif resolve_x_to == "ONES":
+            return self._int | self._unk
+        elif resolve_x_to == "RANDOM":
+            return self._int | (random.getrandbits(self._n) & self._unk)
+        raise ValueError("Unable to resolve to binary >%s<" % self._str)
 
     def _adjust_unsigned(self, x):
         if self._bits is None:
@@ -264,12 +351,21 @@ class BinaryValue(object):
 
     def get_value(self):
         """value is an integer representaion of the underlying vector"""
-        return self._convert_from[self.binaryRepresentation](self._str)
+        if self.binaryRepresentation == BinaryRepresentation.UNSIGNED:
+            return self._resolved()
+        if self._plain and self._n > 1:
+            signbit = 1 << (self._n - 1)
+            if not self._int & signbit:
+                return self._int
+            if self.binaryRepresentation == BinaryRepresentation.TWOS_COMPLEMENT:
+                return self._int - (signbit << 1)
+            return -(self._int & (signbit - 1))
+        return getattr(self, self._convert_from[self.binaryRepresentation])(self.binstr)
 
     def get_value_signed(self):
         """value is an signed integer representaion of the underlying vector"""
-        ival = int(resolve(self._str), 2)
-        bits = len(self._str)
+        ival = self._resolved()
+        bits = self._n
         signbit = (1 << (bits - 1))
         if (ival & signbit) == 0:
             return ival
@@ -277,7 +373,23 @@ class BinaryValue(object):
             return -1 * (1 + (int(~ival) & (signbit - 1)))
 
     def set_value(self, integer):
-        self._str = self._convert_to[self.binaryRepresentation](integer)
+        bits = self._bits
+        if self.binaryRepresentation == BinaryRepresentation.UNSIGNED and integer >= 0:
+            length = max(integer.bit_length(), 1)
+            if bits is None:
+                self._set_int(integer, length)
+                return
+            if length <= bits:
+                if self.big_endian:
+                    integer <<= bits - length
+                self._set_int(integer, bits)
+                return
+        elif (self.binaryRepresentation == BinaryRepresentation.TWOS_COMPLEMENT and
+                not self.big_endian and bits is not None and bits > 1 and
+                -(1 << (bits - 1)) <= integer < (1 << (bits - 1))):
+            self._set_int(integer & ((1 << bits) - 1), bits)
+            return
+        self._set_str(getattr(self, self._convert_to[self.binaryRepresentation])(integer))
 
     value = property(get_value, set_value, None,
                      "Integer access to the value *** deprecated ***")
@@ -293,21 +405,10 @@ class BinaryValue(object):
         True
 
         """
-        bits = resolve(self._str)
-
-        if len(bits) % 8:
-            bits = "0" * (8 - len(bits) % 8) + bits
-
-        buff = ""
-        while bits:
-            byte = bits[:8]
-            bits = bits[8:]
-            val = int(byte, 2)
-            if self.big_endian:
-                buff += chr(val)
-            else:
-                buff = chr(val) + buff
-        return buff
+        buff = self.to_bytes()
+        if str is bytes:
+            return buff
+        return buff.decode("latin-1")
 
     def get_hex_buff(self):
         bstr = self.get_buff()
@@ -315,28 +416,65 @@ class BinaryValue(object):
         return hstr
 
     def set_buff(self, buff):
-        self._str = ""
-        for char in buff:
-            if self.big_endian:
-                self._str += "{0:08b}".format(ord(char))
-            else:
-                self._str = "{0:08b}".format(ord(char)) + self._str
+        if not isinstance(buff, (bytes, bytearray, memoryview)):
+            try:
+                buff = buff.encode("latin-1")
+            except UnicodeEncodeError:
+                self._set_str("".join("{0:08b}".format(ord(char)) for char in buff[::1 if self.big_endian else -1]))
+                self._adjust()
+                return
+        self.from_bytes(buff)
+
+    def to_bytes(self):
+        """The value as bytes, with the most significant byte first if
+        big_endian is set. Unknown bits are resolved as for integer.
+
+        >>> BinaryValue(value=0x412F, bits=16, bigEndian=False).to_bytes() == b"\x2F\x41"
+        True
+
+        """
+        if not self._n:
+            return b""
+        return _int_to_bytes(self._resolved(), (self._n + 7) // 8, self.big_endian)
+
+    def from_bytes(self, data):
+        """Set the value from bytes, a bytearray, a memoryview or any other
+        object supporting the buffer protocol, the first byte being the most
+        significant if big_endian is set.
+
+        Slices of a memoryview can be passed to avoid copying data out of a
+        larger buffer.
+        """
+        if isinstance(data, memoryview) and data.itemsize != 1:
+            data = data.tobytes()
+        self._set_int(_int_from_bytes(data, self.big_endian), 8 * len(data))
         self._adjust()
 
+    def __bytes__(self):
+        return self.to_bytes()
+
     def _adjust(self):
         """Pad/truncate the bit string to the correct length"""
         if self._bits is None:
             return
-        l = len(self._str)
+        l = self._n
         if l < self._bits:
-            if self.big_endian:
-                self._str = self._str + "0" * (self._bits - l)
+            if not self._plain:
+                if self.big_endian:
+                    self._set_str(self._str + "0" * (self._bits - l))
+                else:
+                    self._set_str("0" * (self._bits - l) + self._str)
+            elif self.big_endian:
+                self._set_int(self._int << (self._bits - l), self._bits)
             else:
-                self._str = "0" * (self._bits - l) + self._str
+                self._set_int(self._int, self._bits)
         elif l > self._bits:
             print("WARNING truncating value to match requested number of bits "
                   " (%d)" % l)
-            self._str = self._str[l - self._bits:]
+            if not self._plain:
+                self._set_str(self._str[l - self._bits:])
+            else:
+                self._set_int(self._int & ((1 << self._bits) - 1), self._bits)
 
     buff = property(get_buff, set_buff, None,
                     "Access to the value as a buffer")
@@ -344,19 +482,35 @@ class BinaryValue(object):
     def get_binstr(self):
         """Attribute binstr is the binary representation stored as a string of
         1s and 0s"""
+        if self._str is None:
+            self._str = "{0:0{1}b}".format(self._int, self._n) if self._n else ""
         return self._str
 
     def set_binstr(self, string):
-        for char in string:
-            if char not in BinaryValue._permitted_chars:
-                raise ValueError("Attempting to assign character %s to a %s" %
-                                 (char, self.__class__.__name__))
-        self._str = string
-        self._adjust()
+        if _resolved_re.match(string):
+            self._int = int(string, 2)
+            self._unk = 0
+            self._n = len(string)
+            self._plain = True
+            self._str = string
+        else:
+            if not BinaryValue._permitted_re.match(string):
+                for char in string:
+                    if char not in BinaryValue._permitted_chars:
+                        raise ValueError("Attempting to assign character %s to a %s" %
+                                         (char, self.__class__.__name__))
+            self._set_str(string)
+        if self._n != self._bits:
+            self._adjust()
 
     binstr = property(get_binstr, set_binstr, None,
                       "Access to the binary string")
 
+    def _set_resolved_integer(self, integer):
+        """Set the underlying vector from a non-negative integer known to fit
+        in self._bits, bypassing the character checks in set_binstr"""
+        self._set_int(integer, self._bits)
+
     def hex(self):
         try:
             return hex(self.get_value())
@@ -388,10 +542,9 @@ class BinaryValue(object):
         True
 
         """
-        for char in self._str:
-            if char == "1":
-                return True
-        return False
+        if self._plain:
+            return self._int != 0
+        return "1" in self._str
 
     def __eq__(self, other):
         if isinstance(other, BinaryValue):
@@ -471,11 +624,21 @@ class BinaryValue(object):
         return self._invert(self.binstr)
 
     def __len__(self):
-        return len(self.binstr)
+        return self._n
+
+    def __copy__(self):
+        """A separate BinaryValue holding the same value, also for views"""
+        value = BinaryValue(bits=self._bits, bigEndian=self.big_endian,
+                            binaryRepresentation=self.binaryRepresentation)
+        if self._plain:
+            value._set_int(self._int, self._n)
+        else:
+            value._set_str(self._str)
+        return value
 
-    def __getitem__(self, key):
-        ''' BinaryValue uses verilog/vhdl style slices as opposed to python
-        style'''
+    def _slice_chars(self, key):
+        '''Positions in binstr of the first and after the last character of
+        a verilog/vhdl style index or slice'''
         if isinstance(key, slice):
             first, second = key.start, key.stop
             if self.big_endian:
@@ -487,7 +650,7 @@ class BinaryValue(object):
                 if first > second:
                     raise IndexError('Big Endian indices must be specified '
                                      'low to high')
-                _binstr = self.binstr[first:(second + 1)]
+                low, high = first, second + 1
             else:
                 if first < 0 or second < 0:
                     raise IndexError('BinaryValue does not support negative '
@@ -497,21 +660,55 @@ class BinaryValue(object):
                 if second > first:
                     raise IndexError('Litte Endian indices must be specified '
                                      'high to low')
-                high = self._bits - second
-                low = self._bits - 1 - first
-                _binstr = self.binstr[low:high]
-        else:
-            index = key
-            if index > self._bits - 1:
-                raise IndexError('Index greater than number of bits.')
+                low, high = self._bits - 1 - first, self._bits - second
+            low, high, _ = slice(low, high).indices(self._n)
+            return low, max(low, high)
+
+        index = key
+        if index > self._bits - 1:
+            raise IndexError('Index greater than number of bits.')
+        if not self.big_endian:
+            index = self._bits - 1 - index
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError('string index out of range')
+        return index, index + 1
+
+    def __getitem__(self, key):
+        ''' BinaryValue uses verilog/vhdl style slices as opposed to python
+        style
+
+        The result is a view which reads and writes the bits of this value
+        in place'''
+        low, high = self._slice_chars(key)
+        return _BinaryValueView(self, low, high)
+
+    def _setitem_view(self, key):
+        '''A view __setitem__ can write an integer through without going
+        through the binary string, or None unless the key lies within a
+        value already padded to its width'''
+        ints = get_python_integer_types()
+        if self._bits is None or self._n != self._bits:
+            return None
+        if isinstance(key, slice):
+            first, second = key.start, key.stop
+            if not isinstance(first, ints) or not isinstance(second, ints):
+                return None
             if self.big_endian:
-                _binstr = self.binstr[index]
+                if not 0 <= first <= second <= self._bits - 1:
+                    return None
+                low, high = first, second + 1
             else:
-                _binstr = self.binstr[self._bits-1-index]
-        rv = BinaryValue(bits=len(_binstr), bigEndian=self.big_endian,
-                         binaryRepresentation=self.binaryRepresentation)
-        rv.set_binstr(_binstr)
-        return rv
+                if not 0 <= second <= first <= self._bits - 1:
+                    return None
+                low, high = self._bits - 1 - first, self._bits - second
+        elif isinstance(key, ints) and 0 <= key <= self._bits - 1:
+            low = key if self.big_endian else self._bits - 1 - key
+            high = low + 1
+        else:
+            return None
+        return _BinaryValueView(self, low, high)
 
     def __setitem__(self, key, val):
         ''' BinaryValue uses verilog/vhdl style slices as opposed to python
@@ -530,6 +727,12 @@ class BinaryValue(object):
             if val >= 2**num_slice_bits:
                 raise ValueError('Integer is too large for the specified slice '
                                  'length')
+
+            # Bits within the width are written in place
+            view = self._setitem_view(key)
+            if view is not None:
+                view._set_int(val, view._bits)
+                return
             val = "{:0{width}b}".format(val, width=num_slice_bits)
 
         if isinstance(key, slice):
@@ -579,6 +782,330 @@ class BinaryValue(object):
             else:
                 self.binstr = self.binstr[0:self._bits-index-1] + val + self.binstr[self._bits-index:self._bits]
 
+
+class _BinaryValueView(BinaryValue):
+    '''A bit or slice of a BinaryValue.
+
+    Reads are computed from the parent's value with shifts and masks, and
+    writes update the parent in place. The view covers the characters
+    low to high - 1 of the parent's binstr.
+    '''
+    def __init__(self, parent, low, high):
+        self._parent = parent
+        self._low = low
+        self._high = high
+        self._bits = high - low
+        self.big_endian = parent.big_endian
+        self.binaryRepresentation = parent.binaryRepresentation
+        # A value of a different width waiting to be padded or truncated
+        self._pending = None
+
+    def _shift(self):
+        return self._parent._n - self._high
+
+    @property
+    def _n(self):
+        if self._pending is not None:
+            return self._pending._n
+        return self._bits
+
+    @property
+    def _int(self):
+        if self._pending is not None:
+            return self._pending._int
+        return (self._parent._int >> self._shift()) & ((1 << self._bits) - 1)
+
+    @property
+    def _unk(self):
+        if self._pending is not None:
+            return self._pending._unk
+        return (self._parent._unk >> self._shift()) & ((1 << self._bits) - 1)
+
+    @property
+    def _plain(self):
+        if self._pending is not None:
+            return self._pending._plain
+        if self._parent._plain:
+            return True
+        return _resolved_re.match(self._str) is not None
+
+    @property
+    def _str(self):
+        if self._pending is not None:
+            return self._pending.binstr
+        return self._parent.binstr[self._low:self._high]
+
+    def _set_int(self, integer, bits):
+        if bits != self._bits:
+            self._pending = BinaryValue()
+            self._pending._set_int(integer, bits)
+            return
+        self._pending = None
+        parent = self._parent
+        if parent._plain:
+            shift = self._shift()
+            mask = ((1 << bits) - 1) << shift
+            parent._set_int((parent._int & ~mask) | (integer << shift), parent._n)
+        else:
+            self._write_str("{0:0{1}b}".format(integer, bits) if bits else "")
+
+    def _set_str(self, string):
+        if len(string) != self._bits:
+            self._pending = BinaryValue()
+            self._pending._set_str(string)
+            return
+        self._pending = None
+        self._write_str(string)
+
+    def _write_str(self, string):
+        parent = self._parent
+        binstr = parent.binstr
+        parent._set_str(binstr[:self._low] + string + binstr[self._high:])
+
+    def get_binstr(self):
+        if self._pending is not None:
+            return self._pending.binstr
+        if self._parent._plain:
+            return "{0:0{1}b}".format(self._int, self._bits) if self._bits else ""
+        return self._str
+
+    def set_binstr(self, string):
+        value = BinaryValue(bits=self._bits, bigEndian=self.big_endian)
+        value.binstr = string
+        if value._plain:
+            self._set_int(value._int, value._n)
+        else:
+            self._set_str(value.binstr)
+
+    binstr = property(get_binstr, set_binstr, None,
+                      "Access to the binary string")
+
+
+class BinaryArray(object):
+    """Representation of many values of the same width held in NumPy arrays.
+
+    Each element is stored the way the simulator reports it, as a value and
+    an unknown mask. A bit which is set in the unknown mask is X if it is
+    also set in the value and Z otherwise.
+
+    Values of up to 64 bits are held as uint64, wider ones as Python integers
+    in object arrays. Conversions are applied to the whole array at once:
+
+    >>> arr = BinaryArray([1, 0xFF], bits=8, binaryRepresentation=BinaryRepresentation.TWOS_COMPLEMENT)
+    >>> arr.integer.tolist()
+    [1, -1]
+    >>> arr[1].binstr
+    '11111111'
+
+    """
+    def __init__(self, values, bits, unknown=None,
+                 binaryRepresentation=BinaryRepresentation.UNSIGNED):
+        """
+        Args:
+            values (sequence): Integers to store, negative integers are
+                               encoded according to binaryRepresentation
+
+            bits (int): Width of each value
+
+            unknown (sequence): Mask of the unknown bits of each value
+
+            binaryRepresentation (BinaryRepresentation): How the values are
+                                                         interpreted as integers
+        """
+        if not _have_numpy:
+            raise ImportError("NumPy is required for BinaryArray")
+
+        self.bits = bits
+        self.binaryRepresentation = binaryRepresentation
+        self._mask = (1 << bits) - 1
+        self._dtype = np.uint64 if bits <= 64 else object
+
+        self.value = self._encode(values)
+        if unknown is None:
+            self.unknown = np.zeros(len(self.value), dtype=self._dtype)
+        else:
+            self.unknown = np.array(unknown, dtype=self._dtype)
+            if len(self.unknown) != len(self.value):
+                raise ValueError("Got %d unknown masks for %d values" % (len(self.unknown), len(self.value)))
+
+    def _encode(self, values):
+        """Convert integers to their unsigned encoding in self.bits"""
+        if isinstance(values, np.ndarray) and values.dtype.kind == "u":
+            if self._dtype is object:
+                return values.astype(object)
+            if values.size and int(values.max()) > self._mask:
+                raise ValueError("Values don't fit in %d bits" % self.bits)
+            return values.astype(np.uint64)
+
+        if not (isinstance(values, np.ndarray) and values.dtype.kind == "i"):
+            try:
+                values = np.array(values, dtype=np.int64 if self._dtype is np.uint64 else object)
+            except OverflowError:
+                # Unsigned 64 bit values beyond the range of int64
+                values = np.array(values, dtype=object)
+        if not values.size:
+            return np.zeros(0, dtype=self._dtype)
+        if self.bits >= 64 and values.dtype != object:
+            # Leave room for the sign bit and its encoding
+            values = values.astype(object)
+
+        negative = values < 0
+        if negative.any():
+            if self.binaryRepresentation == BinaryRepresentation.UNSIGNED:
+                raise ValueError("Attempt to assign negative numbers to an unsigned BinaryArray")
+            limit = 1 << (self.bits - 1)
+            if (values < -limit).any() or (values >= limit).any():
+                raise ValueError("Values don't fit in %d bits" % self.bits)
+            if self.binaryRepresentation == BinaryRepresentation.SIGNED_MAGNITUDE:
+                values = np.where(negative, -values | limit, values)
+            elif values.dtype != object:
+                return values.astype(np.uint64) & np.uint64(self._mask)
+            else:
+                values = values & self._mask
+        elif (values > self._mask).any():
+            raise ValueError("Values don't fit in %d bits" % self.bits)
+        return values.astype(self._dtype)
+
+    @classmethod
+    def from_values(cls, values, bits=None,
+                    binaryRepresentation=BinaryRepresentation.UNSIGNED):
+        """Create a BinaryArray from a sequence of BinaryValues"""
+        if bits is None:
+            bits = max(len(value) for value in values) if len(values) else 1
+        avals = []
+        bvals = []
+        for value in values:
+            if value._plain:
+                avals.append(value._int)
+                bvals.append(0)
+            else:
+                binstr = value.binstr
+                avals.append(int(binstr.translate(_to_aval), 2))
+                bvals.append(value._unk)
+        return cls(np.array(avals, dtype=np.uint64 if bits <= 64 else object), bits,
+                   bvals, binaryRepresentation)
+
+    @classmethod
+    def from_handle(cls, handle, start=None, count=None,
+                    binaryRepresentation=BinaryRepresentation.UNSIGNED):
+        """
+        Read consecutive elements of an array handle, in a single simulator
+        call where possible
+        """
+        start, count = handle._array_bounds(start, count)
+        if not count:
+            return cls([], len(handle), binaryRepresentation=binaryRepresentation)
+        bits = len(handle[start])
+        vector = handle._get_array_vector(start, count)
+        if vector is None:
+            return cls.from_values([handle[index].value for index in range(start, start + count)],
+                                   bits, binaryRepresentation)
+        values, unknowns = vector
+        dtype = np.uint64 if bits <= 64 else object
+        return cls(np.array(values, dtype=dtype), bits, unknowns, binaryRepresentation)
+
+    def to_values(self):
+        """Convert to a list of BinaryValues"""
+        result = []
+        for value, unknown in zip(self.value.tolist(), self.unknown.tolist()):
+            value, unknown = int(value), int(unknown)
+            vec = BinaryValue(bits=self.bits, bigEndian=False,
+                              binaryRepresentation=self.binaryRepresentation)
+            if unknown:
+                chars = "01zx"
+                vec.binstr = "".join(chars[((value >> bit) & 1) | (((unknown >> bit) & 1) << 1)]
+                                     for bit in range(self.bits - 1, -1, -1))
+            else:
+                vec._set_int(value, self.bits)
+            result.append(vec)
+        return result
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return BinaryArray(self.value[key], self.bits, self.unknown[key], self.binaryRepresentation)
+        return BinaryArray(self.value[key:key + 1 or None], self.bits,
+                           self.unknown[key:key + 1 or None], self.binaryRepresentation).to_values()[0]
+
+    @property
+    def is_resolved(self):
+        """True if none of the values contain X or Z bits"""
+        return not self.unknown.any()
+
+    def resolve(self, resolve_to=None):
+        """
+        The unsigned values with unknown bits resolved.
+
+        Args:
+            resolve_to (str): VALUE_ERROR, ZEROS, ONES or RANDOM, defaults to
+                              the COCOTB_RESOLVE_X setting
+        """
+        if resolve_to is None:
+            resolve_to = resolve_x_to
+        if self.is_resolved:
+            return self.value.copy()
+        if resolve_to == "ZEROS":
+            return self.value & ~self.unknown
+        elif resolve_to == "ONES":
+            return self.value | self.unknown
+        elif resolve_to == "RANDOM":
+            if self._dtype is object:
+                noise = np.array([random.getrandbits(self.bits) for _ in range(len(self))], dtype=object)
+            else:
+                noise = np.frombuffer(os.urandom(8 * len(self)), dtype=np.uint64) & np.uint64(self._mask)
+            return (self.value & ~self.unknown) | (noise & self.unknown)
+        raise ValueError("Unable to resolve %d values with unknown bits" % np.count_nonzero(self.unknown))
+
+    def _signed(self, values, representation):
+        """Interpret unsigned values according to representation"""
+        if representation == BinaryRepresentation.UNSIGNED:
+            return values
+        signbit = 1 << (self.bits - 1)
+        if self._dtype is np.uint64:
+            if representation == BinaryRepresentation.TWOS_COMPLEMENT and self.bits == 64:
+                return values.view(np.int64)
+            negative = (values & np.uint64(signbit)) != 0
+            magnitude = (values & np.uint64(signbit - 1)).astype(np.int64)
+            if representation == BinaryRepresentation.TWOS_COMPLEMENT:
+                return np.where(negative, magnitude - np.int64(signbit), magnitude)
+            return np.where(negative, -magnitude, magnitude)
+        negative = (values & signbit) != 0
+        magnitude = values & (signbit - 1)
+        if representation == BinaryRepresentation.TWOS_COMPLEMENT:
+            return np.where(negative, magnitude - signbit, magnitude)
+        return np.where(negative, -magnitude, magnitude)
+
+    @property
+    def integer(self):
+        """The values as integers according to binaryRepresentation"""
+        return self._signed(self.resolve(), self.binaryRepresentation)
+
+    @property
+    def signed_integer(self):
+        """The values as twos complement signed integers"""
+        return self._signed(self.resolve(), BinaryRepresentation.TWOS_COMPLEMENT)
+
+    def byteswap(self):
+        """Reverse the order of the bytes within each value"""
+        if self.bits % 8:
+            raise ValueError("Can't swap the bytes of %d bit values" % self.bits)
+        if self._dtype is np.uint64:
+            shift = np.uint64(64 - self.bits)
+            value = self.value.byteswap() >> shift
+            unknown = self.unknown.byteswap() >> shift
+        else:
+            def swap(x):
+                return int(binascii.hexlify(binascii.unhexlify("%0*x" % (self.bits // 4, x))[::-1]), 16)
+            value = np.array([swap(x) for x in self.value], dtype=object)
+            unknown = np.array([swap(x) for x in self.unknown], dtype=object)
+        return BinaryArray(value, self.bits, unknown, self.binaryRepresentation)
+
+    def __repr__(self):
+        return "BinaryArray(%d x %d bits)" % (len(self), self.bits)
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -32,6 +32,16 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
 
     A bus is simply defined as a collection of signals
 """
+import os
+
+# For autodocumentation don't need the extension modules
+if "SPHINX_BUILD" in os.environ:
+    simulator = None
+else:
+    import simulator
+
+from cocotb.binary import BinaryValue
+from cocotb.handle import ModifiableObject
 
 
 def _build_sig_attr_dict(signals):
@@ -44,6 +54,26 @@ def _build_sig_attr_dict(signals):
         return sig_to_attr
 
 
+class BusCapture(dict):
+    """
+    Record of the values captured from a bus, a dict of the value of each
+    signal which also supports access by attribute
+    """
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise RuntimeError('signal {} not present in bus'.format(name))
+
+    def __setattr__(self, name, value):
+        raise RuntimeError('modifying a bus capture is not supported')
+
+    def __delattr__(self, name):
+        raise RuntimeError('modifying a bus capture is not supported')
+
+
 class Bus(object):
     """
         Wraps up a collection of signals
@@ -117,6 +147,36 @@ class Bus(object):
                 self._entity._log.debug("Ignoring optional missing signal "
                                         "%s on bus %s" % (sig_name, name))
 
+        self._compile()
+
+    def _compile(self):
+        """
+        Build the lists used to access all the signals at once. Plain vector
+        signals are read in a single simulator call, anything else is read
+        through its handle.
+        """
+        self._names = tuple(self._signals.keys())
+        self._handles = tuple(self._signals[name] for name in self._names)
+        self._vectors = [idx for idx, hdl in enumerate(self._handles)
+                         if type(hdl) is ModifiableObject]
+        self._raw_handles = tuple(self._handles[idx]._handle for idx in self._vectors)
+
+    def _read_values(self):
+        """Current values of all the signals in the order of self._names"""
+        values = [None] * len(self._handles)
+        if self._raw_handles:
+            raw = simulator.get_signal_vals(self._raw_handles)
+            for idx, value in zip(self._vectors, raw):
+                if isinstance(value, str):
+                    values[idx] = BinaryValue(value, len(value))
+                else:
+                    values[idx] = BinaryValue(bits=len(self._handles[idx]))
+                    values[idx]._set_resolved_integer(value)
+        for idx, hdl in enumerate(self._handles):
+            if values[idx] is None:
+                values[idx] = hdl.value
+        return values
+
     def drive(self, obj, strict=False):
         """
         Drives values onto the bus.
@@ -130,9 +190,14 @@ class Bus(object):
 
         Raises:
             AttributeError
+
+        Each write goes through its handle, so structures, arrays and
+        partial writes to the same vector are handled as for an assignment.
         """
-        for attr_name, hdl in self._signals.items():
-            if not hasattr(obj, attr_name):
+        for attr_name, hdl in zip(self._names, self._handles):
+            try:
+                val = getattr(obj, attr_name)
+            except AttributeError:
                 if strict:
                     msg = ("Unable to drive onto {0}.{1} because {2} is missing "
                            "attribute {3}".format(self._entity._name,
@@ -142,34 +207,17 @@ class Bus(object):
                     raise AttributeError(msg)
                 else:
                     continue
-            val = getattr(obj, attr_name)
-            hdl <= val
+            hdl._setcachedvalue(val)
 
     def capture(self):
         """
         Capture the values from the bus, returning an object representing the capture
 
         Returns:
-            A dict that supports access by attribute, each attribute corresponds to each signal's value
+            A BusCapture dict that supports access by attribute, each
+            attribute corresponds to each signal's value
         """
-        class _Capture(dict):
-            def __getattr__(self, name):
-                if name in self:
-                    return self[name]
-                else:
-                    raise RuntimeError('signal {} not present in bus'.format(name))
-
-            def __setattr__(self, name, value):
-                raise RuntimeError('modifying a bus capture is not supported')
-
-            def __delattr__(self, name):
-                raise RuntimeError('modifying a bus capture is not supported')
-
-        _capture = _Capture()
-        for attr_name, hdl in self._signals.items():
-            _capture[attr_name] = hdl.value
-
-        return _capture
+        return BusCapture(zip(self._names, self._read_values()))
 
     def sample(self, obj, strict=False):
         """
@@ -185,7 +233,7 @@ class Bus(object):
         Raises:
             AttributeError
         """
-        for attr_name, hdl in self._signals.items():
+        for attr_name, value in zip(self._names, self._read_values()):
             if not hasattr(obj, attr_name):
                 if strict:
                     msg = ("Unable to sample from {0}.{1} because {2} is missing "
@@ -200,9 +248,9 @@ class Bus(object):
             #of obj.attr_name on assignment.  Otherwise use setattr() to crush whatever type of
             #object was in obj.attr_name with hdl.value:
             try:
-                getattr(obj, attr_name).set_binstr(hdl.value.get_binstr())
+                getattr(obj, attr_name).set_binstr(value.get_binstr())
             except AttributeError:
-                setattr(obj, attr_name, hdl.value)
+                setattr(obj, attr_name, value)
 
     def __le__(self, value):
         """Overload the less than or equal to operator for value assignment"""
@@ -41,6 +41,7 @@ from cocotb.triggers import (Event, RisingEdge, ReadOnly, Timer, NextTimeStep,
 from cocotb.bus import Bus
 from cocotb.log import SimLog
 from cocotb.result import ReturnValue
+from cocotb.stimulus import StimulusQueue
 
 
 class BitDriver(object):
@@ -49,16 +50,51 @@ class BitDriver(object):
 
     Useful for exercising ready / valid
     """
-    def __init__(self, signal, clk, generator=None):
+    def __init__(self, signal, clk, generator=None, use_stimulus_queue=False):
+        """
+        Kwargs:
+            use_stimulus_queue (bool): Play the generator back from a
+                                       StimulusQueue, rather than waking a
+                                       coroutine on every clock edge
+        """
         self._signal = signal
         self._clk = clk
         self._generator = generator
+        self._use_stimulus_queue = use_stimulus_queue
+        self._queue = None
 
     def start(self, generator=None):
-        self._cr = cocotb.fork(self._cr_twiddler(generator=generator))
+        if not self._use_stimulus_queue:
+            self._cr = cocotb.fork(self._cr_twiddler(generator=generator))
+            return
+
+        if generator is None and self._generator is None:
+            raise Exception("No generator provided!")
+        if generator is not None:
+            self._generator = generator
+
+        # The first value is driven straight away as the coroutine would,
+        # each edge then writes the next
+        values = self._bit_values(self._generator)
+        self._signal <= next(values)
+        self._queue = StimulusQueue(self._clk, [self._signal])
+        self._queue.feed(values)
 
     def stop(self):
-        self._cr.kill()
+        if self._queue is not None:
+            self._queue.close()
+            self._queue = None
+        else:
+            self._cr.kill()
+
+    @staticmethod
+    def _bit_values(generator):
+        """Expand (on, off) tuples into the value for each cycle"""
+        for on, off in generator:
+            for i in range(on):
+                yield 1
+            for i in range(off):
+                yield 0
 
     @cocotb.coroutine
     def _cr_twiddler(self, generator=None):
@@ -80,6 +116,53 @@ class BitDriver(object):
                 yield edge
 
 
+class DriverStatistics(object):
+    """Wrapper class for storing Driver statistics"""
+    def __init__(self):
+        self.queued_transactions = 0
+        self.sent_transactions = 0
+        self.occupancy = 0
+        self.peak_occupancy = 0
+        self.full_waits = 0
+        self._occupancy_total = 0
+
+    @property
+    def mean_occupancy(self):
+        """Average depth of the queue seen by each transaction sent"""
+        if not self.sent_transactions:
+            return 0.0
+        return float(self._occupancy_total) / self.sent_transactions
+
+
+class _StreamSource(object):
+    """An iterator of transactions being fed into a driver"""
+    def __init__(self, iterator, max_outstanding, callback, event):
+        self.iterator = iterator
+        self.max_outstanding = max_outstanding
+        self.callback = callback
+        self.event = event
+        self.outstanding = 0
+        self.exhausted = False
+        self.done = Event(name="Driver.stream")
+
+    def sent(self, transaction):
+        self.outstanding -= 1
+        if self.callback:
+            self.callback(transaction)
+        if self.exhausted and not self.outstanding:
+            self.done.set()
+
+    def finish(self):
+        self.exhausted = True
+        if not self.outstanding:
+            self.done.set()
+
+    def cancel(self):
+        """Stop taking transactions, those queued having been dropped"""
+        self.exhausted = True
+        self.done.set()
+
+
 class Driver(object):
     """
 
@@ -87,6 +170,9 @@ class Driver(object):
 
     The driver is responsible for serialising transactions onto the physical
     pins of the interface.  This may consume simulation time.
+
+    Setting queue_depth bounds the number of queued transactions, append then
+    returns a coroutine which blocks the caller while the queue is too deep.
     """
     def __init__(self):
         """
@@ -94,7 +180,11 @@ class Driver(object):
         """
         # self._busy = Lock()
         self._pending = Event(name="Driver._pending")
+        self._space = Event(name="Driver._space")
         self._sendQ = deque()
+        self._sources = deque()
+        self.queue_depth = None
+        self.stats = DriverStatistics()
 
         # Subclasses may already set up logging
         if not hasattr(self, "log"):
@@ -119,15 +209,85 @@ class Driver(object):
         sent
 
         event: event to be set when the tansaction has been sent
+
+        If queue_depth is set a coroutine is returned, yielding it blocks
+        until the queue is no deeper than queue_depth
         """
-        self._sendQ.append((transaction, callback, event))
+        self._enqueue(transaction, callback, event)
         self._pending.set()
+        if self.queue_depth is not None:
+            return self._wait_for_space()
+
+    def stream(self, source, max_outstanding=1, callback=None, event=None):
+        """
+        Send each transaction of an iterable, such as a generator.
+
+        Transactions are only taken from the source as the driver sends them,
+        so no more than max_outstanding of them are waiting in the queue at
+        once. Sources added by successive calls are sent one after the other.
+
+        callback and event are used for each transaction as for append.
+
+        Returns an Event which is set once the last transaction of the
+        source has been sent
+        """
+        if max_outstanding < 1:
+            raise ValueError("max_outstanding must be at least 1")
+        stream = _StreamSource(iter(source), max_outstanding, callback, event)
+        self._sources.append(stream)
+        self._pending.set()
+        return stream.done
+
+    def _enqueue(self, transaction, callback, event):
+        self._sendQ.append((transaction, callback, event))
+        stats = self.stats
+        stats.queued_transactions += 1
+        stats.occupancy = len(self._sendQ)
+        if stats.occupancy > stats.peak_occupancy:
+            stats.peak_occupancy = stats.occupancy
+
+    def _refill(self):
+        """Take transactions from the stream sources until they have
+        max_outstanding queued. Returns True if anything is queued"""
+        while self._sources:
+            stream = self._sources[0]
+            if stream.outstanding >= stream.max_outstanding:
+                break
+            try:
+                transaction = next(stream.iterator)
+            except StopIteration:
+                self._sources.popleft()
+                stream.finish()
+                continue
+            stream.outstanding += 1
+            self._enqueue(transaction, stream.sent, stream.event)
+        return bool(self._sendQ)
+
+    @coroutine
+    def _wait_for_space(self):
+        """Block while the queue holds more than queue_depth transactions"""
+        if self.queue_depth is not None and len(self._sendQ) > self.queue_depth:
+            self.stats.full_waits += 1
+            while self.queue_depth is not None and len(self._sendQ) > self.queue_depth:
+                yield self._space.wait()
 
     def clear(self):
         """
         Clear any queued transactions without sending them onto the bus
+
+        The events returned by stream are set for the sources dropped
         """
+        dropped = set(self._sources)
+        for transaction, callback, event in self._sendQ:
+            source = getattr(callback, "__self__", None)
+            if isinstance(source, _StreamSource):
+                dropped.add(source)
         self._sendQ = deque()
+        self._sources = deque()
+        for source in dropped:
+            source.cancel()
+        self.stats.occupancy = 0
+        self._space.set()
 
     @coroutine
     def send(self, transaction, sync=True):
@@ -177,7 +337,7 @@ class Driver(object):
         while True:
 
             # Sleep until we have something to send
-            while not self._sendQ:
+            while not self._refill():
                 self._pending.clear()
                 yield self._pending.wait()
 
@@ -185,11 +345,16 @@ class Driver(object):
 
             # Send in all the queued packets,
             # only synchronise on the first send
-            while self._sendQ:
+            while self._refill():
+                stats = self.stats
+                stats._occupancy_total += len(self._sendQ)
                 transaction, callback, event = self._sendQ.popleft()
+                stats.occupancy = len(self._sendQ)
+                self._space.set()
                 self.log.debug("Sending queued packet...")
                 yield self._send(transaction, callback, event,
                                  sync=not synchronised)
+                stats.sent_transactions += 1
                 synchronised = True
 
 
@@ -316,6 +481,64 @@ class ValidatedBusDriver(BusDriver):
         self.valid_generator = valid_generator
         self._next_valids()
 
+    def _valid_cycles(self, cycles, valid):
+        """
+        Append the valid bit to each row, inserting rows with it low where
+        the valid generator asks for gaps and once the rows run out
+        """
+        row = None
+        for row in cycles:
+            row = tuple(row)
+            if not valid:
+                yield row
+                continue
+
+            if not self.on:
+                for i in range(self.off):
+                    yield row + (0,)
+                self._next_valids()
+
+            if self.on is not True and self.on:
+                self.on -= 1
+
+            yield row + (1,)
+
+        if valid and row is not None:
+            yield row + (0,)
+
+    @coroutine
+    def play(self, cycles, signals, valid="valid", low_water=64):
+        """
+        Play back precomputed cycles of bus values from a StimulusQueue,
+        without waking a coroutine on every clock edge.
+
+        Each edge writes the next row, so there is no backpressure; this
+        suits buses without a ready signal or whose sink is known to keep up.
+
+        Args:
+            cycles (iterable): Rows of values, one per valid cycle, or a 2-D
+                               NumPy array
+
+            signals (list): Names of the bus signals in each row
+
+        Kwargs:
+            valid (str): Name of the signal driven high with each row and low
+                         in the gaps inserted by the valid generator, None
+                         to drive only the rows
+
+            low_water (int): Cycles left when more rows are queued
+        """
+        handles = [getattr(self.bus, name) for name in signals]
+        if valid is not None:
+            handles.append(getattr(self.bus, valid))
+
+        queue = StimulusQueue(self.clock, handles, low_water=low_water)
+        try:
+            queue.feed(self._valid_cycles(cycles, valid is not None))
+            yield queue.drained()
+        finally:
+            queue.close()
+
 
 @cocotb.coroutine
 def polled_socket_attachment(driver, sock):
@@ -9,31 +9,104 @@ from cocotb.triggers import Timer, RisingEdge, ReadOnly, Lock, Event
 from cocotb.bus import Bus
 from cocotb.result import ReturnValue
 from cocotb.drivers import BusDriver
-from cocotb.binary import BinaryValue, BinaryRepresentation
+from cocotb.binary import BinaryValue, BinaryArray, BinaryRepresentation, _have_numpy
+from cocotb.log import SimLog
 
 from collections import deque
 
+if _have_numpy:
+    import numpy as np
+
+
+def _sample_codes(samples, binaryRepresentation):
+    '''Convert samples to their 12 bit codes on the interface'''
+    if _have_numpy:
+        data = np.asarray(samples, dtype=np.int64)
+        if binaryRepresentation == BinaryRepresentation.SIGNED_MAGNITUDE:
+            data = np.where(data < 0, 0x800 | (-data & 0x7FF), data & 0x7FF)
+        return data & 0xFFF
+    if binaryRepresentation == BinaryRepresentation.SIGNED_MAGNITUDE:
+        return [0x800 | (-x & 0x7FF) if x < 0 else x & 0x7FF for x in samples]
+    return [x & 0xFFF for x in samples]
+
+
+def _rx_words(i_codes, q_codes, dual):
+    '''The 6 bit word driven on each clock edge to send samples, in the
+    order I[11:6], Q[11:6], I[5:0], Q[5:0] for each sample or I[11:6],
+    Q[5:0], I[5:0], Q[11:6] when sending two channels'''
+    if _have_numpy:
+        if dual:
+            halves = (i_codes >> 6, q_codes & 0x3F, i_codes & 0x3F, q_codes >> 6)
+        else:
+            halves = (i_codes >> 6, q_codes >> 6, i_codes & 0x3F, q_codes & 0x3F)
+        return np.stack(halves, axis=1).ravel().tolist()
+    words = []
+    for i, q in zip(i_codes, q_codes):
+        if dual:
+            words.extend((i >> 6, q & 0x3F, i & 0x3F, q >> 6))
+        else:
+            words.extend((i >> 6, q >> 6, i & 0x3F, q & 0x3F))
+    return words
+
+
+def _prepend_zero(codes):
+    if _have_numpy:
+        return np.append(0, codes)
+    return [0] + list(codes)
+
+
+def _interleave(first, second):
+    if _have_numpy:
+        return np.stack((first, second), axis=1).ravel()
+    return [x for pair in zip(first, second) for x in pair]
+
+
+class _TxCapture(object):
+    '''A buffer filling with samples from the AD9361 transmit interface'''
+    def __init__(self, count):
+        self.i = np.empty(count, dtype=np.uint16)
+        self.q = np.empty(count, dtype=np.uint16)
+        self.index = 0
+        self.done = Event("AD9361 tx capture")
+
+    def add(self, i, q):
+        self.i[self.index] = i
+        self.q[self.index] = q
+        self.index += 1
+        if self.index == len(self.i):
+            self.done.set()
+
 
 class AD9361(BusDriver):
     '''
-    classdocs
+    Drives the receive interface of an AD9361 and collects the samples sent
+    on its transmit interface.
+
+    Transmitted samples are queued in lbqi and lbqq to be looped back. The
+    queues grow without bound unless loopback_queue_maxlen is given, in
+    which case the oldest samples are dropped with a warning.
     '''
 
     def __init__(self, dut, rx_channels=1, tx_channels=1,
                  tx_clock_half_period=16276, rx_clock_half_period=16276,
-                 loopback_queue_maxlen=16):
+                 loopback_queue_maxlen=None, chunk_size=4096):
         '''
         Constructor
         '''
         self.dut = dut
+        self.log = SimLog("cocotb.driver.%s" % (self.__class__.__name__))
         self.tx_clock_half_period = tx_clock_half_period
         self.rx_clock_half_period = rx_clock_half_period
+        self.chunk_size = chunk_size
         self.rx_frame_asserted = False
         self.tx_frame_asserted = False
-        self.lbqi = deque()
-        self.lbqq = deque()
+        self.lbqi = deque(maxlen=loopback_queue_maxlen)
+        self.lbqq = deque(maxlen=loopback_queue_maxlen)
+        self._lb_dropped = 0
         cocotb.fork(self._rx_clock())
         self.got_tx = Event("Got tx event")
+        self._tx_running = False
+        self._tx_capture = None
 
     @cocotb.coroutine
     def _rx_clock(self):
@@ -52,142 +125,169 @@ class AD9361(BusDriver):
         cocotb.fork(self.rx_data_to_ad9361(i_data, q_data, i_data2, q_data2,
                     binaryRepresentation))
 
+    @staticmethod
+    def _samples(data):
+        '''Convert a BinaryArray or FixedPointArray of samples to integers
+        in one go rather than per sample'''
+        if isinstance(data, BinaryArray):
+            return data.integer
+        return data
+
+    def _chunks(self, *channels):
+        '''Split the sample sequences of each channel into chunks'''
+        channels = [self._samples(data) for data in channels if data is not None]
+        for start in range(0, len(channels[0]), self.chunk_size):
+            yield tuple(data[start:start + self.chunk_size] for data in channels)
+
     @cocotb.coroutine
     def rx_data_to_ad9361(self, i_data, q_data, i_data2=None, q_data2=None,
                           binaryRepresentation=BinaryRepresentation.TWOS_COMPLEMENT):
-        i_bin_val = BinaryValue(bits=12, bigEndian=False,
-                                binaryRepresentation=binaryRepresentation)
-        q_bin_val = BinaryValue(bits=12, bigEndian=False,
-                                binaryRepresentation=binaryRepresentation)
-        index = 0
-        if i_data2 is None and q_data2 is None:
-            while True:
-                yield RisingEdge(self.dut.rx_clk_in_p)
-                if self.rx_frame_asserted:
-                    self.dut.rx_data_in_p <= i_bin_val[5:0]
-                    self.dut.rx_data_in_n <= ~i_bin_val[5:0]
+        '''Send I and Q samples, given as NumPy arrays, BinaryArrays or
+        lists, for one channel or two'''
+        yield self.rx_stream(self._chunks(i_data, q_data, i_data2, q_data2),
+                             binaryRepresentation)
+
+    @cocotb.coroutine
+    def rx_stream(self, chunks,
+                  binaryRepresentation=BinaryRepresentation.TWOS_COMPLEMENT):
+        '''Send samples from an iterable of (i, q) chunks for one channel or
+        (i, q, i2, q2) chunks for two. Each chunk is converted to the words
+        of every clock edge in one go, so only one chunk at a time needs to
+        be held in memory.'''
+        rising_p = RisingEdge(self.dut.rx_clk_in_p)
+        rising_n = RisingEdge(self.dut.rx_clk_in_n)
+        slot = 0
+        dual = False
+
+        for chunk in chunks:
+            codes = [_sample_codes(data, binaryRepresentation) for data in chunk]
+            dual = len(codes) == 4
+            if dual:
+                i_codes = _interleave(codes[0], codes[2])
+                q_codes = _interleave(codes[1], codes[3])
+                if not slot:
+                    # Two channels start with a sample of zeroes
+                    i_codes = _prepend_zero(i_codes)
+                    q_codes = _prepend_zero(q_codes)
+            else:
+                i_codes, q_codes = codes
+            words = _rx_words(i_codes, q_codes, dual)
+
+            for index in range(0, len(words), 4):
+                # Single channels frame each sample, two channels frame
+                # every other sample
+                frame = 1 if not dual or not slot % 2 else 0
+                slot += 1
+
+                yield rising_p
+                self.dut.rx_data_in_p <= words[index]
+                self.dut.rx_data_in_n <= words[index] ^ 0x3F
+                if not dual:
+                    self.rx_frame_asserted = True
+                self.dut.rx_frame_in_p <= frame
+                self.dut.rx_frame_in_n <= 1 - frame
+                yield rising_n
+                self.dut.rx_data_in_p <= words[index + 1]
+                self.dut.rx_data_in_n <= words[index + 1] ^ 0x3F
+                yield rising_p
+                self.dut.rx_data_in_p <= words[index + 2]
+                self.dut.rx_data_in_n <= words[index + 2] ^ 0x3F
+                if not dual:
                     self.rx_frame_asserted = False
                     self.dut.rx_frame_in_p <= 0
                     self.dut.rx_frame_in_n <= 1
-                else:
-                    if index < len(i_data):
-                        i_bin_val.set_value(i_data[index])
-                        q_bin_val.set_value(q_data[index])
-                        index += 1
-                    else:
-                        return
-                    self.dut.rx_data_in_p <= i_bin_val[11:6]
-                    self.dut.rx_data_in_n <= ~i_bin_val[11:6]
-                    self.rx_frame_asserted = True
-                    self.dut.rx_frame_in_p <= 1
-                    self.dut.rx_frame_in_n <= 0
-                yield RisingEdge(self.dut.rx_clk_in_n)
-                if self.rx_frame_asserted:
-                    self.dut.rx_data_in_p <= q_bin_val[11:6]
-                    self.dut.rx_data_in_n <= ~q_bin_val[11:6]
-                else:
-                    self.dut.rx_data_in_p <= q_bin_val[5:0]
-                    self.dut.rx_data_in_n <= ~q_bin_val[5:0]
-        else:
-            I_SEND_HIGH = True
-            Q_SEND_HIGH = True
-            channel = 1
-            while True:
-                yield RisingEdge(self.dut.rx_clk_in_p)
-                if I_SEND_HIGH:
-                    self.dut.rx_data_in_p <= i_bin_val[11:6]
-                    self.dut.rx_data_in_n <= ~i_bin_val[11:6]
-                    I_SEND_HIGH = False
-                    if channel == 1:
-                        self.dut.rx_frame_in_p <= 1
-                        self.dut.rx_frame_in_n <= 0
-                    elif channel == 2:
-                        self.dut.rx_frame_in_p <= 0
-                        self.dut.rx_frame_in_n <= 1
-                else:
-                    self.dut.rx_data_in_p <= i_bin_val[5:0]
-                    self.dut.rx_data_in_n <= ~i_bin_val[5:0]
-                    I_SEND_HIGH = True
-                yield RisingEdge(self.dut.rx_clk_in_n)
-                if Q_SEND_HIGH:
-                    self.dut.rx_data_in_p <= q_bin_val[5:0]
-                    self.dut.rx_data_in_n <= ~q_bin_val[5:0]
-                    Q_SEND_HIGH = False
-                else:
-                    self.dut.rx_data_in_p <= q_bin_val[11:6]
-                    self.dut.rx_data_in_n <= ~q_bin_val[11:6]
-                    Q_SEND_HIGH = True
-                    if index < len(i_data):
-                        if channel == 1:
-                            i_bin_val.set_value(i_data[index])
-                            q_bin_val.set_value(q_data[index])
-                            channel = 2
-                        elif channel == 2:
-                            i_bin_val.set_value(i_data2[index])
-                            q_bin_val.set_value(q_data2[index])
-                            channel = 1
-                            index += 1
-                    else:
-                        return
+                yield rising_n
+                self.dut.rx_data_in_p <= words[index + 3]
+                self.dut.rx_data_in_n <= words[index + 3] ^ 0x3F
+
+        if not dual:
+            yield rising_p
+
+    def _tx_sample(self, i, q):
+        if len(self.lbqi) == self.lbqi.maxlen:
+            if not self._lb_dropped:
+                self.log.warning("Loopback queue full, dropping the oldest "
+                                 "samples beyond %d" % self.lbqi.maxlen)
+            self._lb_dropped += 1
+        self.lbqi.append(i)
+        self.lbqq.append(q)
+        if self._tx_capture is not None:
+            self._tx_capture.add(i, q)
+        self.got_tx.set([i, q])
 
     @cocotb.coroutine
     def _tx_data_from_ad9361(self):
-        i_bin_val = BinaryValue(bits=12, bigEndian=False)
-        q_bin_val = BinaryValue(bits=12, bigEndian=False)
+        rising_p = RisingEdge(self.dut.tx_clk_out_p)
+        rising_n = RisingEdge(self.dut.tx_clk_out_n)
+        i_val = 0
+        q_val = 0
         while True:
-            yield RisingEdge(self.dut.tx_clk_out_p)
+            yield rising_p
             if self.dut.tx_frame_out_p.value.integer == 1:
-                q_bin_val[11:6] = self.dut.tx_data_out_p.value.get_binstr()
+                q_val = (q_val & 0x3F) | (self.dut.tx_data_out_p.value.integer << 6)
             else:
-                q_bin_val[5:0] = self.dut.tx_data_out_p.value.get_binstr()
-            yield RisingEdge(self.dut.tx_clk_out_n)
+                q_val = (q_val & 0xFC0) | self.dut.tx_data_out_p.value.integer
+            yield rising_n
             if self.dut.tx_frame_out_p.value.integer == 1:
-                i_bin_val[11:6] = self.dut.tx_data_out_p.value.get_binstr()
+                i_val = (i_val & 0x3F) | (self.dut.tx_data_out_p.value.integer << 6)
             else:
-                i_bin_val[5:0] = self.dut.tx_data_out_p.value.get_binstr()
-                # print("i_data",i_bin_val.get_value())
-                # print("q_data",q_bin_val.get_value())
-                self.lbqi.append(i_bin_val)
-                self.lbqq.append(q_bin_val)
-                self.got_tx.set([i_bin_val, q_bin_val])
+                i_val = (i_val & 0xFC0) | self.dut.tx_data_out_p.value.integer
+                self._tx_sample(i_val, q_val)
+
+    def _start_tx(self):
+        if not self._tx_running:
+            self._tx_running = True
+            cocotb.fork(self._tx_data_from_ad9361())
+
+    @cocotb.coroutine
+    def capture_tx(self, count, signed=True):
+        '''Collect the next count samples sent by the AD9361 transmit
+        interface, returning the I and Q samples as NumPy arrays. Long
+        streams can be captured a chunk at a time.'''
+        if not _have_numpy:
+            raise ImportError("NumPy is required to capture tx samples")
+        self._start_tx()
+        capture = _TxCapture(count)
+        self._tx_capture = capture
+        if count:
+            yield capture.done.wait()
+        self._tx_capture = None
+        if signed:
+            raise ReturnValue(((capture.i.astype(np.int16) ^ 0x800) - 0x800,
+                               (capture.q.astype(np.int16) ^ 0x800) - 0x800))
+        raise ReturnValue((capture.i, capture.q))
 
     @cocotb.coroutine
     def _ad9361_tx_to_rx_loopback(self):
-        cocotb.fork(self._tx_data_from_ad9361())
-        i_bin_val = BinaryValue(bits=12, bigEndian=False)
-        q_bin_val = BinaryValue(bits=12, bigEndian=False)
+        self._start_tx()
+        i_val = 0
+        q_val = 0
         while True:
             yield RisingEdge(self.dut.rx_clk_in_p)
             if self.rx_frame_asserted:
-                self.dut.rx_data_in_p <= i_bin_val[5:0]
-                self.dut.rx_data_in_n <= ~i_bin_val[5:0]
+                self.dut.rx_data_in_p <= i_val & 0x3F
+                self.dut.rx_data_in_n <= (i_val & 0x3F) ^ 0x3F
                 self.rx_frame_asserted = False
                 self.dut.rx_frame_in_p <= 0
                 self.dut.rx_frame_in_n <= 1
             else:
-                if len(self.lbqi) > 0:
-                    i_bin_val = self.lbqi.popleft()
-                else:
-                    i_bin_val.set_value(0)
-                if len(self.lbqq) > 0:
-                    q_bin_val = self.lbqq.popleft()
-                else:
-                    q_bin_val.set_value(0)
-                self.dut.rx_data_in_p <= i_bin_val[11:6]
-                self.dut.rx_data_in_n <= ~i_bin_val[11:6]
+                i_val = self.lbqi.popleft() if self.lbqi else 0
+                q_val = self.lbqq.popleft() if self.lbqq else 0
+                self.dut.rx_data_in_p <= i_val >> 6
+                self.dut.rx_data_in_n <= (i_val >> 6) ^ 0x3F
                 self.rx_frame_asserted = True
                 self.dut.rx_frame_in_p <= 1
                 self.dut.rx_frame_in_n <= 0
             yield RisingEdge(self.dut.rx_clk_in_n)
             if self.rx_frame_asserted:
-                self.dut.rx_data_in_p <= q_bin_val[11:6]
-                self.dut.rx_data_in_n <= ~q_bin_val[11:6]
+                self.dut.rx_data_in_p <= q_val >> 6
+                self.dut.rx_data_in_n <= (q_val >> 6) ^ 0x3F
             else:
-                self.dut.rx_data_in_p <= q_bin_val[5:0]
-                self.dut.rx_data_in_n <= ~q_bin_val[5:0]
+                self.dut.rx_data_in_p <= q_val & 0x3F
+                self.dut.rx_data_in_n <= (q_val & 0x3F) ^ 0x3F
 
     def ad9361_tx_to_rx_loopback(self):
         cocotb.fork(self._ad9361_tx_to_rx_loopback())
 
     def tx_data_from_ad9361(self):
-        cocotb.fork(self._tx_data_from_ad9361())
+        self._start_tx()
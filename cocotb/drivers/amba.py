@@ -27,13 +27,16 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
 Drivers for Advanced Microcontroller Bus Architecture
 """
 import cocotb
-from cocotb.triggers import RisingEdge, ReadOnly, Lock
-from cocotb.drivers import BusDriver
+from cocotb.triggers import RisingEdge, ReadOnly, Lock, Event
+from cocotb.drivers import BusDriver, ValidatedBusDriver
+from cocotb.drivers.avalon import packet_beats
 from cocotb.result import ReturnValue
-from cocotb.binary import BinaryValue
+from cocotb.binary import _int_from_bytes, _int_to_bytes
+from cocotb.memory import Memory
 
 import binascii
-import array
+import random
+from collections import deque
 
 
 class AXIProtocolError(Exception):
@@ -181,11 +184,432 @@ class AXI4LiteMaster(BusDriver):
         raise ReturnValue(data)
 
 
+class AXIBurst():
+    FIXED = 0  # Every beat at the same address # noqa
+    INCR  = 1  # Incrementing address # noqa
+    WRAP  = 2  # Incrementing, wrapping at the burst size boundary # noqa
+
+
+def _burst_addresses(address, beats, beat_bytes, burst):
+    """
+    The address of each beat of a burst, checking the AXI4 rules. Only the
+    first beat of an unaligned burst is at an unaligned address.
+    """
+    aligned = address - address % beat_bytes
+    if burst == AXIBurst.INCR:
+        if not 1 <= beats <= 256:
+            raise ValueError("INCR bursts have 1 to 256 beats, not %d" % beats)
+        if (aligned & 0xfff) + beats * beat_bytes > 0x1000:
+            raise ValueError("Burst at 0x%x crosses a 4KB boundary" % address)
+        return [address] + [aligned + beat * beat_bytes for beat in range(1, beats)]
+    if burst == AXIBurst.FIXED:
+        if not 1 <= beats <= 16:
+            raise ValueError("FIXED bursts have 1 to 16 beats, not %d" % beats)
+        return [address] * beats
+    if burst == AXIBurst.WRAP:
+        if beats not in (2, 4, 8, 16):
+            raise ValueError("WRAP bursts have 2, 4, 8 or 16 beats, not %d" % beats)
+        if address != aligned:
+            raise ValueError("WRAP burst address 0x%x isn't aligned to its beats" % address)
+        total = beats * beat_bytes
+        base = address - address % total
+        return [base + (address - base + beat * beat_bytes) % total
+                for beat in range(beats)]
+    raise ValueError("Unknown burst type %r" % burst)
+
+
+class _AXITransaction(object):
+    """A burst waiting for its response"""
+    def __init__(self, address, lanes):
+        self.address = address
+        self.lanes = lanes
+        self.data = []
+        self.resp = 0
+        self.done = Event("AXI4Master transaction")
+
+
+class AXI4Master(BusDriver):
+    """
+    AXI4 Master
+
+    Issues FIXED, INCR and WRAP bursts of up to 256 beats. Each channel is
+    driven by its own coroutine, so any number of bursts can be in flight at
+    once. Responses are matched to bursts in order for each ID, while bursts
+    with different IDs may complete in any order.
+
+    Data is passed as bytes in beat order, starting with the beat at
+    address. Within a beat the first byte goes to the lowest byte lane. For
+    INCR bursts this is ascending address order. FIXED bursts repeat the
+    same address and WRAP bursts wrap back to the start of the burst
+    boundary.
+    """
+    _signals = ["AWVALID", "AWREADY", "AWADDR",            # Write address channel
+                "AWLEN", "AWSIZE", "AWBURST",
+                "WVALID", "WREADY", "WDATA", "WSTRB",      # Write data channel
+                "WLAST",
+                "BVALID", "BREADY", "BRESP",               # Write response channel
+                "ARVALID", "ARREADY", "ARADDR",            # Read address channel
+                "ARLEN", "ARSIZE", "ARBURST",
+                "RVALID", "RREADY", "RDATA", "RRESP",      # Read data channel
+                "RLAST"]
+
+    _optional_signals = ["AWID", "BID", "ARID", "RID",
+                         "AWPROT", "ARPROT", "AWLOCK", "ARLOCK",
+                         "AWCACHE", "ARCACHE", "AWQOS", "ARQOS"]
+
+    def __init__(self, entity, name, clock):
+        BusDriver.__init__(self, entity, name, clock)
+        self.bus_bytes = len(self.bus.WDATA) // 8
+
+        # Drive some sensible defaults (setimmediatevalue to avoid x asserts)
+        self.bus.AWVALID.setimmediatevalue(0)
+        self.bus.WVALID.setimmediatevalue(0)
+        self.bus.ARVALID.setimmediatevalue(0)
+        self.bus.BREADY.setimmediatevalue(1)
+        self.bus.RREADY.setimmediatevalue(1)
+        for signal in ["AWPROT", "ARPROT", "AWLOCK", "ARLOCK",
+                       "AWCACHE", "ARCACHE", "AWQOS", "ARQOS"]:
+            if hasattr(self.bus, signal):
+                getattr(self.bus, signal).setimmediatevalue(0)
+
+        self._aw_queue = deque()
+        self._w_queue = deque()
+        self._ar_queue = deque()
+        self._pending_writes = {}
+        self._pending_reads = {}
+
+        self._aw_event = Event("%s_aw" % name)
+        self._w_event = Event("%s_w" % name)
+        self._ar_event = Event("%s_ar" % name)
+
+        cocotb.fork(self._drive_channel(self._aw_queue, self._aw_event,
+                                        self.bus.AWVALID, self.bus.AWREADY,
+                                        self._drive_aw))
+        cocotb.fork(self._drive_channel(self._w_queue, self._w_event,
+                                        self.bus.WVALID, self.bus.WREADY,
+                                        self._drive_w))
+        cocotb.fork(self._drive_channel(self._ar_queue, self._ar_event,
+                                        self.bus.ARVALID, self.bus.ARREADY,
+                                        self._drive_ar))
+        cocotb.fork(self._write_responses())
+        cocotb.fork(self._read_data())
+
+    def _beats(self, address, length, burst, size):
+        """Work out AxSIZE and the byte lanes of each beat"""
+        beat_bytes = self.bus_bytes if size is None else 1 << size
+        if beat_bytes > self.bus_bytes:
+            raise ValueError("%d byte beats don't fit on a %d byte bus" %
+                             (beat_bytes, self.bus_bytes))
+        if address % beat_bytes:
+            raise ValueError("Address 0x%x isn't aligned to the %d byte beats" % (address, beat_bytes))
+        beats = max(1, (length + beat_bytes - 1) // beat_bytes)
+        addresses = _burst_addresses(address, beats, beat_bytes, burst)
+        lanes = [addr % self.bus_bytes for addr in addresses]
+        return beat_bytes.bit_length() - 1, beat_bytes, lanes
+
+    def _drive_aw(self, entry):
+        address, awlen, awsize, burst, awid = entry
+        self.bus.AWADDR <= address
+        self.bus.AWLEN <= awlen
+        self.bus.AWSIZE <= awsize
+        self.bus.AWBURST <= burst
+        if hasattr(self.bus, "AWID"):
+            self.bus.AWID <= awid
+
+    def _drive_w(self, entry):
+        data, strobe, last = entry
+        self.bus.WDATA <= data
+        self.bus.WSTRB <= strobe
+        self.bus.WLAST <= last
+
+    def _drive_ar(self, entry):
+        address, arlen, arsize, burst, arid = entry
+        self.bus.ARADDR <= address
+        self.bus.ARLEN <= arlen
+        self.bus.ARSIZE <= arsize
+        self.bus.ARBURST <= burst
+        if hasattr(self.bus, "ARID"):
+            self.bus.ARID <= arid
+
+    @cocotb.coroutine
+    def _drive_channel(self, queue, event, valid, ready, drive):
+        """
+        Present each queued entry on a channel until the slave accepts it,
+        back to back while the queue has entries
+        """
+        clock_re = RisingEdge(self.clock)
+
+        while True:
+            if not queue:
+                valid <= 0
+                event.clear()
+                yield event.wait()
+
+            drive(queue.popleft())
+            valid <= 1
+
+            while True:
+                yield ReadOnly()
+                if ready.value:
+                    break
+                yield clock_re
+            yield clock_re
+
+    @cocotb.coroutine
+    def _write_responses(self):
+        clock_re = RisingEdge(self.clock)
+
+        while True:
+            yield ReadOnly()
+            if self.bus.BVALID.value:
+                bid = int(self.bus.BID) if hasattr(self.bus, "BID") else 0
+                if not self._pending_writes.get(bid):
+                    raise AXIProtocolError("Write response for ID %d with no write outstanding" % bid)
+                transaction = self._pending_writes[bid].popleft()
+                transaction.resp = int(self.bus.BRESP)
+                transaction.done.set()
+            yield clock_re
+
+    @cocotb.coroutine
+    def _read_data(self):
+        clock_re = RisingEdge(self.clock)
+
+        while True:
+            yield ReadOnly()
+            if self.bus.RVALID.value:
+                rid = int(self.bus.RID) if hasattr(self.bus, "RID") else 0
+                if not self._pending_reads.get(rid):
+                    raise AXIProtocolError("Read data for ID %d with no read outstanding" % rid)
+                transaction = self._pending_reads[rid][0]
+                transaction.data.append(int(self.bus.RDATA))
+                transaction.resp = max(transaction.resp, int(self.bus.RRESP))
+                if self.bus.RLAST.value:
+                    if len(transaction.data) != len(transaction.lanes):
+                        raise AXIProtocolError("Read of 0x%08x ended after %d of %d beats" %
+                                               (transaction.address, len(transaction.data),
+                                                len(transaction.lanes)))
+                    self._pending_reads[rid].popleft()
+                    transaction.done.set()
+            yield clock_re
+
+    @cocotb.coroutine
+    def write(self, address, data, id=0, burst=AXIBurst.INCR, size=None):
+        """
+        Write a bytes-like object with a single burst.
+
+        Kwargs:
+            id (int): Transaction ID, responses to writes with the same ID
+                      are returned in order
+
+            burst (AXIBurst): Burst type
+
+            size (int): AWSIZE, defaults to the width of the bus
+
+        Returns:
+            BRESP of the burst
+        """
+        data = memoryview(data)
+        awsize, beat_bytes, lanes = self._beats(address, len(data), burst, size)
+
+        transaction = _AXITransaction(address, lanes)
+        self._pending_writes.setdefault(id, deque()).append(transaction)
+        self._aw_queue.append((address, len(lanes) - 1, awsize, burst, id))
+        for beat, lane in enumerate(lanes):
+            chunk = data[beat * beat_bytes:(beat + 1) * beat_bytes]
+            self._w_queue.append((_int_from_bytes(chunk, False) << (8 * lane),
+                                  ((1 << len(chunk)) - 1) << lane,
+                                  int(beat == len(lanes) - 1)))
+        self._aw_event.set()
+        self._w_event.set()
+
+        yield transaction.done.wait()
+
+        if transaction.resp:
+            raise AXIProtocolError("Write to address 0x%08x failed with BRESP: %d"
+                                   % (address, transaction.resp))
+        raise ReturnValue(transaction.resp)
+
+    @cocotb.coroutine
+    def read(self, address, length, id=0, burst=AXIBurst.INCR, size=None):
+        """
+        Read length bytes with a single burst.
+
+        Kwargs:
+            id (int): Transaction ID, data for reads with the same ID is
+                      returned in order
+
+            burst (AXIBurst): Burst type
+
+            size (int): ARSIZE, defaults to the width of the bus
+
+        Returns:
+            The data as bytes
+        """
+        arsize, beat_bytes, lanes = self._beats(address, length, burst, size)
+
+        transaction = _AXITransaction(address, lanes)
+        self._pending_reads.setdefault(id, deque()).append(transaction)
+        self._ar_queue.append((address, len(lanes) - 1, arsize, burst, id))
+        self._ar_event.set()
+
+        yield transaction.done.wait()
+
+        if transaction.resp:
+            raise AXIProtocolError("Read address 0x%08x failed with RRESP: %d" %
+                                   (address, transaction.resp))
+
+        mask = (1 << (8 * beat_bytes)) - 1
+        data = b"".join(_int_to_bytes((word >> (8 * lane)) & mask, beat_bytes, False)
+                        for word, lane in zip(transaction.data, lanes))
+        raise ReturnValue(data[:length])
+
+
+class AXISlaveStatistics(object):
+    """Counters of the traffic handled by an AXI4Slave"""
+    def __init__(self):
+        self.cycles = 0
+        self.reads = 0
+        self.writes = 0
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.max_read_latency = 0
+        self.max_write_latency = 0
+        self._read_latency_total = 0
+        self._write_latency_total = 0
+
+    def _read_done(self, burst):
+        latency = self.cycles - burst.accepted
+        self.reads += 1
+        self.read_bytes += sum(burst.widths)
+        self._read_latency_total += latency
+        self.max_read_latency = max(self.max_read_latency, latency)
+
+    def _write_done(self, burst):
+        latency = self.cycles - burst.accepted
+        self.writes += 1
+        self.write_bytes += sum(burst.widths)
+        self._write_latency_total += latency
+        self.max_write_latency = max(self.max_write_latency, latency)
+
+    @property
+    def mean_read_latency(self):
+        """Average cycles from a read address to the last beat of its data"""
+        if not self.reads:
+            return 0.0
+        return float(self._read_latency_total) / self.reads
+
+    @property
+    def mean_write_latency(self):
+        """Average cycles from a write address to its response"""
+        if not self.writes:
+            return 0.0
+        return float(self._write_latency_total) / self.writes
+
+    @property
+    def read_throughput(self):
+        """Bytes read per cycle"""
+        if not self.cycles:
+            return 0.0
+        return float(self.read_bytes) / self.cycles
+
+    @property
+    def write_throughput(self):
+        """Bytes written per cycle"""
+        if not self.cycles:
+            return 0.0
+        return float(self.write_bytes) / self.cycles
+
+
+class _Throttle(object):
+    """
+    Expands a generator of (on, off) cycle counts, like the valid_generator
+    of a ValidatedBusDriver, into a mask of the cycles allowed to transfer
+    data, a chunk at a time. As there, entries with no on cycles are skipped
+    and every cycle is allowed once it runs out.
+    """
+    def __init__(self, generator, chunk=1024):
+        self.generator = generator
+        self.chunk = chunk
+        self._mask = bytearray()
+        self._index = 0
+
+    def _expand(self):
+        mask = bytearray()
+        while len(mask) < self.chunk:
+            try:
+                on, off = next(self.generator)
+            except StopIteration:
+                self.generator = None
+                break
+            if on:
+                mask += bytearray(b"\x01") * int(on) + bytearray(int(off))
+        self._mask = mask
+        self._index = 0
+
+    def allow(self):
+        """Whether to transfer data on the next cycle"""
+        if self._index >= len(self._mask):
+            if self.generator is None:
+                return True
+            self._expand()
+            if not self._mask:
+                return True
+        allowed = self._mask[self._index]
+        self._index += 1
+        return bool(allowed)
+
+
+class _AXISlaveBurst(object):
+    """
+    A burst accepted by an AXI4Slave. The first beat of an unaligned burst
+    only covers the bytes up to the next aligned address. A burst breaking
+    the AXI4 rules still transfers every beat, without touching the memory,
+    and gets a SLVERR response.
+    """
+    def __init__(self, axid, address, length, size, burst, bus_bytes, accepted):
+        self.id = axid
+        self.address = address
+        self.accepted = accepted
+        self.ready_at = accepted
+        self.beat = 0
+        self.resp = 0
+        self.error = None
+
+        beat_bytes = 1 << size
+        try:
+            if beat_bytes > bus_bytes:
+                raise ValueError("AxSIZE %d is wider than the %d byte bus" % (size, bus_bytes))
+            self.addresses = _burst_addresses(address, length + 1, beat_bytes, burst)
+        except ValueError as e:
+            self.error = str(e)
+            self.resp = 2
+            self.addresses = [None] * (length + 1)
+            self.widths = [0] * (length + 1)
+            self.lanes = [0] * (length + 1)
+            return
+
+        self.widths = [beat_bytes - addr % beat_bytes for addr in self.addresses]
+        self.lanes = [addr % bus_bytes for addr in self.addresses]
+
+
 class AXI4Slave(BusDriver):
     '''
     AXI4 Slave
 
     Monitors an internal memory and handles read and write requests.
+
+    The memory is a cocotb.memory.Memory, which may be shared with other
+    slaves. Any other writable buffer of bytes, such as an array, is used as
+    the backing of a new Memory. Accesses outside a Memory of fixed size get
+    a SLVERR response.
+
+    Each channel is handled by its own coroutine, so up to write_queue_depth
+    writes and read_queue_depth reads are accepted before their data
+    transfers finish. Responses are held back for write_latency or
+    read_latency cycles after the address is accepted, and with reorder set
+    the slave picks at random between bursts of different IDs which are
+    ready. ready_generator and valid_generator yield (on, off) cycle counts
+    that throttle WREADY and RVALID. Counters are kept in stats.
     '''
     _signals = [
         "ARREADY", "ARVALID", "ARADDR",             # Read address channel
@@ -210,131 +634,353 @@ class AXI4Slave(BusDriver):
         "BID",     "RID",     "WID"
     ]
 
-    def __init__(self, entity, name, clock, memory, callback=None, event=None,
-                 big_endian=False):
+    def __init__(self, entity, name, clock, memory=None, callback=None, event=None,
+                 big_endian=False, write_queue_depth=8, read_queue_depth=8,
+                 write_latency=0, read_latency=0, reorder=False,
+                 ready_generator=None, valid_generator=None):
 
         BusDriver.__init__(self, entity, name, clock)
         self.clock = clock
 
-        self.big_endain = big_endian
+        self.big_endian = big_endian
+        self.bus_bytes = len(self.bus.WDATA) // 8
+        self.write_queue_depth = write_queue_depth
+        self.read_queue_depth = read_queue_depth
+        self.write_latency = write_latency
+        self.read_latency = read_latency
+        self.reorder = reorder
+        self.stats = AXISlaveStatistics()
+
         self.bus.ARREADY.setimmediatevalue(1)
         self.bus.RVALID.setimmediatevalue(0)
         self.bus.RLAST.setimmediatevalue(0)
         self.bus.AWREADY.setimmediatevalue(1)
+        self.bus.WREADY.setimmediatevalue(0)
+        if hasattr(self.bus, "BVALID"):
+            self.bus.BVALID.setimmediatevalue(0)
+        if memory is None:
+            memory = Memory()
+        elif not isinstance(memory, Memory):
+            memory = Memory(backing=memory)
         self._memory = memory
 
-        self.write_address_busy = Lock("%s_wabusy" % name)
-        self.read_address_busy = Lock("%s_rabusy" % name)
-        self.write_data_busy = Lock("%s_wbusy" % name)
+        # Writes waiting for data, then for their response to be sent, and
+        # the number being responded to
+        self._write_bursts = deque()
+        self._write_responses = deque()
+        self._writes_active = 0
+        # Reads waiting for their data to be sent, and the number being sent
+        self._read_bursts = deque()
+        self._reads_active = 0
 
-        cocotb.fork(self._read_data())
+        self._ready_throttle = _Throttle(ready_generator)
+        self._valid_throttle = _Throttle(valid_generator)
+
+        cocotb.fork(self._count_cycles())
+        cocotb.fork(self._write_address())
         cocotb.fork(self._write_data())
+        cocotb.fork(self._read_address())
+        cocotb.fork(self._read_data())
+        if hasattr(self.bus, "BVALID"):
+            cocotb.fork(self._write_response())
 
-    def _size_to_bytes_in_beat(self, AxSIZE):
-        if AxSIZE < 7:
-            return 2 ** AxSIZE
-        return None
+    def _select(self, bursts):
+        """
+        Remove and return the next burst to respond to, if one is ready.
+        Bursts with the same ID are always handled in order.
+        """
+        candidates = []
+        seen = set()
+        for burst in bursts:
+            if burst.id in seen:
+                continue
+            seen.add(burst.id)
+            if burst.ready_at <= self.stats.cycles:
+                candidates.append(burst)
+            if not self.reorder:
+                break
+        if not candidates:
+            return None
+        burst = random.choice(candidates) if self.reorder else candidates[0]
+        bursts.remove(burst)
+        return burst
 
     @cocotb.coroutine
-    def _write_data(self):
+    def _count_cycles(self):
         clock_re = RisingEdge(self.clock)
 
         while True:
-            while True:
-                self.bus.WREADY <= 0
-                yield ReadOnly()
-                if self.bus.AWVALID.value:
-                    self.bus.WREADY <= 1
-                    break
-                yield clock_re
-
-            yield ReadOnly()
-            _awaddr = int(self.bus.AWADDR)
-            _awlen = int(self.bus.AWLEN)
-            _awsize = int(self.bus.AWSIZE)
-            _awburst = int(self.bus.AWBURST)
-            _awprot = int(self.bus.AWPROT)
-
-            burst_length = _awlen + 1
-            bytes_in_beat = self._size_to_bytes_in_beat(_awsize)
+            yield clock_re
+            self.stats.cycles += 1
 
-            word = BinaryValue(bits=bytes_in_beat*8, bigEndian=self.big_endain)
+    @cocotb.coroutine
+    def _write_address(self):
+        clock_re = RisingEdge(self.clock)
 
-            if __debug__:
-                self.log.debug(
-                    "AWADDR  %d\n" % _awaddr +
-                    "AWLEN   %d\n" % _awlen +
-                    "AWSIZE  %d\n" % _awsize +
-                    "AWBURST %d\n" % _awburst +
-                    "BURST_LENGTH %d\n" % burst_length +
-                    "Bytes in beat %d\n" % bytes_in_beat)
+        while True:
+            ready = (len(self._write_bursts) + len(self._write_responses) +
+                     self._writes_active < self.write_queue_depth)
+            self.bus.AWREADY <= int(ready)
+            yield ReadOnly()
+            if ready and self.bus.AWVALID.value:
+                awid = int(self.bus.AWID) if hasattr(self.bus, "AWID") else 0
+                burst = _AXISlaveBurst(awid, int(self.bus.AWADDR), int(self.bus.AWLEN),
+                                       int(self.bus.AWSIZE), int(self.bus.AWBURST),
+                                       self.bus_bytes, self.stats.cycles)
+                if burst.error:
+                    self.log.error("Write to 0x%x, ID %d: %s" % (burst.address, awid, burst.error))
+                elif __debug__:
+                    self.log.debug("Write of %d beats to 0x%x, ID %d" %
+                                   (len(burst.addresses), burst.address, awid))
+                self._write_bursts.append(burst)
+            yield clock_re
 
-            burst_count = burst_length
+    @cocotb.coroutine
+    def _write_data(self):
+        clock_re = RisingEdge(self.clock)
 
+        while True:
+            ready = bool(self._write_bursts) and self._ready_throttle.allow()
+            self.bus.WREADY <= int(ready)
+            yield ReadOnly()
+            if ready and self.bus.WVALID.value:
+                burst = self._write_bursts[0]
+                beat = burst.beat
+                lane = burst.lanes[beat]
+                width = burst.widths[beat]
+                strobe = None
+                if hasattr(self.bus, "WSTRB"):
+                    strobe = (int(self.bus.WSTRB) >> lane) & ((1 << width) - 1)
+                if burst.addresses[beat] is not None:
+                    try:
+                        self._memory.write_word(burst.addresses[beat],
+                                                int(self.bus.WDATA) >> (8 * lane), width,
+                                                self.big_endian, strobe)
+                    except IndexError:
+                        burst.resp = 2
+                burst.beat += 1
+                last = burst.beat == len(burst.addresses)
+                if hasattr(self.bus, "WLAST") and bool(self.bus.WLAST.value) != last:
+                    self.log.error("WLAST on beat %d of a %d beat write to 0x%x" %
+                                   (beat + 1, len(burst.addresses), burst.address))
+                    burst.resp = 2
+                if last:
+                    self._write_bursts.popleft()
+                    burst.ready_at = burst.accepted + self.write_latency
+                    if hasattr(self.bus, "BVALID"):
+                        self._write_responses.append(burst)
+                    else:
+                        self.stats._write_done(burst)
             yield clock_re
 
-            while True:
-                if self.bus.WVALID.value:
-                    word = self.bus.WDATA.value
-                    word.big_endian = self.big_endain
-                    _burst_diff = burst_length - burst_count
-                    _st = _awaddr + (_burst_diff * bytes_in_beat)  # start
-                    _end = _awaddr + ((_burst_diff + 1) * bytes_in_beat)  # end
-                    self._memory[_st:_end] = array.array('B', word.get_buff())
-                    burst_count -= 1
-                    if burst_count == 0:
-                        break
-                yield clock_re
-
     @cocotb.coroutine
-    def _read_data(self):
+    def _write_response(self):
         clock_re = RisingEdge(self.clock)
 
         while True:
+            burst = self._select(self._write_responses)
+            if burst is None:
+                self.bus.BVALID <= 0
+                yield clock_re
+                continue
+
+            self._writes_active += 1
+            if hasattr(self.bus, "BID"):
+                self.bus.BID <= burst.id
+            if hasattr(self.bus, "BRESP"):
+                self.bus.BRESP <= burst.resp
+            self.bus.BVALID <= 1
             while True:
                 yield ReadOnly()
-                if self.bus.ARVALID.value:
+                if not hasattr(self.bus, "BREADY") or self.bus.BREADY.value:
                     break
                 yield clock_re
+            yield clock_re
+            self._writes_active -= 1
+            self.stats._write_done(burst)
 
+    @cocotb.coroutine
+    def _read_address(self):
+        clock_re = RisingEdge(self.clock)
+
+        while True:
+            ready = (len(self._read_bursts) + self._reads_active <
+                     self.read_queue_depth)
+            self.bus.ARREADY <= int(ready)
             yield ReadOnly()
-            _araddr = int(self.bus.ARADDR)
-            _arlen = int(self.bus.ARLEN)
-            _arsize = int(self.bus.ARSIZE)
-            _arburst = int(self.bus.ARBURST)
-            _arprot = int(self.bus.ARPROT)
+            if ready and self.bus.ARVALID.value:
+                arid = int(self.bus.ARID) if hasattr(self.bus, "ARID") else 0
+                burst = _AXISlaveBurst(arid, int(self.bus.ARADDR), int(self.bus.ARLEN),
+                                       int(self.bus.ARSIZE), int(self.bus.ARBURST),
+                                       self.bus_bytes, self.stats.cycles)
+                burst.ready_at = burst.accepted + self.read_latency
+                if burst.error:
+                    self.log.error("Read from 0x%x, ID %d: %s" % (burst.address, arid, burst.error))
+                elif __debug__:
+                    self.log.debug("Read of %d beats from 0x%x, ID %d" %
+                                   (len(burst.addresses), burst.address, arid))
+                self._read_bursts.append(burst)
+            yield clock_re
+
+    @cocotb.coroutine
+    def _read_data(self):
+        clock_re = RisingEdge(self.clock)
+
+        while True:
+            burst = self._select(self._read_bursts)
+            if burst is None:
+                self.bus.RVALID <= 0
+                yield clock_re
+                continue
+
+            self._reads_active += 1
+            if hasattr(self.bus, "RID"):
+                self.bus.RID <= burst.id
+            for beat, address in enumerate(burst.addresses):
+                while not self._valid_throttle.allow():
+                    self.bus.RVALID <= 0
+                    yield clock_re
+
+                word, resp = 0, 2
+                if address is not None:
+                    try:
+                        word = self._memory.read_word(address, burst.widths[beat],
+                                                      self.big_endian)
+                        resp = 0
+                    except IndexError:
+                        pass
+                self.bus.RDATA <= word << (8 * burst.lanes[beat])
+                if hasattr(self.bus, "RRESP"):
+                    self.bus.RRESP <= resp
+                self.bus.RLAST <= int(beat == len(burst.addresses) - 1)
+                self.bus.RVALID <= 1
 
-            burst_length = _arlen + 1
-            bytes_in_beat = self._size_to_bytes_in_beat(_arsize)
+                while True:
+                    yield ReadOnly()
+                    if self.bus.RREADY.value:
+                        break
+                    yield clock_re
+                yield clock_re
 
-            word = BinaryValue(bits=bytes_in_beat*8, bigEndian=self.big_endain)
+            self.bus.RLAST <= 0
+            self._reads_active -= 1
+            self.stats._read_done(burst)
 
-            if __debug__:
-                self.log.debug(
-                    "ARADDR  %d\n" % _araddr +
-                    "ARLEN   %d\n" % _arlen +
-                    "ARSIZE  %d\n" % _arsize +
-                    "ARBURST %d\n" % _arburst +
-                    "BURST_LENGTH %d\n" % burst_length +
-                    "Bytes in beat %d\n" % bytes_in_beat)
 
-            burst_count = burst_length
+class AXI4StreamMaster(ValidatedBusDriver):
+    """
+    AXI4-Stream Master
 
-            yield clock_re
+    Sends whole frames. A frame is a bytes-like object, the first byte going
+    in the lowest byte lane with TKEEP marking the bytes of a short last
+    beat, or a NumPy array or sequence with the integer value of each beat.
+    TLAST is asserted on the last beat of each frame.
 
-            while True:
-                self.bus.RVALID <= 1
-                yield ReadOnly()
-                if self.bus.RREADY.value:
-                    _burst_diff = burst_length - burst_count
-                    _st = _araddr + (_burst_diff * bytes_in_beat)
-                    _end = _araddr + ((_burst_diff + 1) * bytes_in_beat)
-                    word.buff = self._memory[_st:_end].tostring()
-                    self.bus.RDATA <= word
-                    if burst_count == 1:
-                        self.bus.RLAST <= 1
-                yield clock_re
-                burst_count -= 1
-                self.bus.RLAST <= 0
-                if burst_count == 0:
-                    break
+    TUSER is driven from frames sent as a tuple of (data, user), user being
+    a single value for every beat or a sequence with one value per beat.
+    """
+    _signals = ["tvalid", "tdata"]
+    _optional_signals = ["tready", "tlast", "tkeep", "tuser"]
+
+    def __init__(self, entity, name, clock, valid_generator=None):
+        ValidatedBusDriver.__init__(self, entity, name, clock,
+                                    valid_generator=valid_generator)
+        self.bus.tvalid.setimmediatevalue(0)
+        if hasattr(self.bus, "tlast"):
+            self.bus.tlast.setimmediatevalue(0)
+
+    def _frame_beats(self, frame):
+        """Convert a frame to the TDATA, TKEEP and TUSER of each beat"""
+        user = None
+        if isinstance(frame, tuple):
+            frame, user = frame
+
+        full_keep = (1 << len(self.bus.tkeep)) - 1 if hasattr(self.bus, "tkeep") else 0
+        keeps = None
+        if isinstance(frame, (str, bytes, bytearray, memoryview)):
+            if len(self.bus.tdata) % 8:
+                raise ValueError("Can't send bytes over %d bit TDATA" % len(self.bus.tdata))
+            bus_bytes = len(self.bus.tdata) // 8
+            words, empty = packet_beats(frame, bus_bytes, big_endian=False)
+            if empty:
+                keeps = [full_keep] * len(words)
+                keeps[-1] = (1 << (bus_bytes - empty)) - 1
+        elif hasattr(frame, "tolist"):
+            words = frame.tolist()
+        else:
+            words = [int(word) for word in frame]
+        if not words:
+            raise ValueError("Can't send an empty frame")
+
+        if user is None:
+            users = None
+        elif not hasattr(user, "__len__"):
+            users = [int(user)] * len(words)
+        else:
+            users = user.tolist() if hasattr(user, "tolist") else list(user)
+            if len(users) != len(words):
+                raise ValueError("%d TUSER values for a frame of %d beats" %
+                                 (len(users), len(words)))
+        return words, keeps or [full_keep] * len(words), users
+
+    @cocotb.coroutine
+    def _wait_ready(self):
+        """Wait for a ready cycle on the bus before continuing"""
+        yield ReadOnly()
+        while not self.bus.tready.value:
+            yield RisingEdge(self.clock)
+            yield ReadOnly()
+
+    @cocotb.coroutine
+    def _driver_send(self, frame, sync=True):
+        """Send a frame over the bus
+
+        Args:
+            frame (bytes, NumPy array, sequence or tuple): frame to drive
+                                                           onto the bus
+        """
+        clkedge = RisingEdge(self.clock)
+
+        # The whole frame is converted up front so each cycle only writes
+        # integers
+        words, keeps, users = self._frame_beats(frame)
+        last = len(words) - 1
+        has_keep = hasattr(self.bus, "tkeep")
+        has_last = hasattr(self.bus, "tlast")
+        has_user = users is not None and hasattr(self.bus, "tuser")
+        has_ready = hasattr(self.bus, "tready")
+
+        for index, word in enumerate(words):
+            if index or sync:
+                yield clkedge
+
+            # Insert a gap where valid is low
+            if not self.on:
+                self.bus.tvalid <= 0
+                for i in range(self.off):
+                    yield clkedge
+
+                # Grab the next set of on/off values
+                self._next_valids()
+
+            # Consume a valid cycle
+            if self.on is not True and self.on:
+                self.on -= 1
+
+            self.bus.tdata <= word
+            if has_keep:
+                self.bus.tkeep <= keeps[index]
+            if has_last:
+                self.bus.tlast <= int(index == last)
+            if has_user:
+                self.bus.tuser <= users[index]
+            self.bus.tvalid <= 1
+
+            if has_ready:
+                yield self._wait_ready()
+
+        yield clkedge
+        self.bus.tvalid <= 0
+        if has_last:
+            self.bus.tlast <= 0
+        self.log.debug("Sent a frame of %d beats" % len(words))
@@ -32,16 +32,64 @@ See http://www.altera.co.uk/literature/manual/mnl_avalon_spec.pdf
 NB Currently we only support a very small subset of functionality
 """
 import random
+from collections import deque
 
 import cocotb
 from cocotb.decorators import coroutine
 from cocotb.triggers import RisingEdge, FallingEdge
 from cocotb.triggers import ReadOnly, NextTimeStep, Event
 from cocotb.drivers import BusDriver, ValidatedBusDriver
-from cocotb.utils import hexdump
-from cocotb.binary import BinaryValue
+from cocotb.utils import hexdump, get_sim_time
+from cocotb.binary import BinaryValue, _int_from_bytes, _int_to_bytes
+from cocotb.memory import Memory
 from cocotb.result import ReturnValue, TestError
 
+try:
+    import numpy as np
+    _have_numpy = True
+except ImportError:
+    _have_numpy = False
+
+
+def packet_beats(data, bus_width, big_endian=True):
+    """Split a packet into the data words of a bus bus_width bytes wide
+
+    Args:
+        data (bytes, bytearray, memoryview or str): the packet
+
+        bus_width (int): bytes per word
+
+        big_endian (bool): the first byte of each word is its most
+                           significant, as for firstSymbolInHighOrderBits
+
+    Returns:
+        The integer value of each word and the number of empty symbols in
+        the last word
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        data = data.encode("latin-1")
+    data = memoryview(data)
+    if data.itemsize != 1:
+        data = memoryview(data.tobytes())
+
+    length = len(data)
+    full = length - length % bus_width
+
+    # Whole words are converted together where NumPy has a matching type
+    if _have_numpy and bus_width in (1, 2, 4, 8):
+        dtype = np.dtype("%su%d" % (">" if big_endian else "<", bus_width))
+        words = np.frombuffer(data[:full], dtype=dtype).tolist()
+    else:
+        words = [_int_from_bytes(data[offset:offset + bus_width], big_endian)
+                 for offset in range(0, full, bus_width)]
+    empty = (bus_width - length % bus_width) % bus_width
+    if empty:
+        # The symbols of a short last word stay in their usual lanes
+        last = _int_from_bytes(data[full:], big_endian)
+        words.append(last << (8 * empty) if big_endian else last)
+
+    return words, empty
+
 
 class AvalonMM(BusDriver):
     """Avalon-MM Driver
@@ -56,7 +104,7 @@ class AvalonMM(BusDriver):
     _signals = ["address"]
     _optional_signals = ["readdata", "read", "write", "waitrequest",
                          "writedata", "readdatavalid", "byteenable",
-                         "cs"]
+                         "cs", "burstcount"]
 
 
     def __init__(self, entity, name, clock):
@@ -93,21 +141,46 @@ class AvalonMM(BusDriver):
         pass
 
 
+class _AvalonRead(object):
+    """A read command waiting for its data"""
+    def __init__(self, count):
+        self.count = count
+        self.data = []
+        self.done = Event("AvalonMaster read")
+
+
 class AvalonMaster(AvalonMM):
     """Avalon-MM master
+
+    With max_pending_reads greater than 1 reads are pipelined. The bus is
+    released as soon as the slave accepts a read command so further commands
+    can be issued while up to max_pending_reads reads wait for their data,
+    which is matched to them in order as readdatavalid is asserted.
+
+    read_burst and write_burst transfer byte buffers with a single command
+    on slaves with a burstcount signal.
     """
-    def __init__(self, entity, name, clock):
+    def __init__(self, entity, name, clock, max_pending_reads=1):
         AvalonMM.__init__(self, entity, name, clock)
         self.log.debug("AvalonMaster created")
         self.busy_event = Event("%s_busy" % name)
         self.busy = False
+        self.max_pending_reads = max_pending_reads
+        self._pending_reads = deque()
+        self._read_slot_free = Event("%s_read_slot" % name)
+        self._collector = None
+        self._accepted_at = None
+
+        if hasattr(self.bus, "burstcount"):
+            self.bus.burstcount.setimmediatevalue(1)
 
     def __len__(self):
         return 2**len(self.bus.address)
 
     @coroutine
     def _acquire_lock(self):
-        if self.busy:
+        # Every waiter wakes when the lock is released, only the first takes it
+        while self.busy:
             yield self.busy_event.wait()
         self.busy_event.clear()
         self.busy = True
@@ -116,6 +189,140 @@ class AvalonMaster(AvalonMM):
         self.busy = False
         self.busy_event.set()
 
+    @coroutine
+    def _start_command(self, address, sync, burstcount=None):
+        """Drive the common signals of a command, on the edge at which the
+        previous command was accepted if there is no gap since"""
+        if sync and get_sim_time() != self._accepted_at:
+            yield RisingEdge(self.clock)
+        self.bus.address <= address
+        if hasattr(self.bus, "byteenable"):
+            self.bus.byteenable <= int("1"*len(self.bus.byteenable), 2)
+        if hasattr(self.bus, "cs"):
+            self.bus.cs <= 1
+        if burstcount is not None:
+            self.bus.burstcount <= burstcount
+
+    @coroutine
+    def _accept(self):
+        """Wait for the edge at which the slave accepts the command"""
+        if hasattr(self.bus, "waitrequest"):
+            yield self._wait_for_nsignal(self.bus.waitrequest)
+        yield RisingEdge(self.clock)
+        self._accepted_at = get_sim_time()
+
+    def _end_command(self):
+        """Return the bus to idle, a command issued on this edge overrides
+        these values"""
+        if hasattr(self.bus, "byteenable"):
+            self.bus.byteenable <= 0
+        if hasattr(self.bus, "cs"):
+            self.bus.cs <= 0
+        if hasattr(self.bus, "burstcount"):
+            self.bus.burstcount <= 1
+        v = self.bus.address.value
+        v.binstr = "x" * len(self.bus.address)
+        self.bus.address <= v
+
+    @coroutine
+    def _collect_reads(self):
+        """Hand the data of each cycle with readdatavalid to the oldest
+        pending read"""
+        edge = RisingEdge(self.clock)
+        readonly = ReadOnly()
+        while True:
+            yield edge
+            yield readonly
+            if self._pending_reads and int(self.bus.readdatavalid):
+                pending = self._pending_reads[0]
+                pending.data.append(self.bus.readdata.value)
+                if len(pending.data) == pending.count:
+                    self._pending_reads.popleft()
+                    pending.done.set()
+                    self._read_slot_free.set()
+
+    @coroutine
+    def _pipelined_read(self, address, count, sync=True):
+        """Issue a read command for count words and return their values
+        once they have all arrived"""
+        if not self._can_read:
+            self.log.error("Cannot read - have no read signal")
+            raise TestError("Attempt to read on a write-only AvalonMaster")
+        if not hasattr(self.bus, "readdatavalid"):
+            raise TestError("Pipelined and burst reads need a readdatavalid signal")
+        if self._collector is None:
+            self._collector = cocotb.fork(self._collect_reads())
+
+        yield self._acquire_lock()
+        while len(self._pending_reads) >= max(1, self.max_pending_reads):
+            self._read_slot_free.clear()
+            yield self._read_slot_free.wait()
+
+        yield self._start_command(address, sync,
+                                  burstcount=count if hasattr(self.bus, "burstcount") else None)
+        self.bus.read <= 1
+        yield self._accept()
+
+        pending = _AvalonRead(count)
+        self._pending_reads.append(pending)
+        self.bus.read <= 0
+        self._end_command()
+        self._release_lock()
+
+        if not pending.done.fired:
+            yield pending.done.wait()
+        raise ReturnValue(pending.data)
+
+    @coroutine
+    def read_burst(self, address, count, sync=True):
+        """
+        Read count words with a single burst command.
+
+        Returns:
+            The words as bytes, the first symbol of each word being in its
+            least significant byte
+        """
+        if not hasattr(self.bus, "burstcount"):
+            raise TestError("Burst reads need a burstcount signal")
+        word_bytes = len(self.bus.readdata) // 8
+        values = yield self._pipelined_read(address, count, sync)
+        raise ReturnValue(b"".join(_int_to_bytes(value.integer, word_bytes, False)
+                                   for value in values))
+
+    @coroutine
+    def write_burst(self, address, data, sync=True):
+        """
+        Write a bytes-like object with a single burst command, the first
+        symbol of each word being in its least significant byte. The length
+        must be a whole number of words.
+        """
+        if not self._can_write:
+            self.log.error("Cannot write - have no write signal")
+            raise TestError("Attempt to write on a read-only AvalonMaster")
+        if not hasattr(self.bus, "burstcount"):
+            raise TestError("Burst writes need a burstcount signal")
+        word_bytes = len(self.bus.writedata) // 8
+        if len(data) % word_bytes:
+            raise ValueError("Burst of %d bytes isn't a whole number of %d byte words" %
+                             (len(data), word_bytes))
+        words, _ = packet_beats(data, word_bytes, big_endian=False)
+        if not words:
+            return
+
+        yield self._acquire_lock()
+        yield self._start_command(address, sync, burstcount=len(words))
+        self.bus.write <= 1
+        for word in words:
+            self.bus.writedata <= word
+            yield self._accept()
+
+        self.bus.write <= 0
+        self._end_command()
+        v = self.bus.writedata.value
+        v.binstr = "x" * len(self.bus.writedata)
+        self.bus.writedata <= v
+        self._release_lock()
+
     @coroutine
     def read(self, address, sync=True):
         """
@@ -124,6 +331,10 @@ class AvalonMaster(AvalonMM):
         but syntactically it blocks.
         See http://www.altera.com/literature/manual/mnl_avalon_spec_1_3.pdf
         """
+        if self.max_pending_reads > 1:
+            values = yield self._pipelined_read(address, 1, sync)
+            raise ReturnValue(values[0])
+
         if not self._can_read:
             self.log.error("Cannot read - have no read signal")
             raise TestError("Attempt to read on a write-only AvalonMaster")
@@ -217,9 +428,68 @@ class AvalonMaster(AvalonMM):
         self._release_lock()
 
 
+class _DictMemory(Memory):
+    """
+    A Memory reading and writing through to a dict of byte address to byte
+    value, so the dict stays the back door to the contents.
+
+    Older versions kept whole words under the address of single accesses,
+    values which don't fit in a byte raise a ValueError rather than being
+    read back wrongly.
+    """
+    def __init__(self, contents):
+        Memory.__init__(self)
+        self.contents = contents
+        for addr, value in contents.items():
+            self._check_byte(addr, value)
+
+    @staticmethod
+    def _check_byte(addr, value):
+        if not 0 <= value <= 0xFF:
+            raise ValueError("Memory dict holds 0x%x at address 0x%x but only holds "
+                             "one byte per address" % (value, addr))
+
+    def read(self, addr, length):
+        self._check(addr, length)
+        result = bytearray(length)
+        uninitialised = False
+        for pos in range(length):
+            value = self.contents.get(addr + pos)
+            if value is None:
+                result[pos] = self.fill
+                uninitialised = True
+            else:
+                self._check_byte(addr + pos, value)
+                result[pos] = value
+        if uninitialised:
+            self.uninitialised_reads += 1
+        return bytes(result)
+
+    def write(self, addr, data):
+        data = bytearray(memoryview(data).tobytes())
+        self._check(addr, len(data))
+        for pos, value in enumerate(data):
+            self.contents[addr + pos] = value
+
+    def is_initialised(self, addr, length=1):
+        self._check(addr, length)
+        return all(addr + pos in self.contents for pos in range(length))
+
+    @property
+    def allocated(self):
+        return len(self.contents)
+
+
 class AvalonMemory(BusDriver):
     """
     Emulate a memory, with back-door access
+
+    The contents are held in a cocotb.memory.Memory, addressed in bytes with
+    the first byte of each word in its least significant lane. Passing the
+    same Memory to several instances models a multi-port memory. A dict of
+    byte values is also accepted, which bus accesses read and write directly,
+    so instances given the same dict share it too. Each key is the address
+    of a single byte, a ValueError is raised for a value wider than a byte.
     """
     _signals = ["address"]
     _optional_signals = ["write", "read", "writedata", "readdatavalid",
@@ -269,9 +539,11 @@ class AvalonMemory(BusDriver):
         if not self._readable and not self._writeable:
             raise TestError("Attempt to instantiate useless memory")
 
-        # Allow dual port RAMs by referencing the same dictionary
+        # Allow dual port RAMs by referencing the same memory
         if memory is None:
-            self._mem = {}
+            self._mem = Memory()
+        elif isinstance(memory, dict):
+            self._mem = _DictMemory(memory)
         else:
             self._mem = memory
 
@@ -350,11 +622,8 @@ class AvalonMemory(BusDriver):
     def _writing_byte_value(self, byteaddr):
         """Writing value in _mem with byteaddr size """
         yield FallingEdge(self.clock)
-        for i in range(self.dataByteSize):
-            data = self.bus.writedata.value.integer
-            addrtmp = byteaddr + i
-            datatmp = (data >> (i*8)) & 0xff
-            self._mem[addrtmp] = datatmp
+        self._mem.write_word(byteaddr, self.bus.writedata.value.integer,
+                             self.dataByteSize, big_endian=False)
 
     @coroutine
     def _waitrequest(self):
@@ -388,14 +657,16 @@ class AvalonMemory(BusDriver):
                 if not self._burstread:
                     self._pad()
                     addr = self.bus.address.value.integer
-                    if addr not in self._mem:
+                    if not self._mem.is_initialised(addr, self.dataByteSize):
                         self.log.warning("Attempt to read from uninitialised "
                                          "address 0x%x" % addr)
+                        self._mem.uninitialised_reads += 1
                         self._responses.append(True)
                     else:
+                        value = self._mem.read_word(addr, self.dataByteSize, big_endian=False)
                         self.log.debug("Read from address 0x%x returning 0x%x" %
-                                       (addr, self._mem[addr]))
-                        self._responses.append(self._mem[addr])
+                                       (addr, value))
+                        self._responses.append(value)
                 else:
                     addr = self.bus.address.value.integer
                     if addr % self.dataByteSize != 0:
@@ -425,17 +696,17 @@ class AvalonMemory(BusDriver):
                     for i in range(self._avalon_properties["readLatency"]):
                         yield edge
                     for count in range(burstcount):
-                        if (addr + count)*self.dataByteSize not in self._mem:
+                        byteaddr = (addr + count)*self.dataByteSize
+                        if not self._mem.is_initialised(byteaddr, self.dataByteSize):
                             self.log.warning(
                                    "Attempt to burst read from uninitialised " +
                                    "address 0x%x (addr 0x%x count 0x%x)" %
-                                    ((addr + count)*self.dataByteSize, addr, count) )
+                                    (byteaddr, addr, count) )
+                            self._mem.uninitialised_reads += 1
                             self._responses.append(True)
                         else:
-                            value = 0
-                            for i in range(self.dataByteSize):
-                                rvalue = self._mem[(addr + count)*self.dataByteSize + i]
-                                value += rvalue << i*8
+                            value = self._mem.read_word(byteaddr, self.dataByteSize,
+                                                        big_endian=False)
                             self.log.debug("Read from address 0x%x returning 0x%x" %
                                            ((addr + count)*self.dataByteSize, value))
                             self._responses.append(value)
@@ -446,32 +717,14 @@ class AvalonMemory(BusDriver):
                 if not self._burstwrite:
                     addr = self.bus.address.value.integer
                     data = self.bus.writedata.value.integer
+                    byteenable = None
                     if hasattr(self.bus, "byteenable"):
                         byteenable = int(self.bus.byteenable.value)
-                        mask = 0
-                        oldmask = 0
-                        olddata=  0
-                        if (addr in self._mem):
-                            olddata = self._mem[addr]
-                        self.log.debug("Old Data  : %x" % olddata)
-                        self.log.debug("Data in   : %x" % data)
-                        self.log.debug("Width     : %d" % self._width)
                         self.log.debug("Byteenable: %x" % byteenable)
-                        for i in range(self._width/8):
-                            if (byteenable & 2**i):
-                                mask |= 0xFF << (8*i)
-                            else:
-                                oldmask |= 0xFF << (8*i)
-
-                        self.log.debug("Data mask : %x" % mask)
-                        self.log.debug("Old mask  : %x" % oldmask)
-
-                        data = (data & mask) | (olddata & oldmask)
-
-                        self.log.debug("Data out  : %x" % data)
 
                     self.log.debug("Write to address 0x%x -> 0x%x" % (addr, data))
-                    self._mem[addr] = data
+                    self._mem.write_word(addr, data, self.dataByteSize,
+                                         big_endian=False, byteenable=byteenable)
                 else:
                     self.log.debug("writing burst")
                     # maintain waitrequest high randomly
@@ -559,13 +812,15 @@ class AvalonSTPkts(ValidatedBusDriver):
         """
         # Avoid spurious object creation by recycling
         clkedge = RisingEdge(self.clock)
-        firstword = True
 
         # FIXME busses that aren't integer numbers of bytes
         bus_width = int(len(self.bus.data) / 8)
 
-        word = BinaryValue(bits=len(self.bus.data),
-                           bigEndian=self.config['firstSymbolInHighOrderBits'])
+        # The whole packet is converted up front so each cycle only writes
+        # integers
+        words, empty_symbols = packet_beats(string, bus_width,
+                                            self.config['firstSymbolInHighOrderBits'])
+        last = len(words) - 1
 
         empty  = BinaryValue(bits=len(self.bus.empty), bigEndian=False)
         single = BinaryValue(bits=1, bigEndian=False)
@@ -579,8 +834,8 @@ class AvalonSTPkts(ValidatedBusDriver):
         if hasattr(self.bus, 'error'):
             self.bus.error <= 0
 
-        while string:
-            if not firstword or (firstword and sync):
+        for index, data in enumerate(words):
+            if index or sync:
                 yield clkedge
 
             # Insert a gap where valid is low
@@ -598,25 +853,17 @@ class AvalonSTPkts(ValidatedBusDriver):
 
             self.bus.valid <= 1
 
-            if firstword:
+            if index == 0:
                 #self.bus.empty <= 0
                 self.bus.startofpacket <= 1
-                firstword = False
-            else:
+            elif index == 1:
                 self.bus.startofpacket <= 0
 
-            nbytes = min(len(string), bus_width)
-            data = string[:nbytes]
-            word.buff = data
-
-            if len(string) <= bus_width:
+            if index == last:
                 self.bus.endofpacket <= 1
-                self.bus.empty <= bus_width - len(string)
-                string = ""
-            else:
-                string = string[bus_width:]
+                self.bus.empty <= empty_symbols
 
-            self.bus.data <= word
+            self.bus.data <= data
 
             # If this is a bus with a ready signal, wait for this word to
             # be acknowledged
@@ -626,10 +873,9 @@ class AvalonSTPkts(ValidatedBusDriver):
         yield clkedge
         self.bus.valid <= 0
         self.bus.endofpacket <= 0
-        word.binstr   = ("x"*len(self.bus.data))
         empty.binstr  = ("x"*len(self.bus.empty))
         single.binstr = ("x")
-        self.bus.data <= word
+        self.bus.data <= BinaryValue("x"*len(self.bus.data))
         self.bus.empty <= empty
         self.bus.startofpacket <= single
         self.bus.endofpacket <= single
@@ -681,9 +927,10 @@ class AvalonSTPkts(ValidatedBusDriver):
         """Send a packet over the bus
 
         Args:
-            pkt (str or iterable): packet to drive onto the bus
+            pkt (str, bytes or iterable): packet to drive onto the bus
 
-        If pkt is a string, we simply send it word by word
+        If pkt is a string or bytes-like object such as a bytearray or
+        memoryview, we simply send it word by word
 
         If pkt is an iterable, it's assumed to yield objects with attributes
         matching the signal names
@@ -692,9 +939,10 @@ class AvalonSTPkts(ValidatedBusDriver):
         # Avoid spurious object creation by recycling
 
 
-        if isinstance(pkt, str):
+        if isinstance(pkt, (str, bytes, bytearray, memoryview)):
             self.log.debug("Sending packet of length %d bytes" % len(pkt))
-            self.log.debug(hexdump(pkt))
+            if isinstance(pkt, str):
+                self.log.debug(hexdump(pkt))
             yield self._send_string(pkt, sync=sync)
             self.log.info("Sucessfully sent packet of length %d bytes" % len(pkt))
         else:
@@ -29,6 +29,7 @@ Drivers for XGMII
 
 import struct
 import zlib
+from collections import OrderedDict
 
 import cocotb
 from cocotb.triggers import RisingEdge
@@ -78,7 +79,7 @@ class _XGMIIBus(object):
         """
 
         self._value = BinaryValue(bits=nbytes*9, bigEndian=False)
-        self._integer = long(0)
+        self._integer = 0
         self._interleaved = interleaved
         self._nbytes = nbytes
 
@@ -114,19 +115,68 @@ class _XGMIIBus(object):
         NB clears the value
         """
         self._value.integer = self._integer
-        self._integer = long(0)
+        self._integer = 0
         return self._value
 
     def __len__(self):
         return self._nbytes
 
 
+def _encode_frame(packet, nbytes, interleaved=True):
+    """
+    Encode an Ethernet packet as the bus words of a whole XGMII frame.
+
+    The packet is padded to 60 bytes and framed with the start, preamble,
+    CRC and terminate, the lanes after the terminate being idle.
+
+    Args:
+        packet (bytearray): Ethernet packet without its CRC
+
+        nbytes (int):       The number of bytes transferred per clock cycle
+
+    Kwargs:
+        interleaved (bool): The arrangement of control bits on the bus, as
+                            for _XGMIIBus
+
+    Returns:
+        A list of integers, one per clock cycle
+    """
+    if len(packet) < 60:
+        packet = packet + bytearray(60 - len(packet))
+    crc = bytearray(struct.pack("<I", zlib.crc32(bytes(packet)) & 0xFFFFFFFF))
+    frame = bytearray(map(ord, _PREAMBLE_SFD)) + packet + crc
+
+    # Each lane as a 9 bit symbol with the control flag in the top bit
+    symbols = [0x100 | ord(_XGMII_START)]
+    symbols.extend(frame)
+    symbols.append(0x100 | ord(_XGMII_TERMINATE))
+    symbols.extend([0x100 | ord(_XGMII_IDLE)] * (-len(symbols) % nbytes))
+
+    words = []
+    for offset in range(0, len(symbols), nbytes):
+        word = 0
+        ctrl = 0
+        for lane in range(nbytes):
+            symbol = symbols[offset + lane]
+            if interleaved:
+                word |= symbol << (9 * lane)
+            else:
+                word |= (symbol & 0xFF) << (8 * lane)
+                ctrl |= (symbol >> 8) << lane
+        words.append(word | (ctrl << (8 * nbytes)))
+    return words
+
+
 class XGMII(Driver):
     """
     XGMII driver
+
+    Each frame is encoded to the bus words of every cycle before it is sent.
+    With cache_size set the encodings of the most recently sent packets are
+    kept, so repeated packets are only encoded once.
     """
 
-    def __init__(self, signal, clock, interleaved=True):
+    def __init__(self, signal, clock, interleaved=True, cache_size=0):
         """
         Args:
             signal (SimHandle):         The xgmii data bus
@@ -138,6 +188,8 @@ class XGMII(Driver):
             interleaved (bool:          Whether control bits are interleaved
                                         with the data bytes or not.
 
+            cache_size (int):           The number of frame encodings to keep
+
         If interleaved the bus is
             byte0, byte0_control, byte1, byte1_control ....
 
@@ -148,7 +200,14 @@ class XGMII(Driver):
         self.log = signal._log
         self.signal = signal
         self.clock = clock
-        self.bus = _XGMIIBus(len(signal)/9, interleaved=interleaved)
+        self.bus = _XGMIIBus(len(signal)//9, interleaved=interleaved)
+        self.interleaved = interleaved
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+        for i in range(len(self.bus)):
+            self.bus[i] = (_XGMII_IDLE, True)
+        self._idle_word = self.bus.value.integer
         Driver.__init__(self)
 
     @staticmethod
@@ -166,9 +225,7 @@ class XGMII(Driver):
 
     def idle(self):
         """Helper to set bus to IDLE state"""
-        for i in range(len(self.bus)):
-            self.bus[i] = (_XGMII_IDLE, True)
-        self.signal <= self.bus.value
+        self.signal <= self._idle_word
 
     def terminate(self, index):
         """Helper function to terminate from a provided lane index"""
@@ -179,14 +236,35 @@ class XGMII(Driver):
             for rem in range(index + 1, len(self.bus)):
                 self.bus[rem] = (_XGMII_IDLE, True)
 
+    def encode(self, pkt):
+        """Get the bus words of each cycle of a frame carrying a packet
+
+        Args:
+            pkt (str, bytes or bytearray): Ethernet packet without its CRC
+        """
+        if isinstance(pkt, str) and not isinstance(pkt, bytes):
+            pkt = pkt.encode("latin-1")
+        pkt = bytes(bytearray(pkt))
+
+        # Reinserting a cached frame keeps the most recently used at the end
+        words = self._cache.pop(pkt, None)
+        if words is None:
+            words = _encode_frame(bytearray(pkt), len(self.bus), self.interleaved)
+        if self.cache_size:
+            self._cache[pkt] = words
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return words
+
     @cocotb.coroutine
     def _driver_send(self, pkt, sync=True):
         """Send a packet over the bus
 
         Args:
-            pkt (str): Ethernet packet to drive onto the bus
+            pkt (str, bytes or bytearray): Ethernet packet to drive onto the
+                                           bus
         """
-        pkt = self.layer1(str(pkt))
+        words = self.encode(pkt)
 
         self.log.debug("Sending packet of length %d bytes" % len(pkt))
         self.log.debug(hexdump(pkt))
@@ -195,34 +273,8 @@ class XGMII(Driver):
         if sync:
             yield clkedge
 
-        self.bus[0] = (_XGMII_START, True)
-
-        for i in range(1, len(self.bus)):
-            self.bus[i] = (pkt[i-1], False)
-
-        pkt = pkt[len(self.bus)-1:]
-        self.signal <= self.bus.value
-        yield clkedge
-
-        done = False
-
-        while pkt:
-
-            for i in range(len(self.bus)):
-                if i == len(pkt):
-                    self.terminate(i)
-                    pkt = ""
-                    done = True
-                    break
-                self.bus[i] = (pkt[i], False)
-
-            self.signal <= self.bus.value
-            yield clkedge
-            pkt = pkt[len(self.bus):]
-
-        if not done:
-            self.terminate(0)
-            self.signal <= self.bus.value
+        for word in words:
+            self.signal <= word
             yield clkedge
 
         self.idle()
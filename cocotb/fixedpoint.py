@@ -0,0 +1,297 @@
+''' Copyright (c) 2013 Potential Ventures Ltd
+Copyright (c) 2013 SolarFlare Communications Inc
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of Potential Ventures Ltd,
+      SolarFlare Communications Inc nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL POTENTIAL VENTURES LTD BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
+
+"""
+Fixed point numbers in Qm.n format.
+
+m is the number of integer bits, including the sign bit of signed values,
+and n the number of fractional bits, so Q1.15 is a 16 bit signed value
+covering [-1.0, 1.0).
+"""
+
+import math
+
+from cocotb.binary import BinaryValue, BinaryArray, BinaryRepresentation, _have_numpy
+
+if _have_numpy:
+    import numpy as np
+
+
+class FixedPointRounding():
+    TRUNCATE      = 0  # Towards minus infinity, dropping the extra bits # noqa
+    ROUND_HALF_UP = 1  # To nearest, halves towards plus infinity # noqa
+    CONVERGENT    = 2  # To nearest, halves to the even neighbour # noqa
+
+
+class FixedPointOverflow():
+    SATURATE = 0  # Clamp to the most positive or negative value # noqa
+    WRAP     = 1  # Keep the low bits as the hardware would # noqa
+    ERROR    = 2  # Raise an OverflowError # noqa
+
+
+def _limits(int_bits, frac_bits, signed):
+    """The smallest and largest integer encodings of a format"""
+    bits = int_bits + frac_bits
+    if bits < 1:
+        raise ValueError("Fixed point format Q%d.%d has no bits" % (int_bits, frac_bits))
+    if signed:
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+    return 0, (1 << bits) - 1
+
+
+def _quantise(real, frac_bits, rounding):
+    """Scale a real number by 2**frac_bits and round it to an integer"""
+    scaled = math.ldexp(real, frac_bits)
+    if rounding == FixedPointRounding.TRUNCATE:
+        return int(math.floor(scaled))
+    if rounding == FixedPointRounding.ROUND_HALF_UP:
+        return int(math.floor(scaled + 0.5))
+    if rounding == FixedPointRounding.CONVERGENT:
+        result = math.floor(scaled)
+        remainder = scaled - result
+        if remainder > 0.5 or (remainder == 0.5 and result % 2):
+            result += 1
+        return int(result)
+    raise ValueError("Unknown rounding mode %r" % rounding)
+
+
+class FixedPointValue(BinaryValue):
+    """A BinaryValue holding a real number in Qm.n format.
+
+    It can be assigned to a handle like any other BinaryValue:
+
+    >>> val = FixedPointValue(-0.375, int_bits=1, frac_bits=7)
+    >>> val.binstr
+    '11010000'
+    >>> val.real
+    -0.375
+    >>> FixedPointValue(3.0, int_bits=1, frac_bits=7).real
+    0.9921875
+
+    """
+    def __init__(self, value=None, int_bits=1, frac_bits=15, signed=True,
+                 rounding=FixedPointRounding.ROUND_HALF_UP,
+                 overflow=FixedPointOverflow.SATURATE, bigEndian=False):
+        """
+        Kwagrs:
+            value (float): Real number to hold
+
+            int_bits (int): Integer bits, including the sign bit
+
+            frac_bits (int): Fractional bits
+
+            signed (bool): Held as twos complement rather than unsigned
+
+            rounding (FixedPointRounding): How values between two steps are
+                                           rounded
+
+            overflow (FixedPointOverflow): What happens to values outside the
+                                           range of the format
+        """
+        self._min, self._max = _limits(int_bits, frac_bits, signed)
+        BinaryValue.__init__(self, bits=int_bits + frac_bits, bigEndian=bigEndian,
+                             binaryRepresentation=BinaryRepresentation.TWOS_COMPLEMENT if signed
+                             else BinaryRepresentation.UNSIGNED)
+        self.int_bits = int_bits
+        self.frac_bits = frac_bits
+        self.signed = signed
+        self.rounding = rounding
+        self.overflow = overflow
+        self._set_int(0, self._bits)
+        if value is not None:
+            self.real = value
+
+    @property
+    def format(self):
+        """The format as a string, eg Q1.15"""
+        return "Q%d.%d" % (self.int_bits, self.frac_bits)
+
+    def get_real(self):
+        if self.signed:
+            integer = self.signed_integer
+        else:
+            integer = self.integer
+        return math.ldexp(integer, -self.frac_bits)
+
+    def set_real(self, real):
+        if math.isnan(real):
+            raise ValueError("Can't represent NaN in %s" % self.format)
+        if math.isinf(real):
+            integer = self._max if real > 0 else self._min
+        else:
+            integer = _quantise(real, self.frac_bits, self.rounding)
+        if not self._min <= integer <= self._max:
+            if self.overflow == FixedPointOverflow.ERROR:
+                raise OverflowError("%r doesn't fit in %s" % (real, self.format))
+            elif self.overflow == FixedPointOverflow.SATURATE:
+                integer = min(max(integer, self._min), self._max)
+        self._set_int(integer & ((1 << self._bits) - 1), self._bits)
+
+    real = property(get_real, set_real, None,
+                    "Access to the value as a real number")
+
+    def __float__(self):
+        return self.get_real()
+
+
+class FixedPointArray(BinaryArray):
+    """Many real numbers of the same Qm.n format held in NumPy arrays.
+
+    Conversions to and from floating point are applied to the whole array at
+    once, and it can be written to an array handle with set_array like any
+    other BinaryArray:
+
+    >>> arr = FixedPointArray([0.5, -0.25, 2.0], int_bits=1, frac_bits=7)
+    >>> arr.integer.tolist()
+    [64, -32, 127]
+    >>> arr.real.tolist()
+    [0.5, -0.25, 0.9921875]
+
+    Formats of up to 64 bits are supported, although only 53 significant bits
+    survive the conversion from floating point.
+    """
+    def __init__(self, values, int_bits, frac_bits, signed=True,
+                 rounding=FixedPointRounding.ROUND_HALF_UP,
+                 overflow=FixedPointOverflow.SATURATE):
+        """
+        Args:
+            values (sequence): Real numbers to store
+
+            int_bits (int): Integer bits, including the sign bit
+
+            frac_bits (int): Fractional bits
+
+            signed (bool): Held as twos complement rather than unsigned
+
+            rounding (FixedPointRounding): How values between two steps are
+                                           rounded
+
+            overflow (FixedPointOverflow): What happens to values outside the
+                                           range of the format
+        """
+        if not _have_numpy:
+            raise ImportError("NumPy is required for FixedPointArray")
+        if int_bits + frac_bits > 64:
+            raise ValueError("FixedPointArray supports up to 64 bits, not Q%d.%d" % (int_bits, frac_bits))
+        self._set_format(int_bits, frac_bits, signed, rounding, overflow)
+        BinaryArray.__init__(self, self._encode_real(values), self.bits,
+                             binaryRepresentation=self.binaryRepresentation)
+
+    def _set_format(self, int_bits, frac_bits, signed, rounding, overflow):
+        self._min, self._max = _limits(int_bits, frac_bits, signed)
+        self.int_bits = int_bits
+        self.frac_bits = frac_bits
+        self.signed = signed
+        self.rounding = rounding
+        self.overflow = overflow
+        self.bits = int_bits + frac_bits
+        self.binaryRepresentation = (BinaryRepresentation.TWOS_COMPLEMENT if signed
+                                     else BinaryRepresentation.UNSIGNED)
+
+    @property
+    def format(self):
+        """The format as a string, eg Q1.15"""
+        return "Q%d.%d" % (self.int_bits, self.frac_bits)
+
+    def _encode_real(self, values):
+        """Quantise real numbers to their unsigned encoding as uint64"""
+        scaled = np.ldexp(np.asarray(values, dtype=np.float64), self.frac_bits)
+        if np.isnan(scaled).any():
+            raise ValueError("Can't represent NaN in %s" % self.format)
+
+        if self.rounding == FixedPointRounding.TRUNCATE:
+            scaled = np.floor(scaled)
+        elif self.rounding == FixedPointRounding.ROUND_HALF_UP:
+            scaled = np.floor(scaled + 0.5)
+        elif self.rounding == FixedPointRounding.CONVERGENT:
+            scaled = np.rint(scaled)
+        else:
+            raise ValueError("Unknown rounding mode %r" % self.rounding)
+
+        # The largest encodings of wide formats round up when converted to
+        # floating point, so step back to one which converts back safely
+        low, high = float(self._min), float(self._max)
+        if high > self._max:
+            high = np.nextafter(high, 0)
+
+        if self.overflow == FixedPointOverflow.WRAP:
+            # The remainder modulo 2**bits is already the twos complement
+            # encoding of a signed value
+            scaled = np.where(np.isfinite(scaled), scaled, np.clip(scaled, low, high))
+            return np.mod(scaled, np.ldexp(1.0, self.bits)).astype(np.uint64)
+
+        outside = (scaled < low) | (scaled > high)
+        if self.overflow == FixedPointOverflow.ERROR and outside.any():
+            raise OverflowError("%d values don't fit in %s" % (np.count_nonzero(outside), self.format))
+        scaled = np.clip(scaled, low, high)
+        if self.signed:
+            return scaled.astype(np.int64).astype(np.uint64) & np.uint64((1 << self.bits) - 1)
+        return scaled.astype(np.uint64)
+
+    @classmethod
+    def _from_binary(cls, array, int_bits, frac_bits, signed=True,
+                     rounding=FixedPointRounding.ROUND_HALF_UP,
+                     overflow=FixedPointOverflow.SATURATE):
+        """Reinterpret the values of a BinaryArray in a fixed point format"""
+        if array.bits != int_bits + frac_bits:
+            raise ValueError("Can't hold %d bit values as Q%d.%d" % (array.bits, int_bits, frac_bits))
+        result = cls.__new__(cls)
+        result.__dict__.update(array.__dict__)
+        result._set_format(int_bits, frac_bits, signed, rounding, overflow)
+        return result
+
+    @classmethod
+    def from_handle(cls, handle, int_bits, frac_bits, signed=True, start=None, count=None):
+        """
+        Read consecutive elements of an array handle as fixed point numbers,
+        in a single simulator call where possible
+        """
+        return cls._from_binary(BinaryArray.from_handle(handle, start, count),
+                                int_bits, frac_bits, signed)
+
+    @property
+    def real(self):
+        """The values as float64"""
+        return np.ldexp(self.integer.astype(np.float64), -self.frac_bits)
+
+    def __getitem__(self, key):
+        result = BinaryArray.__getitem__(self, key)
+        if isinstance(key, slice):
+            return self._from_binary(result, self.int_bits, self.frac_bits, self.signed,
+                                     self.rounding, self.overflow)
+        value = FixedPointValue(int_bits=self.int_bits, frac_bits=self.frac_bits, signed=self.signed,
+                                rounding=self.rounding, overflow=self.overflow)
+        value.binstr = result.binstr
+        return value
+
+    def __repr__(self):
+        return "FixedPointArray(%d x %s)" % (len(self), self.format)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -34,10 +34,23 @@ import ctypes
 import traceback
 import sys
 import warnings
+import binascii
+import collections
+import copy
+import mmap
+import re
+import weakref
 from io import StringIO, BytesIO
 
 import os
 
+# NumPy is only needed for bulk array access
+try:
+    import numpy as np
+    _have_numpy = True
+except ImportError:
+    _have_numpy = False
+
 # For autodocumentation don't need the extension modules
 if "SPHINX_BUILD" in os.environ:
     simulator = None
@@ -45,12 +58,145 @@ else:
     import simulator
 
 import cocotb
-from cocotb.binary import BinaryValue
+from cocotb.binary import BinaryValue, BinaryArray
 from cocotb.log import SimLog
+from cocotb.memory import _read_hex
 from cocotb.result import TestError
 from cocotb.triggers import _RisingEdge, _FallingEdge, _Edge
 from cocotb.utils import get_python_integer_types
 
+class _ValueCache(object):
+    """
+    Opt-in cache of signal values read within the current simulation step,
+    enabled by defining COCOTB_VALUE_CACHE.
+
+    The scheduler moves to a new generation whenever a GPI trigger fires or
+    the pending writes are flushed, any value read in an earlier generation
+    is then read again from the simulator. Each reader gets its own copy of
+    the value, so modifying it doesn't change what the others see.
+    """
+    def __init__(self):
+        self.enabled = "COCOTB_VALUE_CACHE" in os.environ
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self.generation += 1
+
+    @property
+    def hit_rate(self):
+        reads = self.hits + self.misses
+        if not reads:
+            return 0.0
+        return float(self.hits) / reads
+
+value_cache = _ValueCache()
+
+def _copy_value(value):
+    """A copy of a value read from the simulator which can be modified freely"""
+    if isinstance(value, BinaryValue):
+        return copy.copy(value)
+    if isinstance(value, list):
+        return [_copy_value(element) for element in value]
+    return value
+
+class _HandleCache(object):
+    """
+    Opt-in bound on the number of signal handles kept in the hierarchy,
+    enabled by setting COCOTB_HANDLE_CACHE to the maximum number to keep.
+
+    When there are more, the least recently used signal handles are dropped
+    from their parent and the GPI object is freed once nothing else refers
+    to the handle. Handles held by triggers or user code therefore stay valid
+    and scopes are always kept. The names which the GPI remembers could not
+    be found are forgotten at the same time.
+    """
+    def __init__(self):
+        self.limit = self._parse_limit(os.getenv("COCOTB_HANDLE_CACHE", "0"))
+        self.evictions = 0
+        self.freed = 0
+        self._lru = collections.OrderedDict()   # GPI handle -> (parent, key)
+        self._released = {}                     # GPI handle -> weakref
+        self._to_free = set()
+
+    @staticmethod
+    def _parse_limit(value):
+        """Parse the limit, leaving the cache disabled if it isn't a count"""
+        if not value.strip():
+            return 0
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = -1
+        if limit < 0:
+            SimLog("cocotb.handle").warning(
+                "Ignoring COCOTB_HANDLE_CACHE=%r, expected a number of handles; "
+                "the handle cache is disabled" % value)
+            return 0
+        return limit
+
+    def add(self, parent, key, hdl):
+        if not isinstance(hdl, NonHierarchyObject):
+            return
+        self._lru.pop(hdl._handle, None)
+        self._lru[hdl._handle] = (parent, key)
+        self._release_pending()
+
+        if len(self._lru) > self.limit:
+            simulator.clear_lookup_misses()
+        while len(self._lru) > self.limit:
+            raw, (parent, key) = self._lru.popitem(last=False)
+            victim = parent._sub_handles.get(key)
+            if victim is None or victim._handle != raw:
+                continue
+            del parent._sub_handles[key]
+            _handle2obj.pop(raw, None)
+            if isinstance(parent, RegionObject):
+                parent._discovered = False
+            self._released[raw] = weakref.ref(victim, lambda ref, raw=raw: self._to_free.add(raw))
+            self.evictions += 1
+
+    def touch(self, hdl):
+        entry = self._lru.pop(hdl._handle, None)
+        if entry is not None:
+            self._lru[hdl._handle] = entry
+
+    def revive(self, raw):
+        """
+        Return a dropped handle which is still referenced elsewhere, or None.
+        Either way the GPI object is no longer freed.
+        """
+        self._to_free.discard(raw)
+        ref = self._released.pop(raw, None)
+        if ref is None:
+            return None
+        return ref()
+
+    def owns(self, raw):
+        """Whether a dropped handle is still to be revived or freed"""
+        return raw in self._released
+
+    def _release_pending(self):
+        while self._to_free:
+            raw = self._to_free.pop()
+            del self._released[raw]
+            simulator.free_handle(raw)
+            self.freed += 1
+
+handle_cache = _HandleCache()
+
+# Memory images are transferred to and from the simulator in chunks of this
+# many elements when dumping
+_MEMORY_CHUNK = 0x10000
+
+# A memory image waiting to be loaded with the other writes in ReadWrite
+_MemoryImage = collections.namedtuple("_MemoryImage", ["filename", "fmt", "start"])
+
+# Bit and slice writes to a vector waiting to be merged into its current value
+# in ReadWrite, mask and value are aligned to bit 0 of the vector
+_VectorUpdate = collections.namedtuple("_VectorUpdate", ["mask", "value"])
+
 # Only issue a warning for each deprecated attribute access
 _deprecation_warned = {}
 
@@ -93,6 +239,13 @@ class SimHandleBase(object):
         self._def_name = simulator.get_definition_name(self._handle)
         self._def_file = simulator.get_definition_file(self._handle)
 
+    def _add_sub_handle(self, key, hdl):
+        """Store a child handle, letting the handle cache track it"""
+        self._sub_handles[key] = hdl
+        if handle_cache.limit:
+            handle_cache.add(self, key, hdl)
+        return hdl
+
     def get_definition_name(self):
         return object.__getattribute__(self, "_def_name")
 
@@ -159,6 +312,7 @@ class RegionObject(SimHandleBase):
     def __init__(self, handle, path):
         SimHandleBase.__init__(self, handle, path)
         self._discovered = False
+        self._find_cache = {}
 
     def __iter__(self):
         """
@@ -209,13 +363,94 @@ class RegionObject(SimHandleBase):
             key = self._sub_handle_key(name)
 
             if not key is None:
-                self._sub_handles[key] = hdl
+                self._add_sub_handle(key, hdl)
             else:
                 self._log.debug("Unable to translate handle >%s< to a valid _sub_handle key" % hdl._name)
                 continue
 
         self._discovered = True
 
+    def _find(self, pattern, kind=None, max_depth=None):
+        """
+        Search the hierarchy below this scope for objects with matching names.
+
+        Args:
+            pattern (str or compiled regex): A glob pattern using * and ?,
+                which is matched against the name of each object while the
+                hierarchy is walked by the simulator interface, or a compiled
+                regular expression which is matched in Python
+            kind (int or tuple): Only return objects of these simulator types,
+                eg simulator.MODULE
+            max_depth (int): Number of levels to search, 1 only looks at the
+                children of this scope. Unlimited by default
+
+        Returns:
+            A list of the matching handles in the order they were found
+
+        Raises:
+            ValueError: if max_depth is less than 1
+
+        Only the matching objects and the scopes leading to them are created
+        as handles, the simulator objects of everything else visited are
+        released. Hierarchy can't change after elaboration so the results are
+        cached for each query.
+        """
+        if max_depth is not None and max_depth < 1:
+            raise ValueError("max_depth of %d would search nothing, it must be at least 1" % max_depth)
+
+        if kind is None:
+            kinds = ()
+        elif isinstance(kind, (list, tuple)):
+            kinds = tuple(kind)
+        else:
+            kinds = (kind,)
+
+        key = (pattern, kinds, max_depth)
+        if key in self._find_cache:
+            return list(self._find_cache[key])
+
+        regex = hasattr(pattern, "match")
+        chains = simulator.find_handles(self._handle, None if regex else pattern, kinds,
+                                        -1 if max_depth is None else max_depth,
+                                        _live_handles)
+
+        result = []
+        for chain in chains:
+            if regex and not pattern.match(chain[-1][1].split(".")[-1]):
+                continue
+            hdl = self._sub_handle_chain(chain)
+            if hdl is not None:
+                result.append(hdl)
+
+        # Release the objects of chains which were filtered out or duplicate
+        # existing handles
+        for thing in set(thing for chain in chains for thing, name in chain):
+            if thing not in _live_handles:
+                simulator.free_handle(thing)
+
+        self._find_cache[key] = result
+        return list(result)
+
+    def _sub_handle_chain(self, chain):
+        """
+        Create the handles for a chain of (simulator handle, name) pairs found
+        below this scope, reusing any that already exist
+        """
+        hdl = self
+        for thing, name in chain:
+            key = hdl._sub_handle_key(name)
+            sub = hdl._sub_handles.get(key) if key is not None else None
+            if sub is None:
+                try:
+                    sub = SimHandle(thing, hdl._child_path(name))
+                except TestError as e:
+                    self._log.debug("%s" % e)
+                    return None
+                if key is not None:
+                    hdl._add_sub_handle(key, sub)
+            hdl = sub
+        return hdl
+
     def _child_path(self, name):
         """
         Returns a string of the path of the child SimHandle for a given name
@@ -259,9 +494,7 @@ class HierarchyObject(RegionObject):
                 if len(sub) != len(value):
                     raise IndexError("Attempting to set %s with list length %d but target has length %d" % (
                         name, len(value), len(sub)))
-                for idx in range(len(value)):
-                    sub[idx] = value[idx]
-                return
+                return sub._setcachedvalue(value)
             else:
                 return sub._setcachedvalue(value)
         if name in self._compat_mapping:
@@ -276,7 +509,9 @@ class HierarchyObject(RegionObject):
         """
         if name in self._sub_handles:
             sub = self._sub_handles[name]
-            return self._sub_handles[name]
+            if handle_cache.limit:
+                handle_cache.touch(sub)
+            return sub
 
         if name.startswith("_"):
             return SimHandleBase.__getattr__(self, name)
@@ -287,8 +522,7 @@ class HierarchyObject(RegionObject):
             if name in self._compat_mapping:
                 return SimHandleBase.__getattr__(self, name)
             raise AttributeError("%s contains no object named %s" % (self._name, name))
-        self._sub_handles[name] = SimHandle(new_handle, self._child_path(name))
-        return self._sub_handles[name]
+        return self._add_sub_handle(name, SimHandle(new_handle, self._child_path(name)))
 
     def __hasattr__(self, name):
         """
@@ -307,7 +541,7 @@ class HierarchyObject(RegionObject):
 
         new_handle = simulator.get_handle_by_name(self._handle, name)
         if new_handle:
-            self._sub_handles[name] = SimHandle(new_handle, self._child_path(name))
+            self._add_sub_handle(name, SimHandle(new_handle, self._child_path(name)))
         else:
             self._invalid_sub_handles[name] = None
         return new_handle
@@ -324,6 +558,214 @@ class HierarchyObject(RegionObject):
             return getattr(self, name)
         raise AttributeError("%s contains no object named %s" % (self._name, name))
 
+class StructObject(HierarchyObject):
+    """
+    Structures and records are scopes whose fields can also be accessed
+    together as a single value
+    """
+    def __init__(self, handle, path):
+        HierarchyObject.__init__(self, handle, path)
+        self._layout = None
+
+    def _get_layout(self):
+        """
+        Describe where each field lives in the packed value.
+
+        Returns a list of (name, handle, lsb, width) tuples in declaration
+        order, the first field being the most significant. The width is None
+        for fields which can't be part of a packed value. Hierarchy can't
+        change after elaboration so this is only worked out once.
+        """
+        if self._layout is not None:
+            return self._layout
+
+        fields = []
+        iterator = simulator.iterate(self._handle, simulator.OBJECTS)
+        while True:
+            try:
+                thing = simulator.next(iterator)
+            except StopIteration:
+                break
+            name = simulator.get_name_string(thing)
+            hdl = self._sub_handle_chain([(thing, name)])
+            if hdl is None:
+                continue
+            key = self._sub_handle_key(name)
+
+            if isinstance(hdl, StructObject):
+                width = hdl._packed_width()
+            elif isinstance(hdl, ModifiableObject) and not isinstance(hdl, (RealObject, StringObject)):
+                width = len(hdl)
+            else:
+                width = None
+            fields.append((key, hdl, width))
+
+        layout = []
+        lsb = 0
+        for key, hdl, width in reversed(fields):
+            layout.insert(0, (key, hdl, lsb, width))
+            if width is not None:
+                lsb += width
+
+        self._layout = layout
+        return layout
+
+    def _packed_width(self):
+        """
+        Total width of the packed value, None if any field can't be packed
+        """
+        width = 0
+        for name, hdl, lsb, bits in self._get_layout():
+            if bits is None:
+                return None
+            width += bits
+        return width
+
+    def _native_width(self):
+        """
+        Width to use for single call access, None if the simulator doesn't
+        support it for this object or disagrees with our layout
+        """
+        width = self._packed_width()
+        if width is None or simulator.get_packed_width(self._handle) != width:
+            return None
+        return width
+
+    @staticmethod
+    def _vector_binstr(value, unknown, width):
+        """Convert an aval/bval pair to a binary string, MSB first"""
+        chars = "01zx"
+        return "".join(chars[((value >> bit) & 1) | (((unknown >> bit) & 1) << 1)]
+                       for bit in range(width - 1, -1, -1))
+
+    @staticmethod
+    def _binstr_vector(binstr):
+        """Convert a binary string to an aval/bval pair"""
+        value = 0
+        unknown = 0
+        for char in binstr:
+            value <<= 1
+            unknown <<= 1
+            if char in "1xXuUwW-":
+                value |= 1
+            if char not in "01":
+                unknown |= 1
+        return value, unknown
+
+    def get_packed(self):
+        """
+        Read the value of all of the fields.
+
+        Returns:
+            An OrderedDict of the fields in declaration order. Resolved
+            fields are integers, fields with X or Z bits are BinaryValues and
+            nested structures are nested dictionaries.
+
+        Where the simulator interface allows it, packed structures are read
+        in a single call and split into fields in Python, otherwise each
+        field is read in turn.
+        """
+        vector = None
+        if self._native_width() is not None:
+            vector = simulator.get_packed_val_vector(self._handle)
+        if vector is None:
+            return self._get_fields()
+        return self._split(vector[0], vector[1])
+
+    def _split(self, value, unknown):
+        result = collections.OrderedDict()
+        for name, hdl, lsb, width in self._get_layout():
+            mask = (1 << width) - 1
+            field_value = (value >> lsb) & mask
+            field_unknown = (unknown >> lsb) & mask
+            if isinstance(hdl, StructObject):
+                result[name] = hdl._split(field_value, field_unknown)
+            elif field_unknown:
+                binstr = self._vector_binstr(field_value, field_unknown, width)
+                result[name] = BinaryValue(binstr, width)
+            else:
+                result[name] = field_value
+        return result
+
+    def _get_fields(self):
+        result = collections.OrderedDict()
+        for name, hdl, lsb, width in self._get_layout():
+            if isinstance(hdl, StructObject):
+                result[name] = hdl.get_packed()
+                continue
+            value = hdl.value
+            if isinstance(value, BinaryValue):
+                try:
+                    value = int(value.binstr, 2)
+                except ValueError:
+                    pass
+            result[name] = value
+        return result
+
+    def setimmediatevalue(self, value):
+        """
+        Set the value of some or all of the fields.
+
+        Args:
+            value (dict): Maps field names to integers, BinaryValues or
+                          for nested structures dictionaries
+
+        Raises:
+            AttributeError, OverflowError
+
+        Where the simulator interface allows it, packed structures are
+        written in a single call with fields which aren't given keeping
+        their current value. Otherwise each given field is written in turn.
+        """
+        value_cache.invalidate()
+
+        names = set(name for name, hdl, lsb, width in self._get_layout())
+        for name in value:
+            if name not in names:
+                raise AttributeError("%s contains no field named %s" % (self._fullname, name))
+
+        if self._native_width() is not None:
+            current = simulator.get_packed_val_vector(self._handle)
+            if current is not None:
+                packed, unknown = self._merge(value, current[0], current[1])
+                if simulator.set_packed_val_vector(self._handle, packed, unknown) is not None:
+                    return
+
+        for name, hdl, lsb, width in self._get_layout():
+            if name in value:
+                hdl.setimmediatevalue(value[name])
+
+    def _merge(self, value, packed, unknown):
+        """Replace the fields given in value in a packed aval/bval pair"""
+        for name, hdl, lsb, width in self._get_layout():
+            if name not in value:
+                continue
+            mask = (1 << width) - 1
+            old_value = (packed >> lsb) & mask
+            old_unknown = (unknown >> lsb) & mask
+            field = value[name]
+            if isinstance(hdl, StructObject):
+                new_value, new_unknown = hdl._merge(field, old_value, old_unknown)
+            elif isinstance(field, BinaryValue):
+                new_value, new_unknown = self._binstr_vector(field.binstr)
+            else:
+                new_value, new_unknown = int(field), 0
+            if new_value < 0 or new_value > mask or new_unknown > mask:
+                raise OverflowError("Value for %s.%s doesn't fit in %d bits" % (self._fullname, name, width))
+            packed = (packed & ~(mask << lsb)) | (new_value << lsb)
+            unknown = (unknown & ~(mask << lsb)) | (new_unknown << lsb)
+        return packed, unknown
+
+    def _setcachedvalue(self, value):
+        """
+        Intercept the store of a value and hold in cache.
+
+        The whole structure is written on the next sim time along with the
+        other cached writes
+        """
+        cocotb.scheduler.save_write(self, value)
+
+
 class HierarchyArrayObject(RegionObject):
     """
     Hierarchy Array are containers of Hierarchy Objects
@@ -364,13 +806,15 @@ class HierarchyArrayObject(RegionObject):
         if isinstance(index, slice):
             raise IndexError("Slice indexing is not supported")
         if index in self._sub_handles:
-            return self._sub_handles[index]
+            sub = self._sub_handles[index]
+            if handle_cache.limit:
+                handle_cache.touch(sub)
+            return sub
         new_handle = simulator.get_handle_by_index(self._handle, index)
         if not new_handle:
             raise IndexError("%s contains no object at index %d" % (self._name, index))
         path = self._path + "[" + str(index) + "]"
-        self._sub_handles[index] = SimHandle(new_handle, path)
-        return self._sub_handles[index]
+        return self._add_sub_handle(index, SimHandle(new_handle, path))
 
     def _child_path(self, name):
         """
@@ -391,13 +835,39 @@ class NonHierarchyObject(SimHandleBase):
 
     def __init__(self, handle, path):
         SimHandleBase.__init__(self, handle, path)
+        self._cache_generation = None
+        self._cache_value = None
 
     def __iter__(self):
         return iter(())
 
+    def _getcachedvalue(self):
+        """Read the value through the per time step cache if it is enabled"""
+        if not value_cache.enabled:
+            return self._getvalue()
+
+        if self._cache_generation == value_cache.generation:
+            value_cache.hits += 1
+        else:
+            value_cache.misses += 1
+            self._cache_value = self._getvalue()
+            self._cache_generation = value_cache.generation
+        return _copy_value(self._cache_value)
+
     def _getvalue(self):
         if type(self) is NonHierarchyIndexableObject:
-            #Need to iterate over the sub-object
+            # Try to read all of the elements at once before falling back to
+            # iterating over the sub-objects
+            vector = self._get_array_vector(0, len(self))
+            if vector is not None and not any(vector[1]):
+                bits = len(self[0])
+                result = []
+                for resolved in vector[0]:
+                    value = BinaryValue(bits=bits)
+                    value._set_resolved_integer(resolved)
+                    result.append(value)
+                return result
+
             result =[]
             for x in range(len(self)):
                 result.append(self[x]._getvalue())
@@ -431,7 +901,7 @@ class NonHierarchyObject(SimHandleBase):
 
 
     # We want to maintain compatability with python 2.5 so we can't use @property with a setter
-    value = property(fget=lambda self: self._getvalue(),
+    value = property(fget=lambda self: self._getcachedvalue(),
                      fset=lambda self,v: self._setcachedvalue(v),
                      fdel=None,
                      doc="A reference to the value")
@@ -502,13 +972,293 @@ class NonHierarchyIndexableObject(NonHierarchyObject):
         if self._range is None:
             raise IndexError("%s is not indexable.  Unable to get object at index %d" % (self._fullname, index))
         if index in self._sub_handles:
-            return self._sub_handles[index]
+            sub = self._sub_handles[index]
+            if handle_cache.limit:
+                handle_cache.touch(sub)
+            return sub
         new_handle = simulator.get_handle_by_index(self._handle, index)
         if not new_handle:
             raise IndexError("%s contains no object at index %d" % (self._fullname, index))
         path = self._path + "[" + str(index) + "]"
-        self._sub_handles[index] = SimHandle(new_handle, path)
-        return self._sub_handles[index]
+        return self._add_sub_handle(index, SimHandle(new_handle, path))
+
+    def _array_bounds(self, start, count):
+        """Resolve the defaults for a bulk access and check it is in range"""
+        if self._range is None:
+            raise IndexError("%s is not indexable" % (self._fullname))
+        low, high = min(self._range), max(self._range)
+        if start is None:
+            start = low
+        if count is None:
+            count = high - start + 1
+        if start < low or count < 0 or start + count - 1 > high:
+            raise IndexError("Accessing %d elements from index %d of %s is outside the range [%d:%d]" % (
+                count, start, self._fullname, self._range[0], self._range[1]))
+        return start, count
+
+    def _get_array_vector(self, start, count):
+        """
+        Read count elements from index start in a single simulator call
+
+        Returns a tuple of lists (values, unknown masks) or None if the
+        elements can not be accessed in this way
+        """
+        if count <= 0:
+            return None
+        try:
+            elem = self[start]
+        except IndexError:
+            return None
+        if type(elem) is not ModifiableObject:
+            return None
+        return simulator.get_array_val_vector(self._handle, start, count, len(elem))
+
+    def _get_words(self, start, count):
+        """Read count elements from index start as a list of integers"""
+        vector = self._get_array_vector(start, count)
+        if vector is None:
+            return [self[index].value.integer for index in range(start, start + count)]
+
+        values, unknowns = vector
+        for idx, unknown in enumerate(unknowns):
+            if unknown:
+                raise ValueError("Unresolved value in %s at index %d" % (self._fullname, start + idx))
+        return values
+
+    def get_array(self, start=None, count=None):
+        """
+        Read the values of the array elements into a NumPy array.
+
+        Args:
+            start (int): Index of the first element to read, defaults to the
+                         lowest index of the array
+            count (int): Number of elements to read, defaults to the rest of
+                         the array
+
+        Raises:
+            IndexError, ValueError
+
+        Element i of the result is the value at index start + i. Elements up
+        to 64 bits are returned as uint64, wider ones as Python integers and
+        nested arrays as an extra dimension.
+
+        Where the simulator interface allows it all of the elements are read
+        in a single call, otherwise we fall back to reading each element.
+        A ValueError is raised if any element contains unresolved bits.
+        """
+        if not _have_numpy:
+            raise ImportError("NumPy is required to read %s as an array" % (self._fullname))
+
+        start, count = self._array_bounds(start, count)
+
+        if count and type(self[start]) is NonHierarchyIndexableObject:
+            values = [self[index].get_array() for index in range(start, start + count)]
+        else:
+            values = self._get_words(start, count)
+
+        if count and type(self[start]) is ModifiableObject:
+            if len(self[start]) <= 64:
+                return np.array(values, dtype=np.uint64)
+            return np.array(values, dtype=object)
+        return np.array(values)
+
+    def set_array(self, values, start=None):
+        """
+        Immediately write a sequence of integers, such as a NumPy array, to
+        consecutive array elements.
+
+        Args:
+            values (sequence): Values to write, element i of the sequence is
+                               written to index start + i. A BinaryArray is
+                               written with its unknown bits resolved
+            start (int): Index of the first element to write, defaults to the
+                         lowest index of the array
+
+        Raises:
+            IndexError, OverflowError
+
+        Where the simulator interface allows it all of the elements are
+        written in a single call, otherwise we fall back to writing each
+        element.
+        """
+        value_cache.invalidate()
+
+        if isinstance(values, BinaryArray):
+            values = values.resolve()
+
+        start, count = self._array_bounds(start, len(values))
+        if not count:
+            return
+
+        elem = self[start]
+        if type(elem) is ModifiableObject:
+            # Unsigned NumPy arrays are passed as a buffer without creating
+            # an integer object for each element
+            if _have_numpy and isinstance(values, np.ndarray) and values.ndim == 1 and values.dtype.kind == "u":
+                data = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+                done = simulator.set_array_val_buffer(self._handle, start, len(elem), data.itemsize, data)
+            else:
+                done = simulator.set_array_val_vector(self._handle, start, len(elem), values)
+            if done is not None:
+                return
+
+        for idx in range(count):
+            elem = self[start + idx]
+            if type(elem) is NonHierarchyIndexableObject:
+                elem.set_array(values[idx])
+            else:
+                elem.setimmediatevalue(int(values[idx]))
+
+    _memory_formats = {
+        ".bin" : "bin",
+        ".hex" : "hex",
+        ".mem" : "hex",
+        ".npy" : "npy",
+    }
+
+    def _memory_format(self, filename, fmt):
+        if fmt is None:
+            fmt = self._memory_formats.get(os.path.splitext(filename)[1].lower())
+        if fmt not in ("bin", "hex", "npy"):
+            raise ValueError("Unable to determine the format of memory image %s, specify one of bin, hex or npy" % (filename))
+        if fmt == "npy" and not _have_numpy:
+            raise ImportError("NumPy is required to use memory image %s" % (filename))
+        return fmt
+
+    def _memory_bits(self):
+        """Width of the memory words, all elements must be vectors"""
+        if self._range is None:
+            raise IndexError("%s is not indexable" % (self._fullname))
+        elem = self[min(self._range)]
+        if type(elem) is not ModifiableObject:
+            raise TypeError("%s is not a memory of vectors" % (self._fullname))
+        return len(elem)
+
+    def load_memory(self, filename, fmt=None, start=None, immediate=True):
+        """
+        Load a memory image from a file into the array.
+
+        Args:
+            filename (str): File holding the image
+            fmt (str): One of "bin" for a raw binary image with each word
+                       stored as little endian bytes, "hex" for a $readmemh
+                       style file or "npy" for a NumPy array. By default
+                       this is chosen from the file extension.
+            start (int): Index of the first word, defaults to the lowest
+                         index. Addresses given in a hex file are indices.
+            immediate (bool): Load the image now rather than with the other
+                              writes at the next ReadWrite phase
+
+        Raises:
+            IndexError, OverflowError, ValueError
+
+        Binary and NumPy images are memory mapped and handed to the simulator
+        interface in one call so large images are not copied into Python
+        objects.
+        """
+        fmt = self._memory_format(filename, fmt)
+        if immediate:
+            self._load_memory(filename, fmt, start)
+        else:
+            cocotb.scheduler.save_write(self, _MemoryImage(filename, fmt, start))
+
+    def _load_memory(self, filename, fmt, start):
+        value_cache.invalidate()
+
+        bits = self._memory_bits()
+
+        if fmt == "hex":
+            for index, values in _read_hex(filename, self._array_bounds(start, 0)[0]):
+                self.set_array(values, index)
+
+        elif fmt == "npy":
+            self.set_array(np.load(filename, mmap_mode="r").ravel(), start)
+
+        else:
+            word_bytes = (bits + 7) // 8
+            with open(filename, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size % word_bytes:
+                    raise ValueError("Image %s of %d bytes is not a whole number of %d byte words" %
+                                     (filename, size, word_bytes))
+                if not size:
+                    return
+                image = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    start, count = self._array_bounds(start, len(image) // word_bytes)
+                    if simulator.set_array_val_buffer(self._handle, start, bits, word_bytes, image) is None:
+                        self.set_array([int(binascii.hexlify(image[idx:idx + word_bytes][::-1]), 16)
+                                        for idx in range(0, len(image), word_bytes)], start)
+                finally:
+                    image.close()
+
+    def dump_memory(self, filename, fmt=None, start=None, count=None):
+        """
+        Save the contents of the array to a memory image file.
+
+        Args:
+            filename (str): File to write
+            fmt (str): Image format as for load_memory, by default chosen
+                       from the file extension
+            start (int): Index of the first word, defaults to the lowest index
+            count (int): Number of words, defaults to the rest of the array
+
+        Raises:
+            IndexError, ValueError
+
+        A hex image starts with an address so it can be loaded back to the
+        same location. A ValueError is raised if any word has unresolved bits.
+        """
+        fmt = self._memory_format(filename, fmt)
+        bits = self._memory_bits()
+        start, count = self._array_bounds(start, count)
+
+        if fmt == "npy":
+            np.save(filename, self.get_array(start, count))
+            return
+
+        if fmt == "hex":
+            digits = (bits + 3) // 4
+            with open(filename, "w") as f:
+                f.write("@%x\n" % start)
+                for offset in range(0, count, _MEMORY_CHUNK):
+                    values = self._get_words(start + offset, min(_MEMORY_CHUNK, count - offset))
+                    f.write("".join("%0*x\n" % (digits, value) for value in values))
+            return
+
+        word_bytes = (bits + 7) // 8
+        with open(filename, "wb") as f:
+            for offset in range(0, count, _MEMORY_CHUNK):
+                chunk = min(_MEMORY_CHUNK, count - offset)
+                data = simulator.get_array_val_buffer(self._handle, start + offset, chunk, bits, word_bytes)
+                if data is None:
+                    data = b"".join(binascii.unhexlify("%0*x" % (word_bytes * 2, value))[::-1]
+                                    for value in self._get_words(start + offset, chunk))
+                f.write(data)
+
+    def setimmediatevalue(self, value):
+        """
+        Set the elements of an array from a list, element i of the list is
+        written to index i
+        """
+        value_cache.invalidate()
+
+        if type(self) is not NonHierarchyIndexableObject:
+            return NonHierarchyObject.setimmediatevalue(self, value)
+
+        if isinstance(value, _MemoryImage):
+            return self._load_memory(value.filename, value.fmt, value.start)
+
+        if all(isinstance(x, get_python_integer_types()) for x in value):
+            return self.set_array(value, 0)
+
+        for idx in range(len(value)):
+            self[idx].setimmediatevalue(value[idx])
+
+    def _setcachedvalue(self, value):
+        if type(self) is not NonHierarchyIndexableObject:
+            return NonHierarchyObject._setcachedvalue(self, value)
+        cocotb.scheduler.save_write(self, value)
 
     def __iter__(self):
         try:
@@ -579,6 +1329,11 @@ class ModifiableObject(NonConstantObject):
     """
     Base class for simulator objects whose values can be modified
     """
+    _native_vector = None
+    # The vector and bit mask a handle to a single bit of a vector writes,
+    # False once known not to be one
+    _vector_bit = None
+
     def setimmediatevalue(self, value):
         """
         Set the value of the underlying simulation object to value.
@@ -595,12 +1350,42 @@ class ModifiableObject(NonConstantObject):
 
         We determine the library call to make based on the type of the value
 
-        Assigning integers less than 32-bits is faster
+        Assigning integers less than 32-bits is faster, wider integers and
+        fully resolved BinaryValues are written as a vector without going
+        through a binary string
         """
-        if isinstance(value, get_python_integer_types()) and value < 0x7fffffff and len(self) <= 32:
-            simulator.set_signal_val_long(self._handle, value)
+        value_cache.invalidate()
+
+        if isinstance(value, get_python_integer_types()):
+            if value < 0x7fffffff and len(self) <= 32:
+                simulator.set_signal_val_long(self._handle, value)
+                return
+            if 0 <= value < (1 << len(self)):
+                simulator.set_signal_val_vector(self._handle, value, 0)
+                return
+
+        if isinstance(value, BinaryValue) and value._plain and value._n == len(self):
+            simulator.set_signal_val_vector(self._handle, value._int, 0)
             return
 
+        if isinstance(value, _VectorUpdate):
+            self._apply_update(value)
+            return
+
+        binstr = self._binaryvalue(value).binstr
+        if len(binstr) == len(self):
+            try:
+                resolved = int(binstr, 2)
+            except ValueError:
+                pass
+            else:
+                simulator.set_signal_val_vector(self._handle, resolved, 0)
+                return
+
+        simulator.set_signal_val_str(self._handle, binstr)
+
+    def _binaryvalue(self, value):
+        """Convert any of the types accepted by setimmediatevalue to a BinaryValue"""
         if isinstance(value, ctypes.Structure):
             value = BinaryValue(value=cocotb.utils.pack(value), bits=len(self))
         elif isinstance(value, get_python_integer_types()):
@@ -624,9 +1409,124 @@ class ModifiableObject(NonConstantObject):
             self._log.critical("Unsupported type for value assignment: %s (%s)" % (type(value), repr(value)))
             raise TypeError("Unable to set simulator value with type %s" % (type(value)))
 
-        simulator.set_signal_val_str(self._handle, value.binstr)
+        return value
+
+    def _bit_position(self, index):
+        """Position of an index counting from the least significant bit"""
+        left, right = self._range
+        if not min(left, right) <= index <= max(left, right):
+            raise IndexError("Index %d is outside the range [%d:%d] of %s" % (index, left, right, self._fullname))
+        if left >= right:
+            return index - right
+        return right - index
+
+    def __setitem__(self, index, value):
+        """
+        Assign to a bit or a slice, eg sig[3] = 1 or sig[7:4] = 0xA
+
+        Integer assignments are merged with any other pending writes to this
+        vector so the whole vector is written once in the ReadWrite phase.
+        The leftmost index of a slice takes the most significant bit of the
+        value.
+        """
+        if self._range is None or isinstance(value, list):
+            return NonHierarchyIndexableObject.__setitem__(self, index, value)
+
+        if isinstance(index, slice):
+            if index.start is None or index.stop is None or index.step is not None:
+                raise IndexError("Slices of %s must give both indices and no step" % (self._fullname))
+            first, last = self._bit_position(index.start), self._bit_position(index.stop)
+            lsb, width = min(first, last), abs(first - last) + 1
+        else:
+            lsb, width = self._bit_position(index), 1
+
+        if isinstance(value, BinaryValue):
+            try:
+                value = int(value.binstr, 2)
+            except ValueError:
+                pass
+
+        if not isinstance(value, get_python_integer_types()):
+            if isinstance(index, slice):
+                raise TypeError("Slices of %s can only be assigned integers" % (self._fullname))
+            return NonHierarchyIndexableObject.__setitem__(self, index, value)
+
+        mask = (1 << width) - 1
+        if not 0 <= value <= mask:
+            raise OverflowError("Value %d doesn't fit in %d bits of %s" % (value, width, self._fullname))
+        cocotb.scheduler.save_partial_write(self, mask << lsb, value << lsb)
+
+    def __getitem__(self, index):
+        sub = NonConstantObject.__getitem__(self, index)
+        if sub._vector_bit is None:
+            sub._vector_bit = False
+            if (type(sub) is ModifiableObject and len(sub) == 1 and
+                    len(self) == abs(self._range[0] - self._range[1]) + 1):
+                sub._vector_bit = (self, 1 << self._bit_position(index))
+        return sub
+
+    def _merge_write(self, pending, mask, value):
+        """
+        Combine a bit or slice write with a write already waiting for
+        ReadWrite, returning the value to hold in the write cache
+        """
+        if pending is None:
+            return _VectorUpdate(mask, value)
+        if isinstance(pending, _VectorUpdate):
+            return _VectorUpdate(pending.mask | mask, (pending.value & ~mask) | value)
+
+        full = (1 << len(self)) - 1
+        if isinstance(pending, get_python_integer_types()):
+            return (pending & full & ~mask) | value
+
+        binstr = self._binaryvalue(pending).binstr
+        try:
+            return (int(binstr, 2) & ~mask) | value
+        except ValueError:
+            return BinaryValue(self._merge_binstr(binstr, mask, value), len(binstr))
+
+    @staticmethod
+    def _merge_binstr(binstr, mask, value):
+        """Replace the bits selected by mask in a binary string"""
+        chars = list(binstr)
+        length = len(chars)
+        for bit in range(length):
+            if (mask >> bit) & 1:
+                chars[length - 1 - bit] = "1" if (value >> bit) & 1 else "0"
+        return "".join(chars)
+
+    def _has_native_vector(self):
+        # Without native support the vector is built from the binary string,
+        # so using that directly is quicker
+        if self._native_vector is None:
+            self._native_vector = simulator.has_native_vector(self._handle)
+        return self._native_vector
+
+    def _apply_update(self, update):
+        """Write the bits of a _VectorUpdate, keeping the rest of the vector"""
+        vector = None
+        if self._has_native_vector():
+            vector = simulator.get_signal_val_vector(self._handle)
+        # Bits that aren't 0 or 1 are kept as the simulator reports them
+        if vector is not None and not vector[1]:
+            simulator.set_signal_val_vector(self._handle,
+                                            (vector[0] & ~update.mask) | update.value, 0)
+            return
+
+        binstr = simulator.get_signal_val_binstr(self._handle)
+        simulator.set_signal_val_str(self._handle, self._merge_binstr(binstr, update.mask, update.value))
 
     def _getvalue(self):
+        if self._has_native_vector():
+            vector = simulator.get_signal_val_vector(self._handle)
+            if vector is not None:
+                resolved, unknown = vector
+                if not unknown:
+                    result = BinaryValue(bits=len(self))
+                    result._set_resolved_integer(resolved)
+                    return result
+
+        # Unresolved bits need the exact characters reported by the simulator
         binstr = simulator.get_signal_val_binstr(self._handle)
         result = BinaryValue(binstr, len(binstr))
         return result
@@ -638,7 +1538,18 @@ class ModifiableObject(NonConstantObject):
         This operation is to enable all of the scheduled callbacks to completed
         with the same read data and for the writes to occour on the next
         sim time
+
+        A 0 or 1 written to a bit of a vector is merged with the other
+        writes to that vector, as for an assignment to an index of it
         """
+        if self._vector_bit:
+            bit = value
+            if isinstance(bit, BinaryValue) and bit.binstr in ("0", "1"):
+                bit = int(bit.binstr)
+            if isinstance(bit, get_python_integer_types()) and bit in (0, 1):
+                vector, mask = self._vector_bit
+                cocotb.scheduler.save_partial_write(vector, mask, mask if bit else 0)
+                return
         cocotb.scheduler.save_write(self, value)
 
     def __int__(self):
@@ -666,6 +1577,8 @@ class RealObject(ModifiableObject):
         This operation will fail unless the handle refers to a modifiable
         object eg net, signal or variable.
         """
+        value_cache.invalidate()
+
         if not isinstance(value, float):
             self._log.critical("Unsupported type for real value assignment: %s (%s)" % (type(value), repr(value)))
             raise TypeError("Unable to set simulator value with type %s" % (type(value)))
@@ -697,6 +1610,8 @@ class EnumObject(ModifiableObject):
         This operation will fail unless the handle refers to a modifiable
         object eg net, signal or variable.
         """
+        value_cache.invalidate()
+
         if isinstance(value, BinaryValue):
             value = int(value)
         elif not isinstance(value, get_python_integer_types()):
@@ -728,6 +1643,8 @@ class IntegerObject(ModifiableObject):
         This operation will fail unless the handle refers to a modifiable
         object eg net, signal or variable.
         """
+        value_cache.invalidate()
+
         if isinstance(value, BinaryValue):
             value = int(value)
         elif not isinstance(value, get_python_integer_types()):
@@ -758,6 +1675,8 @@ class StringObject(ModifiableObject):
         This operation will fail unless the handle refers to a modifiable
         object eg net, signal or variable.
         """
+        value_cache.invalidate()
+
         if not isinstance(value, str):
             self._log.critical("Unsupported type for string value assignment: %s (%s)" % (type(value), repr(value)))
             raise TypeError("Unable to set simulator value with type %s" % (type(value)))
@@ -769,13 +1688,23 @@ class StringObject(ModifiableObject):
 
 _handle2obj = {}
 
+class _LiveHandles(object):
+    """
+    Contains the GPI handles which SimHandles have been created for, which
+    must not be freed by anything else
+    """
+    def __contains__(self, handle):
+        return handle in _handle2obj or handle_cache.owns(handle)
+
+_live_handles = _LiveHandles()
+
 def SimHandle(handle, path=None):
     """
     Factory function to create the correct type of SimHandle object
     """
     _type2cls = {
         simulator.MODULE:      HierarchyObject,
-        simulator.STRUCTURE:   HierarchyObject,
+        simulator.STRUCTURE:   StructObject,
         simulator.REG:         ModifiableObject,
         simulator.NETARRAY:    NonHierarchyIndexableObject,
         simulator.REAL:        RealObject,
@@ -793,6 +1722,11 @@ def SimHandle(handle, path=None):
     except KeyError:
         pass
 
+    obj = handle_cache.revive(handle)
+    if obj is not None:
+        _handle2obj[handle] = obj
+        return obj
+
     t = simulator.get_type(handle)
 
     # Special case for constants
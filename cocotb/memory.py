@@ -0,0 +1,371 @@
+''' Copyright (c) 2013 Potential Ventures Ltd
+Copyright (c) 2013 SolarFlare Communications Inc
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of Potential Ventures Ltd,
+      SolarFlare Communications Inc nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL POTENTIAL VENTURES LTD BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
+
+"""
+A byte addressed memory model for bus slaves and back-door access.
+"""
+
+import mmap
+import os
+import re
+
+from cocotb.binary import _int_from_bytes, _int_to_bytes
+
+
+def _read_hex(filename, index=0):
+    """
+    Parse a $readmemh style file into a list of (index, values) runs, the
+    first starting at index unless the file gives an address
+    """
+    with open(filename, "r") as f:
+        text = re.sub(r"/\*.*?\*/", " ", f.read(), flags=re.DOTALL)
+
+    runs = []
+    values = []
+    for line in text.splitlines():
+        for token in line.split("//")[0].split():
+            if token.startswith("@"):
+                if values:
+                    runs.append((index, values))
+                index = int(token[1:], 16)
+                values = []
+            else:
+                values.append(int(token.replace("_", ""), 16))
+    if values:
+        runs.append((index, values))
+    return runs
+
+
+class Memory(object):
+    """Sparse byte addressed memory.
+
+    Storage is allocated a page at a time as it is written, so a large
+    address space only costs the pages which are used. Alternatively the
+    memory can be laid over a buffer such as a bytearray, an array of bytes
+    or a memory mapping, see Memory.mmap.
+
+    The same instance can be shared by several slaves to model a multi-port
+    memory.
+
+    >>> mem = Memory()
+    >>> mem.write_word(0x1000, 0x12345678, 4)
+    >>> hex(mem.read_word(0x1002, 2))
+    '0x1234'
+    >>> mem.is_initialised(0x1000, 8)
+    False
+
+    """
+    def __init__(self, size=None, page_size=4096, backing=None, fill=0,
+                 big_endian=False):
+        """
+        Kwargs:
+            size (int): Number of bytes, addresses beyond it raise an
+                        IndexError. Unlimited by default.
+
+            page_size (int): Bytes allocated at a time, a power of 2
+
+            backing (buffer): Writable bytes-like object to hold the contents,
+                              its contents count as initialised
+
+            fill (int): Value read from bytes which have never been written
+
+            big_endian (bool): Default byte order of words
+        """
+        if page_size < 1 or page_size & (page_size - 1):
+            raise ValueError("Page size must be a power of 2, not %d" % page_size)
+        self.page_size = page_size
+        self._shift = page_size.bit_length() - 1
+        self.fill = fill
+        self.big_endian = big_endian
+        self.uninitialised_reads = 0
+
+        # Page number to a bytearray or a view of the backing, and to a mask
+        # of the bytes which have been written (None if all have been)
+        self._pages = {}
+        self._valid = {}
+        self._track = backing is None
+        self._backing = None
+        self._mmap = None
+
+        if backing is not None:
+            view = memoryview(backing)
+            if view.itemsize != 1 or view.readonly:
+                raise TypeError("A memory must be backed by a writable buffer of bytes")
+            self._backing = view
+            if size is None:
+                size = len(view)
+            elif size > len(view):
+                raise ValueError("Backing of %d bytes is smaller than the memory" % len(view))
+        self.size = size
+
+    @classmethod
+    def mmap(cls, size, filename=None, page_size=mmap.PAGESIZE):
+        """
+        Create a memory backed by a memory mapping, for address spaces too
+        large to hold in the Python heap.
+
+        Without a filename an anonymous mapping is used, the operating system
+        only allocates the pages which are touched. With a filename the file
+        is grown to size if necessary and its contents are the initial
+        contents of the memory.
+        """
+        if filename is None:
+            mapping = mmap.mmap(-1, size)
+        else:
+            with open(filename, "a+b") as f:
+                if os.fstat(f.fileno()).st_size < size:
+                    f.truncate(size)
+                mapping = mmap.mmap(f.fileno(), size)
+        memory = cls(size, page_size, backing=mapping)
+        memory._mmap = mapping
+        memory._track = filename is None
+        return memory
+
+    def close(self):
+        """Release a memory mapping"""
+        if self._mmap is None:
+            return
+        # Views of the mapping have to be released before it can be closed
+        views = list(self._pages.values()) + [self._backing]
+        self._pages = {}
+        self._backing = None
+        if hasattr(memoryview, "release"):
+            for view in views:
+                view.release()
+        self._mmap.close()
+        self._mmap = None
+
+    def _check(self, addr, length):
+        if addr < 0 or (self.size is not None and addr + length > self.size):
+            raise IndexError("Access of %d bytes at 0x%x is outside the memory" % (length, addr))
+
+    def _spans(self, addr, length):
+        """Split an access into (page number, offset in page, offset in the
+        access, length) for each page it touches"""
+        pos = 0
+        while pos < length:
+            number = (addr + pos) >> self._shift
+            offset = (addr + pos) & (self.page_size - 1)
+            span = min(self.page_size - offset, length - pos)
+            yield number, offset, pos, span
+            pos += span
+
+    def _page(self, number, create):
+        page = self._pages.get(number)
+        if page is None:
+            if self._backing is not None:
+                start = number << self._shift
+                page = self._backing[start:start + self.page_size]
+            elif create:
+                page = bytearray(self.page_size)
+                if self.fill:
+                    page[:] = bytearray([self.fill]) * self.page_size
+            else:
+                return None
+            self._pages[number] = page
+        return page
+
+    def read(self, addr, length):
+        """Read length bytes from addr"""
+        self._check(addr, length)
+        if not self._track:
+            return self._backing[addr:addr + length].tobytes()
+
+        result = bytearray(length)
+        uninitialised = False
+        for number, offset, pos, span in self._spans(addr, length):
+            page = self._page(number, False)
+            if page is not None:
+                result[pos:pos + span] = page[offset:offset + span]
+            elif self.fill:
+                result[pos:pos + span] = bytearray([self.fill]) * span
+            if number not in self._valid:
+                uninitialised = True
+            else:
+                valid = self._valid[number]
+                if valid is not None and valid.find(b"\x00", offset, offset + span) != -1:
+                    uninitialised = True
+        if uninitialised:
+            self.uninitialised_reads += 1
+        return bytes(result)
+
+    def write(self, addr, data):
+        """Write a bytes-like object to addr"""
+        data = memoryview(data)
+        if data.itemsize != 1:
+            data = memoryview(data.tobytes())
+        self._check(addr, len(data))
+        if not self._track:
+            self._backing[addr:addr + len(data)] = data
+            return
+
+        for number, offset, pos, span in self._spans(addr, len(data)):
+            page = self._page(number, True)
+            page[offset:offset + span] = data[pos:pos + span]
+            if span == self.page_size:
+                self._valid[number] = None
+            elif number not in self._valid:
+                valid = self._valid[number] = bytearray(self.page_size)
+                valid[offset:offset + span] = b"\x01" * span
+            elif self._valid[number] is not None:
+                self._valid[number][offset:offset + span] = b"\x01" * span
+
+    def is_initialised(self, addr, length=1):
+        """True if every byte in the range has been written"""
+        self._check(addr, length)
+        if not self._track:
+            return True
+        for number, offset, pos, span in self._spans(addr, length):
+            if number not in self._valid:
+                return False
+            valid = self._valid[number]
+            if valid is not None and valid.find(b"\x00", offset, offset + span) != -1:
+                return False
+        return True
+
+    def read_word(self, addr, width, big_endian=None):
+        """Read a word of width bytes from addr as an integer"""
+        if big_endian is None:
+            big_endian = self.big_endian
+        return _int_from_bytes(self.read(addr, width), big_endian)
+
+    def write_word(self, addr, value, width, big_endian=None, byteenable=None):
+        """
+        Write an integer as a word of width bytes to addr.
+
+        Bit i of byteenable enables byte lane i, the byte of significance i,
+        by default all of them are written.
+        """
+        if big_endian is None:
+            big_endian = self.big_endian
+        data = _int_to_bytes(value & ((1 << (8 * width)) - 1), width, big_endian)
+        if byteenable is None or byteenable == (1 << width) - 1:
+            self.write(addr, data)
+            return
+        for lane in range(width):
+            if byteenable & (1 << lane):
+                pos = width - 1 - lane if big_endian else lane
+                self.write(addr + pos, data[pos:pos + 1])
+
+    def read_words(self, addr, count, width, big_endian=None):
+        """Read a burst of count consecutive words as a list of integers"""
+        if big_endian is None:
+            big_endian = self.big_endian
+        data = memoryview(self.read(addr, count * width))
+        return [_int_from_bytes(data[offset:offset + width], big_endian)
+                for offset in range(0, count * width, width)]
+
+    def write_words(self, addr, values, width, big_endian=None):
+        """Write a burst of integers as consecutive words"""
+        if big_endian is None:
+            big_endian = self.big_endian
+        mask = (1 << (8 * width)) - 1
+        self.write(addr, b"".join(_int_to_bytes(value & mask, width, big_endian)
+                                  for value in values))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step is not None:
+                raise IndexError("Memory slices can't have a step")
+            return self.read(key.start, key.stop - key.start)
+        return bytearray(self.read(key, 1))[0]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            if key.step is not None:
+                raise IndexError("Memory slices can't have a step")
+            if len(value) != key.stop - key.start:
+                raise ValueError("Assigning %d bytes to a slice of %d" % (len(value), key.stop - key.start))
+            self.write(key.start, value)
+        else:
+            self.write(key, bytearray([value]))
+
+    @property
+    def allocated(self):
+        """Number of bytes of storage allocated for pages"""
+        if not self._track:
+            return len(self._backing)
+        return len(self._pages) * self.page_size
+
+    def _format(self, filename, fmt):
+        if fmt is None:
+            fmt = {".bin": "bin", ".hex": "hex", ".mem": "hex"}.get(os.path.splitext(filename)[1].lower())
+        if fmt not in ("bin", "hex"):
+            raise ValueError("Unable to determine the format of memory image %s, specify bin or hex" % (filename))
+        return fmt
+
+    def load(self, filename, addr=0, fmt=None, width=1):
+        """
+        Load a memory image from a file.
+
+        Args:
+            filename (str): File holding the image
+            addr (int): Address of the start of the image
+            fmt (str): "bin" for a raw binary image or "hex" for a $readmemh
+                       style file of words width bytes wide, whose addresses
+                       count words from addr. By default this is chosen from
+                       the file extension.
+            width (int): Bytes per word of a hex file
+        """
+        fmt = self._format(filename, fmt)
+        if fmt == "bin":
+            with open(filename, "rb") as f:
+                while True:
+                    chunk = f.read(1 << 20)
+                    if not chunk:
+                        break
+                    self.write(addr, chunk)
+                    addr += len(chunk)
+            return
+
+        for index, values in _read_hex(filename):
+            self.write_words(addr + index * width, values, width)
+
+    def save(self, filename, addr, length, fmt=None, width=1):
+        """
+        Save length bytes from addr to a memory image file, in the formats
+        of load. A hex image starts with an address of 0 so it can be loaded
+        back to the same place.
+        """
+        fmt = self._format(filename, fmt)
+        if fmt == "bin":
+            with open(filename, "wb") as f:
+                for offset in range(0, length, 1 << 20):
+                    f.write(self.read(addr + offset, min(1 << 20, length - offset)))
+            return
+
+        if length % width:
+            raise ValueError("Can't save %d bytes as %d byte words" % (length, width))
+        with open(filename, "w") as f:
+            f.write("@0\n")
+            for value in self.read_words(addr, length // width, width):
+                f.write("%0*x\n" % (width * 2, value))
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,123 @@
+''' Copyright (c) 2014 Potential Ventures Ltd
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of Potential Ventures Ltd,
+      SolarFlare Communications Inc nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL POTENTIAL VENTURES LTD BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
+"""
+Monitors for Advanced Microcontroller Bus Architecture
+"""
+from cocotb.decorators import coroutine
+from cocotb.monitors import BusMonitor
+from cocotb.triggers import RisingEdge, ReadOnly
+from cocotb.binary import _int_to_bytes, _have_numpy
+from cocotb.drivers.amba import _Throttle
+
+if _have_numpy:
+    import numpy as np
+
+
+class AXI4StreamMonitor(BusMonitor):
+    """
+    AXI4-Stream Monitor
+
+    Reconstructs the frames ended by TLAST, or each beat when there is no
+    TLAST. Frames are received as bytes, leaving out any bytes not marked by
+    TKEEP, unless TDATA isn't a whole number of bytes or as_array is set, in
+    which case they are the value of each beat as a NumPy array (or a list
+    without NumPy). On a bus with TUSER each frame is a tuple of the data
+    and a list of the TUSER value of each beat.
+
+    When given a ready_generator of (on, off) cycle counts the monitor acts
+    as the sink, driving TREADY from a mask expanded from the generator.
+    """
+    _signals = ["tvalid", "tdata"]
+    _optional_signals = ["tready", "tlast", "tkeep", "tuser"]
+
+    def __init__(self, entity, name, clock, ready_generator=None, as_array=False,
+                 **kwargs):
+        BusMonitor.__init__(self, entity, name, clock, **kwargs)
+        self.as_array = as_array or len(self.bus.tdata) % 8 != 0
+        self.drive_ready = ready_generator is not None
+        self._ready = _Throttle(ready_generator)
+        if self.drive_ready:
+            self.bus.tready.setimmediatevalue(0)
+
+    def _frame(self, words, keeps):
+        """Convert the TDATA and TKEEP of each beat to a frame"""
+        if self.as_array:
+            if _have_numpy and len(self.bus.tdata) <= 64:
+                return np.array(words, dtype=np.uint64)
+            return words
+
+        bus_bytes = len(self.bus.tdata) // 8
+        full_keep = (1 << bus_bytes) - 1
+        data = bytearray()
+        for index, word in enumerate(words):
+            beat = _int_to_bytes(word, bus_bytes, False)
+            keep = keeps[index] if keeps else full_keep
+            if keep == full_keep:
+                data += beat
+            else:
+                data += bytearray(byte for lane, byte in enumerate(bytearray(beat))
+                                  if keep & (1 << lane))
+        return bytes(data)
+
+    @coroutine
+    def _monitor_recv(self):
+        """Watch the pins and reconstruct frames"""
+
+        # Avoid spurious object creation by recycling
+        clkedge = RisingEdge(self.clock)
+        rdonly = ReadOnly()
+
+        has_ready = hasattr(self.bus, "tready")
+        has_last = hasattr(self.bus, "tlast")
+        has_keep = hasattr(self.bus, "tkeep")
+        has_user = hasattr(self.bus, "tuser")
+        words, keeps, users = [], [], []
+
+        while True:
+            yield clkedge
+            if self.drive_ready:
+                self.bus.tready <= int(self._ready.allow())
+            yield rdonly
+
+            if self.in_reset:
+                continue
+
+            if not self.bus.tvalid.value or (has_ready and not self.bus.tready.value):
+                continue
+
+            words.append(int(self.bus.tdata))
+            if has_keep:
+                keeps.append(int(self.bus.tkeep))
+            if has_user:
+                users.append(int(self.bus.tuser))
+
+            if not has_last or self.bus.tlast.value:
+                frame = self._frame(words, keeps)
+                if has_user:
+                    frame = (frame, users)
+                self.log.debug("Received a frame of %d beats" % len(words))
+                self._recv(frame)
+                words, keeps, users = [], [], []
@@ -386,6 +386,11 @@ class RegressionManager(object):
         summary += "**                              REAL TIME : {0:<39}**\n".format('{0:.2f} S'.format(real_time))
         summary += "**                        SIM / REAL TIME : {0:<39}**\n".format('{0:.2f} NS/S'.format(ratio_time))
         summary += "*************************************************************************************\n"
+        if cocotb.handle.value_cache.enabled:
+            cache = cocotb.handle.value_cache
+            summary += "**                   VALUE CACHE HIT RATE : {0:<39}**\n".format(
+                '{0:.1f}% ({1} of {2} reads)'.format(100.0 * cache.hit_rate, cache.hits, cache.hits + cache.misses))
+            summary += "*************************************************************************************\n"
 
         self.log.info(summary)
 
@@ -66,6 +66,7 @@ else:
 
 import cocotb
 import cocotb.decorators
+from cocotb.handle import value_cache
 from cocotb.triggers import (Trigger, GPITrigger, Timer, ReadOnly, PythonTrigger,
                              _NextTimeStep, _ReadWrite, Event, NullTrigger)
 from cocotb.log import SimLog
@@ -320,6 +321,10 @@ class Scheduler(object):
                                str(trigger))
             return
 
+        # Any values read before a GPI trigger may have changed
+        if isinstance(trigger, GPITrigger):
+            value_cache.invalidate()
+
         if trigger is self._readonly:
             self._mode = Scheduler._MODE_READONLY
         # Only GPI triggers affect the simulator scheduling mode
@@ -336,6 +341,7 @@ class Scheduler(object):
             while self._writes:
                 handle, value = self._writes.popitem()
                 handle.setimmediatevalue(value)
+            value_cache.invalidate()
 
             self._readwrite.unprime()
 
@@ -461,6 +467,15 @@ class Scheduler(object):
             raise Exception("Write to object {0} was scheduled during a read-only sync phase.".format(handle._name))
         self._writes[handle] = value
 
+    def save_partial_write(self, handle, mask, value):
+        """
+        Merge a write to some of the bits of a vector with any pending write
+        to the same vector, so each vector is written once in ReadWrite
+        """
+        if self._mode == Scheduler._MODE_READONLY:
+            raise Exception("Write to object {0} was scheduled during a read-only sync phase.".format(handle._name))
+        self._writes[handle] = handle._merge_write(self._writes.get(handle), mask, value)
+
     def _coroutine_yielded(self, coro, triggers):
         """
         Prime the triggers and update our internal mappings
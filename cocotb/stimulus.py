@@ -0,0 +1,218 @@
+''' Copyright (c) 2013 Potential Ventures Ltd
+Copyright (c) 2013 SolarFlare Communications Inc
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of Potential Ventures Ltd,
+      SolarFlare Communications Inc nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL POTENTIAL VENTURES LTD BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
+
+"""
+Cycle stimulus queues, which write precomputed values to signals on
+successive clock edges from inside the simulator.
+
+Python is only called back when the queue runs low, rather than on every
+edge, which makes long stretches of known stimulus such as valid patterns
+much cheaper to play back.
+"""
+
+import os
+from itertools import islice
+
+# For autodocumentation don't need the extension modules
+if "SPHINX_BUILD" in os.environ:
+    simulator = None
+else:
+    import simulator
+
+from cocotb.binary import _have_numpy
+from cocotb.decorators import coroutine
+from cocotb.log import SimLog
+from cocotb.triggers import GPITrigger, RisingEdge, FallingEdge, Trigger
+
+if _have_numpy:
+    import numpy as np
+
+
+class _LowWater(GPITrigger):
+    """
+    Fired from the simulator when a stimulus queue runs low, no callback is
+    registered of its own
+    """
+    def __init__(self, queue):
+        GPITrigger.__init__(self)
+        self.queue = queue
+
+    def prime(self, callback):
+        self._callback = callback
+        Trigger.prime(self)
+
+    def fire(self):
+        if self.primed:
+            self.primed = False
+            self._callback(self)
+
+    def __str__(self):
+        return self.__class__.__name__ + "(%s)" % self.queue.name
+
+
+class StimulusQueue(object):
+    """
+    Writes one cycle of values to a group of signals on each edge of a clock.
+
+    Cycles are pushed as rows of integers, one per signal, or as a 2-D NumPy
+    array. An iterable source of cycles can be fed in instead, which is then
+    pulled from in chunks whenever fewer than low_water cycles remain::
+
+        queue = StimulusQueue(dut.clk, [dut.valid, dut.data])
+        queue.feed((1, n) for n in range(1000))
+        yield queue.drained()
+
+    Values are written in the edge callback itself rather than through the
+    scheduler, so they can't be backpressured by signals sampled on the same
+    edge.
+    """
+    def __init__(self, clock, signals, rising=True, low_water=64, chunk_size=1024):
+        """
+        Args:
+            clock (SimHandle): Clock whose edges write each cycle
+
+            signals (list): Handles of the signals to write
+
+        Kwargs:
+            rising (bool): Write on rising rather than falling edges
+
+            low_water (int): Refill from the source, and fire the trigger
+                             returned by wait, once fewer cycles remain
+
+            chunk_size (int): Cycles pulled from the source at a time
+        """
+        self.clock = clock
+        self.signals = list(signals)
+        self.name = ",".join(sig._name for sig in self.signals)
+        self.log = SimLog("cocotb.%s.%s" % (clock._name, self.__class__.__name__))
+        self.low_water = low_water
+        self.chunk_size = chunk_size
+        self._rising = rising
+        self._handles = tuple(sig._handle for sig in self.signals)
+        # Signals wider than 32 bits are written as vectors, their values are
+        # masked to the width so that negative values can be queued
+        self._wide = [(index, (1 << len(sig)) - 1)
+                      for index, sig in enumerate(self.signals) if len(sig) > 32]
+        self._source = None
+        self._trigger = _LowWater(self)
+        self._hdl = simulator.create_stimulus_queue(clock._handle,
+                                                    1 if rising else 2,
+                                                    low_water,
+                                                    self._low_water)
+
+    def _flatten(self, cycles):
+        nsignals = len(self._handles)
+        if _have_numpy and isinstance(cycles, np.ndarray):
+            if cycles.ndim != 1 and cycles.shape[-1] != nsignals:
+                raise ValueError("Expected %d values per cycle, not %d" %
+                                 (nsignals, cycles.shape[-1]))
+            if cycles.dtype.kind not in "uO":
+                cycles = cycles.astype(np.int64)
+            values = cycles.reshape(-1).tolist()
+        else:
+            values = []
+            for row in cycles:
+                if nsignals == 1 and not isinstance(row, (tuple, list)):
+                    values.append(int(row))
+                    continue
+                if len(row) != nsignals:
+                    raise ValueError("Expected %d values per cycle, not %d" %
+                                     (nsignals, len(row)))
+                values.extend(int(value) for value in row)
+        for index, mask in self._wide:
+            values[index::nsignals] = [int(value) & mask for value in values[index::nsignals]]
+        return values
+
+    def push(self, cycles):
+        """
+        Append cycles to be written, returning the number now queued.
+
+        A queue of a single signal also accepts plain integers for each cycle.
+        """
+        if self._hdl is None:
+            raise RuntimeError("Stimulus queue %s is closed" % self.name)
+        values = self._flatten(cycles)
+        if not values:
+            return len(self)
+        return simulator.stimulus_queue_push(self._hdl, self._handles, values)
+
+    def feed(self, source):
+        """Pull cycles from an iterable whenever the queue runs low"""
+        self._source = iter(source)
+        self._refill()
+
+    def _refill(self):
+        while self._source is not None and len(self) < self.low_water:
+            chunk = list(islice(self._source, self.chunk_size))
+            if not chunk:
+                self._source = None
+                break
+            self.push(chunk)
+
+    def _low_water(self):
+        """Called from the simulator's edge callback when the queue runs low"""
+        try:
+            self._refill()
+        except Exception:
+            self.log.exception("Stimulus source raised an exception, stopping it")
+            self._source = None
+        if self._trigger.primed:
+            self._trigger.fire()
+
+    def wait(self):
+        """
+        A trigger firing the next time the queue drops below low_water, after
+        any source has been pulled from
+        """
+        return self._trigger
+
+    @coroutine
+    def drained(self):
+        """Wait until every cycle queued has been written"""
+        while self._source is not None or len(self) >= self.low_water:
+            yield self.wait()
+        edge = RisingEdge(self.clock) if self._rising else FallingEdge(self.clock)
+        while len(self):
+            yield edge
+
+    def __len__(self):
+        if self._hdl is None:
+            return 0
+        return simulator.stimulus_queue_length(self._hdl)
+
+    def clear(self):
+        """Drop any cycles not yet written, including the rest of a source"""
+        self._source = None
+        if self._hdl is not None:
+            simulator.stimulus_queue_clear(self._hdl)
+
+    def close(self):
+        """Stop writing and release the queue in the simulator"""
+        self._source = None
+        if self._hdl is not None:
+            simulator.free_stimulus_queue(self._hdl)
+            self._hdl = None
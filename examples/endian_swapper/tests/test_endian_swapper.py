@@ -27,6 +27,7 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
 
 import random
 import logging
+import time
 
 import cocotb
 
@@ -174,6 +175,30 @@ factory.add_option("backpressure_inserter",
                    [None, wave, intermittent_single_cycles, random_50_percent])
 factory.generate_tests()
 
+
+@cocotb.test()
+def throughput_test(dut):
+    """Report how quickly full size packets can be driven into the DUT"""
+    cocotb.fork(Clock(dut.clk, 5000).start())
+    tb = EndianSwapperTB(dut)
+
+    yield tb.reset()
+    dut.stream_out_ready <= 1
+
+    packets = [get_bytes(1500, random_data()) for i in range(20)]
+    start = time.time()
+    for packet in packets:
+        yield tb.stream_in.send(packet)
+    elapsed = time.time() - start
+
+    nbytes = sum(len(packet) for packet in packets)
+    dut._log.info("Sent %d bytes in %.3fs, %.1f kB/s" % (
+                  nbytes, elapsed, nbytes / elapsed / 1000.0))
+
+    for i in range(2):
+        yield RisingEdge(dut.clk)
+    raise tb.scoreboard.result
+
 import cocotb.wavedrom
 
 
@@ -122,6 +122,11 @@ gpi_sim_hdl gpi_get_handle_by_name(gpi_sim_hdl parent, const char *name);
 gpi_sim_hdl gpi_get_handle_by_index(gpi_sim_hdl parent, int32_t index);
 void gpi_free_handle(gpi_sim_hdl gpi_hdl);
 
+// Names which could not be found are remembered so that looking them up again
+// doesn't query the simulator. Forget them, or get how many are remembered
+void gpi_clear_lookup_misses(void);
+int gpi_get_lookup_misses(void);
+
 // Types that can be passed to the iterator.
 //
 // Note these are strikingly similar to the VPI types...
@@ -159,6 +164,9 @@ gpi_iterator_hdl gpi_iterate(gpi_sim_hdl base, gpi_iterator_sel_t type);
 // Returns NULL when there are no more objects
 gpi_sim_hdl gpi_next(gpi_iterator_hdl iterator);
 
+// Free an iterator before gpi_next has returned NULL
+void gpi_free_iterator(gpi_iterator_hdl iterator);
+
 // Returns the number of objects in the collection of the handle
 int gpi_get_num_elems(gpi_sim_hdl gpi_sim_hdl);
 
@@ -197,6 +205,43 @@ void gpi_set_signal_value_real(gpi_sim_hdl gpi_hdl, double value);
 void gpi_set_signal_value_long(gpi_sim_hdl gpi_hdl, long value);
 void gpi_set_signal_value_str(gpi_sim_hdl gpi_hdl, const char *str);    // String of binary char(s) [1, 0, x, z]
 
+// Four state vector word, laid out the same as the VPI s_vpi_vecval so that
+// implementations can pass it straight through. Each bit is encoded as
+//
+//     aval bval
+//      0    0     0
+//      1    0     1
+//      0    1     Z
+//      1    1     X (or any other unresolved value)
+typedef struct gpi_vecval_s {
+    uint32_t aval;
+    uint32_t bval;
+} gpi_vecval_t;
+
+// Vector access to a signal. Words are ordered least significant first and
+// the buffer must hold at least (gpi_get_num_elems() + 31) / 32 entries.
+// Returns 0 on success and -1 if the value could not be converted.
+int gpi_get_signal_value_vector(gpi_sim_hdl gpi_hdl, gpi_vecval_t *value, int nwords);
+int gpi_set_signal_value_vector(gpi_sim_hdl gpi_hdl, const gpi_vecval_t *value, int nwords);
+// 1 if the implementation accesses the signal as a vector natively, rather
+// than through its binary string
+int gpi_has_native_vector(gpi_sim_hdl gpi_hdl);
+
+// Vector access to count elements of an array in one call, starting at index
+// first and moving to higher indices. Each element occupies elem_words
+// entries of the buffer. Returns -1 if any element could not be accessed in
+// this way, in which case the caller should fall back to indexing.
+int gpi_get_array_value_vector(gpi_sim_hdl gpi_hdl, int32_t first, int count,
+                               gpi_vecval_t *value, int elem_words);
+int gpi_set_array_value_vector(gpi_sim_hdl gpi_hdl, int32_t first, int count,
+                               const gpi_vecval_t *value, int elem_words);
+
+// Vector access to a whole aggregate such as a packed structure. The width
+// is -1 if the object can't be accessed in this way.
+int gpi_get_packed_width(gpi_sim_hdl gpi_hdl);
+int gpi_get_packed_value_vector(gpi_sim_hdl gpi_hdl, gpi_vecval_t *value, int nwords);
+int gpi_set_packed_value_vector(gpi_sim_hdl gpi_hdl, const gpi_vecval_t *value, int nwords);
+
 typedef enum gpi_edge {
     GPI_RISING = 1,
     GPI_FALLING = 2,
@@ -213,6 +258,31 @@ gpi_sim_hdl gpi_register_readwrite_callback              (int (*gpi_function)(co
 // For implementers of GPI the provided macro GPI_RET(x) is provided
 void gpi_deregister_callback(gpi_sim_hdl gpi_hdl);
 
+// Cycle stimulus queues write values to signals on successive edges of a
+// clock without calling back for every cycle. Each edge writes the next
+// queued cycle, if any, and low_water_function is called once fewer than
+// low_water cycles remain, at most once between pushes, so that more can be
+// pushed.
+gpi_sim_hdl gpi_create_stimulus_queue(gpi_sim_hdl clk_hdl, unsigned int edge, int low_water,
+                                      int (*low_water_function)(const void *), void *low_water_data);
+
+// Append ncycles cycles writing nsignals signals, values[cycle * nsignals + n]
+// being written to signals[n]. Signals with a non-zero nwords[n] are written
+// as vectors instead, taking that many words at a time from vectors in the
+// same order
+int gpi_stimulus_queue_push(gpi_sim_hdl queue_hdl, int nsignals, gpi_sim_hdl *signals,
+                            const int *nwords, int ncycles, const long *values,
+                            const gpi_vecval_t *vectors);
+
+// The number of cycles still to be written
+int gpi_stimulus_queue_length(gpi_sim_hdl queue_hdl);
+
+// Drop any cycles still to be written
+void gpi_stimulus_queue_clear(gpi_sim_hdl queue_hdl);
+
+// Stop writing and free the queue, returning the low_water_data
+void *gpi_free_stimulus_queue(gpi_sim_hdl queue_hdl);
+
 // Because the internal structures may be different for different implementations
 // of GPI we provide a convenience function to extract the callback data
 void *gpi_get_callback_data(gpi_sim_hdl gpi_hdl);
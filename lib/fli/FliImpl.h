@@ -213,6 +213,7 @@ public:
     virtual ~FliSignalObjHdl() { }
 
     virtual GpiCbHdl *value_change_cb(unsigned int edge);
+    virtual GpiCbHdl *new_value_change_cb(unsigned int edge);
     virtual int initialise(std::string &name, std::string &fq_name);
 
     bool is_var(void) { return m_is_var; }
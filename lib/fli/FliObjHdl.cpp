@@ -60,6 +60,23 @@ GpiCbHdl *FliSignalObjHdl::value_change_cb(unsigned int edge)
     return (GpiCbHdl *)cb;
 }
 
+GpiCbHdl *FliSignalObjHdl::new_value_change_cb(unsigned int edge)
+{
+    FliSignalCbHdl *cb;
+
+    if (m_is_var) {
+        return NULL;
+    }
+
+    cb = new FliSignalCbHdl(m_impl, this, edge);
+    if (cb->arm_callback()) {
+        delete cb;
+        return NULL;
+    }
+
+    return (GpiCbHdl *)cb;
+}
+
 int FliObjHdl::initialise(std::string &name, std::string &fq_name)
 {
     bool is_signal = (get_acc_type() == accSignal || get_acc_full_type() == accAliasSignal);
@@ -121,6 +121,122 @@ int GpiObjHdl::initialise(std::string &name, std::string &fq_name)
     return 0;
 }
 
+int GpiObjHdl::get_array_value_vector(int32_t first, int count,
+                                      gpi_vecval_t *value, int elem_words)
+{
+    int i;
+
+    for (i = 0; i < count; i++) {
+        GpiObjHdl *elem = m_impl->native_check_create(first + i, this);
+        GpiSignalObjHdl *sig = dynamic_cast<GpiSignalObjHdl*>(elem);
+        int ret = -1;
+
+        if (sig && sig->get_num_elems() <= elem_words * 32)
+            ret = sig->get_signal_value_vector(&value[i * elem_words], elem_words);
+
+        if (elem)
+            m_impl->free_handle(elem);
+
+        if (ret) {
+            LOG_DEBUG("%s: unable to read element %d as a vector", m_name.c_str(), first + i);
+            return -1;
+        }
+    }
+
+    return 0;
+}
+
+int GpiObjHdl::set_array_value_vector(int32_t first, int count,
+                                      const gpi_vecval_t *value, int elem_words)
+{
+    int i;
+
+    for (i = 0; i < count; i++) {
+        GpiObjHdl *elem = m_impl->native_check_create(first + i, this);
+        GpiSignalObjHdl *sig = dynamic_cast<GpiSignalObjHdl*>(elem);
+        int ret = -1;
+
+        if (sig && sig->get_num_elems() <= elem_words * 32)
+            ret = sig->set_signal_value_vector(&value[i * elem_words], elem_words);
+
+        if (elem)
+            m_impl->free_handle(elem);
+
+        if (ret) {
+            LOG_DEBUG("%s: unable to write element %d as a vector", m_name.c_str(), first + i);
+            return -1;
+        }
+    }
+
+    return 0;
+}
+
+int GpiSignalObjHdl::get_signal_value_vector(gpi_vecval_t *value, int nwords)
+{
+    const char *binstr = get_signal_value_binstr();
+    int len;
+    int i;
+
+    if (!binstr)
+        return -1;
+
+    len = strlen(binstr);
+    if (len > nwords * 32) {
+        LOG_DEBUG("%s: %d bits will not fit into %d vector words", m_name.c_str(), len, nwords);
+        return -1;
+    }
+
+    memset(value, 0, nwords * sizeof(gpi_vecval_t));
+
+    /* The string is MSB first, vector words are LSB first */
+    for (i = 0; i < len; i++) {
+        uint32_t bit = 1U << (i % 32);
+        gpi_vecval_t *word = &value[i / 32];
+
+        switch (binstr[len - 1 - i]) {
+            case '0':
+                break;
+            case '1':
+                word->aval |= bit;
+                break;
+            case 'z':
+            case 'Z':
+                word->bval |= bit;
+                break;
+            default:
+                word->aval |= bit;
+                word->bval |= bit;
+                break;
+        }
+    }
+
+    return 0;
+}
+
+int GpiSignalObjHdl::set_signal_value_vector(const gpi_vecval_t *value, int nwords)
+{
+    static const char vec2chr[] = { '0', '1', 'z', 'x' };
+    int len = m_num_elems;
+    int i;
+
+    if (len > nwords * 32) {
+        LOG_ERROR("%s: %d bits will not fit into %d vector words", m_name.c_str(), len, nwords);
+        return -1;
+    }
+
+    std::string binstr(len, '0');
+
+    for (i = 0; i < len; i++) {
+        const gpi_vecval_t *word = &value[i / 32];
+        int shift = i % 32;
+        int idx = ((word->aval >> shift) & 1) | (((word->bval >> shift) & 1) << 1);
+
+        binstr[len - 1 - i] = vec2chr[idx];
+    }
+
+    return set_signal_value(binstr);
+}
+
 int GpiCbHdl::run_callback(void)
 {
     LOG_DEBUG("Generic run_callback");
@@ -206,3 +322,120 @@ int GpiValueCbHdl::run_callback(void)
 
     return 0;
 }
+
+GpiCbHdl *GpiSignalObjHdl::new_value_change_cb(unsigned int edge)
+{
+    LOG_ERROR("%s: %s doesn't support private value change callbacks",
+              m_name.c_str(), m_impl->get_name_c());
+    return NULL;
+}
+
+GpiStimulusQueue::~GpiStimulusQueue()
+{
+    if (m_edge_cb) {
+        m_edge_cb->cleanup_callback();
+        delete m_edge_cb;
+    }
+}
+
+int GpiStimulusQueue::start(GpiSignalObjHdl *clk, unsigned int edge)
+{
+    m_edge_cb = clk->new_value_change_cb(edge);
+    if (!m_edge_cb)
+        return -1;
+
+    m_edge_cb->set_user_data(handle_edge, this);
+    return 0;
+}
+
+void GpiStimulusQueue::push(int nsignals, GpiSignalObjHdl **signals, const int *nwords,
+                            int ncycles, const long *values, const gpi_vecval_t *vectors)
+{
+    int cycle;
+    int i;
+
+    for (cycle = 0; cycle < ncycles; cycle++) {
+        for (i = 0; i < nsignals; i++) {
+            m_stimuli.push_back(Stimulus());
+            Stimulus &stimulus = m_stimuli.back();
+            stimulus.signal = signals[i];
+            stimulus.value = values[cycle * nsignals + i];
+            if (nwords[i]) {
+                stimulus.vector.assign(vectors, vectors + nwords[i]);
+                vectors += nwords[i];
+            }
+        }
+        m_cycle_sizes.push_back(nsignals);
+    }
+
+    m_notified = false;
+}
+
+void GpiStimulusQueue::clear(void)
+{
+    m_stimuli.clear();
+    m_cycle_sizes.clear();
+}
+
+void *GpiStimulusQueue::close(void)
+{
+    void *data = m_low_water_data;
+
+    /* The edge callback can't be freed while the simulator is running it, so
+       leave it unprimed to be removed once the cycle finishes */
+    if (m_in_cycle) {
+        m_closing = true;
+        clear();
+        return data;
+    }
+
+    delete this;
+    return data;
+}
+
+int GpiStimulusQueue::handle_edge(const void *data)
+{
+    GpiStimulusQueue *queue = static_cast<GpiStimulusQueue*>(const_cast<void*>(data));
+    queue->run_cycle();
+    return 0;
+}
+
+void GpiStimulusQueue::run_cycle(void)
+{
+    int count;
+
+    m_in_cycle = true;
+
+    if (!m_cycle_sizes.empty()) {
+        count = m_cycle_sizes.front();
+        m_cycle_sizes.pop_front();
+
+        while (count--) {
+            Stimulus &stimulus = m_stimuli.front();
+            if (stimulus.vector.empty())
+                stimulus.signal->set_signal_value(stimulus.value);
+            else
+                stimulus.signal->set_signal_value_vector(&stimulus.vector[0],
+                                                         (int)stimulus.vector.size());
+            m_stimuli.pop_front();
+        }
+    }
+
+    if (!m_notified && length() < m_low_water) {
+        m_notified = true;
+        m_low_water_function(m_low_water_data);
+    }
+
+    m_in_cycle = false;
+
+    if (m_closing) {
+        /* The implementation removes the callback as it isn't primed, the
+           handle itself can't be deleted from inside its own callback */
+        m_edge_cb = NULL;
+        delete this;
+        return;
+    }
+
+    /* Stay registered for the next edge */
+    m_edge_cb->set_call_state(GPI_PRIMED);
+}
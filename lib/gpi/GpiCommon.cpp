@@ -33,6 +33,7 @@
 #include <unistd.h>
 #include <vector>
 #include <map>
+#include <set>
 
 using namespace std;
 
@@ -61,6 +62,14 @@ public:
         }
     }
 
+    void remove(GpiObjHdl *hdl) {
+        std::map<std::string, GpiObjHdl*>::iterator it;
+
+        it = handle_map.find(hdl->get_fullname());
+        if (it != handle_map.end() && it->second == hdl)
+            handle_map.erase(it);
+    }
+
     uint64_t handle_count(void) {
         return handle_map.size();
     }
@@ -73,13 +82,62 @@ private:
 static GpiHandleStore unique_handles;
 
 #define CHECK_AND_STORE(_x) unique_handles.check_and_store(_x)
+#define REMOVE_FROM_STORE(_x) unique_handles.remove(_x)
 
 #else
 
 #define CHECK_AND_STORE(_x) _x
+#define REMOVE_FROM_STORE(_x)
 
 #endif
 
+/* Remembers which implementation found the children of each scope so that
+   lookups in mixed language designs go straight to it, along with the names
+   which no implementation could find. Hierarchy can't change after
+   elaboration so neither needs invalidating, but the misses are dropped once
+   there are GPI_MAX_MISSING of them or when asked to. Scopes are keyed by
+   full name since handles may be freed and their addresses reused */
+#define GPI_MAX_MISSING 4096
+
+class GpiLookupCache {
+public:
+    GpiImplInterface * get_impl(GpiObjHdl *parent) {
+        std::map<std::string, GpiImplInterface*>::iterator it;
+
+        it = scope_impl.find(parent->get_fullname());
+        if (it == scope_impl.end())
+            return NULL;
+        return it->second;
+    }
+
+    void set_impl(GpiObjHdl *parent, GpiImplInterface *impl) {
+        scope_impl[parent->get_fullname()] = impl;
+    }
+
+    bool is_missing(GpiObjHdl *parent, const std::string &name) {
+        return missing.find(parent->get_fullname() + "." + name) != missing.end();
+    }
+
+    void set_missing(GpiObjHdl *parent, const std::string &name) {
+        if (missing.size() >= GPI_MAX_MISSING)
+            missing.clear();
+        missing.insert(parent->get_fullname() + "." + name);
+    }
+
+    void clear_missing(void) {
+        missing.clear();
+    }
+
+    int num_missing(void) {
+        return (int)missing.size();
+    }
+
+private:
+    std::map<std::string, GpiImplInterface*> scope_impl;
+    std::set<std::string> missing;
+};
+
+static GpiLookupCache lookup_cache;
 
 int gpi_print_registered_impl(void)
 {
@@ -252,9 +310,24 @@ static GpiObjHdl* __gpi_get_handle_by_name(GpiObjHdl *parent,
     vector<GpiImplInterface*>::iterator iter;
 
     GpiObjHdl *hdl = NULL;
+    GpiImplInterface *cached_impl;
 
     LOG_DEBUG("Searching for %s", name.c_str());
 
+    if (lookup_cache.is_missing(parent, name)) {
+        LOG_DEBUG("%s previously not found in %s", name.c_str(), parent->get_name_str());
+        return NULL;
+    }
+
+    /* Try the implementation which found the other children of this scope first */
+    cached_impl = lookup_cache.get_impl(parent);
+    if (cached_impl && cached_impl != skip_impl) {
+        if ((hdl = cached_impl->native_check_create(name, parent))) {
+            LOG_DEBUG("Found %s via cached %s", name.c_str(), cached_impl->get_name_c());
+            return CHECK_AND_STORE(hdl);
+        }
+    }
+
     for (iter = registered_impls.begin();
          iter != registered_impls.end();
          iter++) {
@@ -264,6 +337,9 @@ static GpiObjHdl* __gpi_get_handle_by_name(GpiObjHdl *parent,
             continue;
         }
 
+        if (cached_impl == (*iter))
+            continue;
+
         LOG_DEBUG("Checking if %s native though impl %s",
                   name.c_str(),
                   (*iter)->get_name_c());
@@ -277,14 +353,18 @@ static GpiObjHdl* __gpi_get_handle_by_name(GpiObjHdl *parent,
         //std::string &to_query = base->is_this_impl(*iter) ? s_name : fq_name;
         if ((hdl = (*iter)->native_check_create(name, parent))) {
             LOG_DEBUG("Found %s via %s", name.c_str(), (*iter)->get_name_c());
+            lookup_cache.set_impl(parent, *iter);
             break;
         }
     }
 
     if (hdl)
         return CHECK_AND_STORE(hdl);
-    else
-        return hdl;
+
+    /* A search which skipped an implementation doesn't prove the name is missing */
+    if (!skip_impl)
+        lookup_cache.set_missing(parent, name);
+    return hdl;
 }
 
 static GpiObjHdl* __gpi_get_handle_by_raw(GpiObjHdl *parent,
@@ -355,6 +435,26 @@ gpi_sim_hdl gpi_get_handle_by_index(gpi_sim_hdl parent, int32_t index)
     }
 }
 
+void gpi_free_handle(gpi_sim_hdl hdl)
+{
+    GpiObjHdl *obj = sim_to_hdl<GpiObjHdl*>(hdl);
+
+    LOG_DEBUG("Freeing handle to %s", obj->get_name_str());
+
+    REMOVE_FROM_STORE(obj);
+    obj->m_impl->free_handle(obj);
+}
+
+void gpi_clear_lookup_misses(void)
+{
+    lookup_cache.clear_missing();
+}
+
+int gpi_get_lookup_misses(void)
+{
+    return lookup_cache.num_missing();
+}
+
 gpi_iterator_hdl gpi_iterate(gpi_sim_hdl base, gpi_iterator_sel_t type)
 {
     GpiObjHdl *obj_hdl = sim_to_hdl<GpiObjHdl*>(base);
@@ -406,6 +506,12 @@ gpi_sim_hdl gpi_next(gpi_iterator_hdl iterator)
     }
 }
 
+void gpi_free_iterator(gpi_iterator_hdl iterator)
+{
+    GpiIterator *iter = sim_to_hdl<GpiIterator*>(iterator);
+    delete iter;
+}
+
 const char* gpi_get_definition_name(gpi_sim_hdl sig_hdl)
 {
     GpiObjHdl *obj_hdl = sim_to_hdl<GpiObjHdl*>(sig_hdl);
@@ -489,6 +595,56 @@ void gpi_set_signal_value_str(gpi_sim_hdl sig_hdl, const char *str)
     obj_hdl->set_signal_value(value);
 }
 
+int gpi_get_signal_value_vector(gpi_sim_hdl sig_hdl, gpi_vecval_t *value, int nwords)
+{
+    GpiSignalObjHdl *obj_hdl = sim_to_hdl<GpiSignalObjHdl*>(sig_hdl);
+    return obj_hdl->get_signal_value_vector(value, nwords);
+}
+
+int gpi_set_signal_value_vector(gpi_sim_hdl sig_hdl, const gpi_vecval_t *value, int nwords)
+{
+    GpiSignalObjHdl *obj_hdl = sim_to_hdl<GpiSignalObjHdl*>(sig_hdl);
+    return obj_hdl->set_signal_value_vector(value, nwords);
+}
+
+int gpi_has_native_vector(gpi_sim_hdl sig_hdl)
+{
+    GpiSignalObjHdl *obj_hdl = sim_to_hdl<GpiSignalObjHdl*>(sig_hdl);
+    return obj_hdl->has_native_vector();
+}
+
+int gpi_get_array_value_vector(gpi_sim_hdl sig_hdl, int32_t first, int count,
+                               gpi_vecval_t *value, int elem_words)
+{
+    GpiObjHdl *obj_hdl = sim_to_hdl<GpiObjHdl*>(sig_hdl);
+    return obj_hdl->get_array_value_vector(first, count, value, elem_words);
+}
+
+int gpi_set_array_value_vector(gpi_sim_hdl sig_hdl, int32_t first, int count,
+                               const gpi_vecval_t *value, int elem_words)
+{
+    GpiObjHdl *obj_hdl = sim_to_hdl<GpiObjHdl*>(sig_hdl);
+    return obj_hdl->set_array_value_vector(first, count, value, elem_words);
+}
+
+int gpi_get_packed_width(gpi_sim_hdl sig_hdl)
+{
+    GpiObjHdl *obj_hdl = sim_to_hdl<GpiObjHdl*>(sig_hdl);
+    return obj_hdl->get_packed_width();
+}
+
+int gpi_get_packed_value_vector(gpi_sim_hdl sig_hdl, gpi_vecval_t *value, int nwords)
+{
+    GpiObjHdl *obj_hdl = sim_to_hdl<GpiObjHdl*>(sig_hdl);
+    return obj_hdl->get_packed_value_vector(value, nwords);
+}
+
+int gpi_set_packed_value_vector(gpi_sim_hdl sig_hdl, const gpi_vecval_t *value, int nwords)
+{
+    GpiObjHdl *obj_hdl = sim_to_hdl<GpiObjHdl*>(sig_hdl);
+    return obj_hdl->set_packed_value_vector(value, nwords);
+}
+
 void gpi_set_signal_value_real(gpi_sim_hdl sig_hdl, double value)
 {
     GpiSignalObjHdl *obj_hdl = sim_to_hdl<GpiSignalObjHdl*>(sig_hdl);
@@ -613,6 +769,59 @@ void gpi_deregister_callback(gpi_sim_hdl hdl)
     cb_hdl->m_impl->deregister_callback(cb_hdl);
 }
 
+gpi_sim_hdl gpi_create_stimulus_queue(gpi_sim_hdl clk_hdl, unsigned int edge, int low_water,
+                                      int (*low_water_function)(const void *), void *low_water_data)
+{
+    GpiSignalObjHdl *clk = sim_to_hdl<GpiSignalObjHdl*>(clk_hdl);
+    GpiStimulusQueue *queue = new GpiStimulusQueue(low_water, low_water_function, low_water_data);
+
+    if (queue->start(clk, edge)) {
+        LOG_ERROR("Failed to create a stimulus queue on %s", clk->get_name_str());
+        delete queue;
+        return NULL;
+    }
+
+    return (gpi_sim_hdl)queue;
+}
+
+int gpi_stimulus_queue_push(gpi_sim_hdl queue_hdl, int nsignals, gpi_sim_hdl *signals,
+                            const int *nwords, int ncycles, const long *values,
+                            const gpi_vecval_t *vectors)
+{
+    GpiStimulusQueue *queue = sim_to_hdl<GpiStimulusQueue*>(queue_hdl);
+    vector<GpiSignalObjHdl*> sig_hdls(nsignals);
+    int i;
+
+    for (i = 0; i < nsignals; i++)
+        sig_hdls[i] = sim_to_hdl<GpiSignalObjHdl*>(signals[i]);
+
+    queue->push(nsignals, nsignals ? &sig_hdls[0] : NULL, nwords, ncycles, values, vectors);
+    return queue->length();
+}
+
+int gpi_stimulus_queue_length(gpi_sim_hdl queue_hdl)
+{
+    GpiStimulusQueue *queue = sim_to_hdl<GpiStimulusQueue*>(queue_hdl);
+    return queue->length();
+}
+
+void gpi_stimulus_queue_clear(gpi_sim_hdl queue_hdl)
+{
+    GpiStimulusQueue *queue = sim_to_hdl<GpiStimulusQueue*>(queue_hdl);
+    queue->clear();
+}
+
+void *gpi_free_stimulus_queue(gpi_sim_hdl queue_hdl)
+{
+    GpiStimulusQueue *queue = sim_to_hdl<GpiStimulusQueue*>(queue_hdl);
+    return queue->close();
+}
+
+void GpiImplInterface::free_handle(GpiObjHdl *obj_hdl)
+{
+    delete obj_hdl;
+}
+
 const char* GpiImplInterface::get_name_c(void) {
     return m_name.c_str();
 }
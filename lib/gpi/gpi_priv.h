@@ -33,6 +33,7 @@
 #include <embed.h>
 #include <string>
 #include <vector>
+#include <deque>
 #include <map>
 
 typedef enum gpi_cb_state {
@@ -142,6 +143,19 @@ public:
     bool is_native_impl(GpiImplInterface *impl);
     virtual int initialise(std::string &name, std::string &full_name);
 
+    // Bulk access to the elements of an array, the default implementation
+    // creates a temporary handle for each element
+    virtual int get_array_value_vector(int32_t first, int count,
+                                       gpi_vecval_t *value, int elem_words);
+    virtual int set_array_value_vector(int32_t first, int count,
+                                       const gpi_vecval_t *value, int elem_words);
+
+    // Access to aggregates such as packed structures as a single vector,
+    // only implementations that support this override them
+    virtual int get_packed_width(void) { return -1; }
+    virtual int get_packed_value_vector(gpi_vecval_t *value, int nwords) { return -1; }
+    virtual int set_packed_value_vector(const gpi_vecval_t *value, int nwords) { return -1; }
+
 protected:
     int           m_num_elems;
     bool          m_indexable;
@@ -179,10 +193,21 @@ public:
     virtual int set_signal_value(const long value) = 0;
     virtual int set_signal_value(const double value) = 0;
     virtual int set_signal_value(std::string &value) = 0;
+
+    // Default implementations go via the binary string, implementations that
+    // can natively access aval/bval words should override these
+    virtual int get_signal_value_vector(gpi_vecval_t *value, int nwords);
+    virtual int set_signal_value_vector(const gpi_vecval_t *value, int nwords);
+    virtual bool has_native_vector(void) { return false; }
     //virtual GpiCbHdl monitor_value(bool rising_edge) = 0; this was for the triggers
     // but the explicit ones are probably better
 
     virtual GpiCbHdl *value_change_cb(unsigned int edge) = 0;
+
+    // A value change callback of its own for a user which stays registered,
+    // rather than one shared with every other user of the signal. The caller
+    // cleans up and deletes it.
+    virtual GpiCbHdl *new_value_change_cb(unsigned int edge);
 };
 
 
@@ -237,6 +262,50 @@ public:
     int stop_clock(void) { return 0; }
 };
 
+/* Values written to signals on successive edges of a clock without going back
+   to the user each cycle, see gpi_create_stimulus_queue */
+class GpiStimulusQueue {
+public:
+    GpiStimulusQueue(int low_water,
+                     int (*low_water_function)(const void *),
+                     void *low_water_data) : m_edge_cb(NULL),
+                                             m_low_water(low_water),
+                                             m_notified(false),
+                                             m_in_cycle(false),
+                                             m_closing(false),
+                                             m_low_water_function(low_water_function),
+                                             m_low_water_data(low_water_data) { }
+    ~GpiStimulusQueue();
+
+    int start(GpiSignalObjHdl *clk, unsigned int edge);
+    void push(int nsignals, GpiSignalObjHdl **signals, const int *nwords,
+              int ncycles, const long *values, const gpi_vecval_t *vectors);
+    int length(void) { return (int)m_cycle_sizes.size(); }
+    void clear(void);
+    void *close(void);
+
+    static int handle_edge(const void *data);
+
+private:
+    struct Stimulus {
+        GpiSignalObjHdl *signal;
+        long value;
+        std::vector<gpi_vecval_t> vector;   // Used instead of value if not empty
+    };
+
+    void run_cycle(void);
+
+    std::deque<Stimulus> m_stimuli;     // Values for every cycle in order
+    std::deque<int> m_cycle_sizes;      // Number of values in each cycle
+    GpiCbHdl *m_edge_cb;
+    int m_low_water;
+    bool m_notified;                    // Told the user since the last push
+    bool m_in_cycle;
+    bool m_closing;
+    int (*m_low_water_function)(const void *);
+    void *m_low_water_data;
+};
+
 class GpiIterator : public GpiHdl {
 public:
     enum Status {
@@ -318,6 +387,7 @@ public:
     virtual GpiObjHdl* native_check_create(void *raw_hdl, GpiObjHdl *parent) = 0;
     virtual GpiObjHdl *get_root_handle(const char *name) = 0;
     virtual GpiIterator *iterate_handle(GpiObjHdl *obj_hdl, gpi_iterator_sel_t type) = 0;
+    virtual void free_handle(GpiObjHdl *obj_hdl);                // Delete along with the native handle
 
     /* Callback related, these may (will) return the same handle*/
     virtual GpiCbHdl *register_timed_callback(uint64_t time_ps) = 0;
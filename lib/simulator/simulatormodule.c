@@ -155,6 +155,45 @@ err:
     return ret;
 }
 
+// Low water callbacks of stimulus queues fire repeatedly, so unlike
+// handle_gpi_callback the user data stays until the queue is freed
+int handle_stimulus_low_water(void *user_data)
+{
+    int ret = 0;
+    to_python();
+    p_callback_data callback_data_p = (p_callback_data)user_data;
+
+    if (callback_data_p->id_value != COCOTB_ACTIVE_ID) {
+        fprintf(stderr, "Userdata corrupted!\n");
+        ret = 1;
+        goto err;
+    }
+
+    gpi_get_sim_time(&cache_time.high, &cache_time.low);
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    PyObject *pValue = PyObject_Call(callback_data_p->function, callback_data_p->args, callback_data_p->kwargs);
+
+    if (pValue == NULL)
+    {
+        fprintf(stderr, "ERROR: stimulus queue low water function returned NULL\n");
+        if (PyErr_Occurred())
+            PyErr_Print();
+
+        gpi_sim_end();
+    } else {
+        Py_DECREF(pValue);
+    }
+
+    DROP_GIL(gstate);
+
+err:
+    to_simulator();
+    return ret;
+}
+
 static PyObject *log_msg(PyObject *self, PyObject *args)
 {
     const char *name;
@@ -549,6 +588,185 @@ static PyObject *next(PyObject *self, PyObject *args)
 }
 
 
+// Minimal glob match supporting '*' and '?', brackets are treated literally
+// since they are part of the names of generate scopes
+static int glob_match(const char *pattern, const char *str)
+{
+    const char *star = NULL;
+    const char *retry = str;
+
+    while (*str) {
+        if (*pattern == '?' || *pattern == *str) {
+            pattern++;
+            str++;
+        } else if (*pattern == '*') {
+            star = pattern++;
+            retry = str;
+        } else if (star) {
+            pattern = star + 1;
+            str = ++retry;
+        } else {
+            return 0;
+        }
+    }
+
+    while (*pattern == '*')
+        pattern++;
+
+    return !*pattern;
+}
+
+static int kind_match(PyObject *kinds, gpi_objtype_t type)
+{
+    Py_ssize_t i;
+
+    if (PySequence_Fast_GET_SIZE(kinds) == 0)
+        return 1;
+
+    for (i = 0; i < PySequence_Fast_GET_SIZE(kinds); i++) {
+        long kind = PyLong_AsLong(PySequence_Fast_GET_ITEM(kinds, i));
+
+        if (kind == -1 && PyErr_Occurred())
+            return -1;
+        if (kind == (long)type)
+            return 1;
+    }
+
+    return 0;
+}
+
+// Free a handle found while searching unless it is contained in live, the
+// handles already in use. Returns -1 with an exception set on failure.
+static int find_release(PyObject *live, gpi_sim_hdl hdl)
+{
+    PyObject *obj = PyLong_FromVoidPtr(hdl);
+    int in_use;
+
+    if (obj == NULL)
+        return -1;
+
+    in_use = PySequence_Contains(live, obj);
+    Py_DECREF(obj);
+    if (in_use < 0)
+        return -1;
+    if (!in_use)
+        gpi_free_handle(hdl);
+    return 0;
+}
+
+// Walk the children of hdl, appending the chain of (handle, name) pairs
+// leading to each match onto results. Children which are neither in a chain
+// nor contained in live, the handles already in use, are freed once their
+// children have been walked. Returns -1 with an exception set on failure.
+static int find_walk(gpi_sim_hdl hdl, const char *pattern, PyObject *kinds, int depth,
+                     int max_depth, PyObject *live, PyObject *chain, PyObject *results)
+{
+    gpi_iterator_hdl iter;
+    gpi_sim_hdl child;
+
+    iter = gpi_iterate(hdl, GPI_OBJECTS);
+    if (!iter)
+        return 0;
+
+    while ((child = gpi_next(iter)) != NULL) {
+        const char *name = gpi_get_signal_name_str(child);
+        const char *leaf;
+        gpi_objtype_t type = gpi_get_object_type(child);
+        Py_ssize_t found = PyList_GET_SIZE(results);
+        PyObject *link;
+        int ret = 0;
+
+        if (name == NULL) {
+            if (find_release(live, child)) {
+                gpi_free_iterator(iter);
+                return -1;
+            }
+            continue;
+        }
+
+        leaf = strrchr(name, '.');
+        leaf = leaf ? leaf + 1 : name;
+
+        link = Py_BuildValue("(Ns)", PyLong_FromVoidPtr(child), name);
+        if (link == NULL || PyList_Append(chain, link)) {
+            Py_XDECREF(link);
+            gpi_free_iterator(iter);
+            return -1;
+        }
+        Py_DECREF(link);
+
+        if (pattern == NULL || glob_match(pattern, leaf)) {
+            int matched = kind_match(kinds, type);
+
+            if (matched < 0) {
+                ret = -1;
+            } else if (matched) {
+                PyObject *match = PyList_AsTuple(chain);
+                if (match == NULL || PyList_Append(results, match))
+                    ret = -1;
+                Py_XDECREF(match);
+            }
+        }
+
+        if (!ret && (type == GPI_MODULE || type == GPI_GENARRAY) &&
+            (max_depth < 0 || depth < max_depth))
+            ret = find_walk(child, pattern, kinds, depth + 1, max_depth, live, chain, results);
+
+        // Release children which don't lead to a match
+        if (!ret && PyList_GET_SIZE(results) == found)
+            ret = find_release(live, child);
+
+        if (ret || PySequence_DelItem(chain, PyList_GET_SIZE(chain) - 1)) {
+            // The iterator is only freed by gpi_next once it is exhausted
+            gpi_free_iterator(iter);
+            return -1;
+        }
+    }
+
+    return 0;
+}
+
+static PyObject *find_handles(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    const char *pattern;
+    PyObject *kinds;
+    PyObject *live;
+    PyObject *chain;
+    PyObject *results;
+    int max_depth;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "lzOiO", &hdl, &pattern, &kinds, &max_depth, &live)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    kinds = PySequence_Fast(kinds, "Kinds must be a sequence of object types");
+    if (kinds == NULL) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    chain = PyList_New(0);
+    results = PyList_New(0);
+
+    if (chain == NULL || results == NULL ||
+        find_walk(hdl, pattern, kinds, 1, max_depth, live, chain, results)) {
+        Py_XDECREF(results);
+        results = NULL;
+    }
+
+    Py_XDECREF(chain);
+    Py_DECREF(kinds);
+
+    DROP_GIL(gstate);
+
+    return results;
+}
+
 static PyObject *get_signal_val_binstr(PyObject *self, PyObject *args)
 {
     gpi_sim_hdl hdl;
@@ -639,65 +857,173 @@ static PyObject *get_signal_val_long(PyObject *self, PyObject *args)
 }
 
 
-static PyObject *set_signal_val_str(PyObject *self, PyObject *args)
+// Vector words are least significant first, so pack them into a little
+// endian byte array that Python can convert in a single call.
+static PyObject *vecval_to_long(gpi_vecval_t *vec, int nwords, int use_bval)
 {
-    gpi_sim_hdl hdl;
-    const char *binstr;
-    PyObject *res;
+    unsigned char *bytes;
+    PyObject *result;
+    int i;
 
-    PyGILState_STATE gstate;
-    gstate = TAKE_GIL();
+    bytes = (unsigned char *)malloc(nwords * sizeof(uint32_t));
+    if (bytes == NULL) {
+        return PyErr_NoMemory();
+    }
 
-    if (!PyArg_ParseTuple(args, "ls", &hdl, &binstr)) {
-        DROP_GIL(gstate);
-        return NULL;
+    for (i = 0; i < nwords; i++) {
+        uint32_t word = use_bval ? vec[i].bval : vec[i].aval;
+        bytes[4*i]     = (unsigned char)(word);
+        bytes[4*i + 1] = (unsigned char)(word >> 8);
+        bytes[4*i + 2] = (unsigned char)(word >> 16);
+        bytes[4*i + 3] = (unsigned char)(word >> 24);
     }
 
-    gpi_set_signal_value_str(hdl,binstr);
-    res = Py_BuildValue("s", "OK!");
+    result = _PyLong_FromByteArray(bytes, nwords * sizeof(uint32_t), 1, 0);
+    free(bytes);
 
-    DROP_GIL(gstate);
+    return result;
+}
 
-    return res;
+// Returns -1 with a Python exception set if the integer is negative or will
+// not fit into the vector
+static int long_to_vecval(PyObject *obj, gpi_vecval_t *vec, int nwords, int use_bval)
+{
+    unsigned char *bytes;
+    PyObject *num;
+    int ret;
+    int i;
+
+    num = PyNumber_Long(obj);     // New reference, converts Python 2 ints
+    if (num == NULL) {
+        return -1;
+    }
+
+    bytes = (unsigned char *)malloc(nwords * sizeof(uint32_t));
+    if (bytes == NULL) {
+        Py_DECREF(num);
+        PyErr_NoMemory();
+        return -1;
+    }
+
+    ret = _PyLong_AsByteArray((PyLongObject *)num, bytes, nwords * sizeof(uint32_t), 1, 0);
+    Py_DECREF(num);
+
+    if (ret == 0) {
+        for (i = 0; i < nwords; i++) {
+            uint32_t word = (uint32_t)bytes[4*i] |
+                            ((uint32_t)bytes[4*i + 1] << 8) |
+                            ((uint32_t)bytes[4*i + 2] << 16) |
+                            ((uint32_t)bytes[4*i + 3] << 24);
+            if (use_bval)
+                vec[i].bval = word;
+            else
+                vec[i].aval = word;
+        }
+    }
+
+    free(bytes);
+    return ret;
 }
 
-static PyObject *set_signal_val_real(PyObject *self, PyObject *args)
+static PyObject *get_signal_val_vector(PyObject *self, PyObject *args)
 {
     gpi_sim_hdl hdl;
-    double value;
-    PyObject *res;
+    gpi_vecval_t *vec;
+    PyObject *aval;
+    PyObject *bval;
+    PyObject *retval;
+    int nwords;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
 
-    if (!PyArg_ParseTuple(args, "ld", &hdl, &value)) {
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
         DROP_GIL(gstate);
         return NULL;
     }
 
-    gpi_set_signal_value_real(hdl, value);
-    res = Py_BuildValue("s", "OK!");
+    nwords = (gpi_get_num_elems(hdl) + 31) / 32;
+    if (nwords <= 0) {
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    vec = (gpi_vecval_t *)malloc(nwords * sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    // Not all objects can be represented as a vector, let the caller fall
+    // back to the binary string
+    if (gpi_get_signal_value_vector(hdl, vec, nwords)) {
+        free(vec);
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    aval = vecval_to_long(vec, nwords, 0);
+    bval = vecval_to_long(vec, nwords, 1);
+    free(vec);
+
+    if (aval == NULL || bval == NULL) {
+        Py_XDECREF(aval);
+        Py_XDECREF(bval);
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    retval = Py_BuildValue("(NN)", aval, bval);
 
     DROP_GIL(gstate);
 
-    return res;
+    return retval;
 }
 
-static PyObject *set_signal_val_long(PyObject *self, PyObject *args)
+static PyObject *set_signal_val_vector(PyObject *self, PyObject *args)
 {
     gpi_sim_hdl hdl;
-    long value;
+    gpi_vecval_t *vec;
+    PyObject *value;
+    PyObject *unknown;
     PyObject *res;
+    int nwords;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
 
-    if (!PyArg_ParseTuple(args, "ll", &hdl, &value)) {
+    if (!PyArg_ParseTuple(args, "lOO", &hdl, &value, &unknown)) {
         DROP_GIL(gstate);
         return NULL;
     }
 
-    gpi_set_signal_value_long(hdl, value);
+    nwords = (gpi_get_num_elems(hdl) + 31) / 32;
+    if (nwords <= 0) {
+        PyErr_SetString(PyExc_TypeError, "Object can not be set as a vector");
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    vec = (gpi_vecval_t *)malloc(nwords * sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    if (long_to_vecval(value, vec, nwords, 0) ||
+        long_to_vecval(unknown, vec, nwords, 1)) {
+        free(vec);
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    if (gpi_set_signal_value_vector(hdl, vec, nwords)) {
+        free(vec);
+        PyErr_SetString(PyExc_ValueError, "Unable to set the value of the object as a vector");
+        DROP_GIL(gstate);
+        return NULL;
+    }
+    free(vec);
     res = Py_BuildValue("s", "OK!");
 
     DROP_GIL(gstate);
@@ -705,11 +1031,10 @@ static PyObject *set_signal_val_long(PyObject *self, PyObject *args)
     return res;
 }
 
-static PyObject *get_definition_name(PyObject *self, PyObject *args)
+static PyObject *has_native_vector(PyObject *self, PyObject *args)
 {
-    const char* result;
     gpi_sim_hdl hdl;
-    PyObject *retstr;
+    PyObject *res;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
@@ -719,19 +1044,16 @@ static PyObject *get_definition_name(PyObject *self, PyObject *args)
         return NULL;
     }
 
-    result = gpi_get_definition_name((gpi_sim_hdl)hdl);
-    retstr = Py_BuildValue("s", result);
+    res = PyBool_FromLong(gpi_has_native_vector(hdl));
 
     DROP_GIL(gstate);
 
-    return retstr;
+    return res;
 }
 
-static PyObject *get_definition_file(PyObject *self, PyObject *args)
+static PyObject *free_handle(PyObject *self, PyObject *args)
 {
-    const char* result;
     gpi_sim_hdl hdl;
-    PyObject *retstr;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
@@ -741,96 +1063,67 @@ static PyObject *get_definition_file(PyObject *self, PyObject *args)
         return NULL;
     }
 
-    result = gpi_get_definition_file((gpi_sim_hdl)hdl);
-    retstr = Py_BuildValue("s", result);
+    gpi_free_handle(hdl);
 
     DROP_GIL(gstate);
 
-    return retstr;
+    Py_RETURN_NONE;
 }
 
-static PyObject *get_handle_by_name(PyObject *self, PyObject *args)
+static PyObject *clear_lookup_misses(PyObject *self, PyObject *args)
 {
-    const char *name;
-    gpi_sim_hdl hdl;
-    gpi_sim_hdl result;
-    PyObject *res;
-
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
 
-    if (!PyArg_ParseTuple(args, "ls", &hdl, &name)) {
-        DROP_GIL(gstate);
-        return NULL;
-    }
-
-    result = gpi_get_handle_by_name((gpi_sim_hdl)hdl, name);
-
-    res = PyLong_FromVoidPtr(result);
+    gpi_clear_lookup_misses();
 
     DROP_GIL(gstate);
 
-    return res;
+    Py_RETURN_NONE;
 }
 
-static PyObject *get_handle_by_index(PyObject *self, PyObject *args)
+static PyObject *get_lookup_misses(PyObject *self, PyObject *args)
 {
-    int32_t index;
-    gpi_sim_hdl hdl;
-    gpi_sim_hdl result;
-    PyObject *value;
+    PyObject *retint;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
 
-    if (!PyArg_ParseTuple(args, "li", &hdl, &index)) {
-        DROP_GIL(gstate);
-        return NULL;
-    }
-
-    result = gpi_get_handle_by_index((gpi_sim_hdl)hdl, index);
-
-    value = PyLong_FromVoidPtr(result);
+    retint = Py_BuildValue("i", gpi_get_lookup_misses());
 
     DROP_GIL(gstate);
 
-    return value;
+    return retint;
 }
 
-static PyObject *get_root_handle(PyObject *self, PyObject *args)
+static PyObject *get_packed_width(PyObject *self, PyObject *args)
 {
-    const char *name;
-    gpi_sim_hdl result;
-    PyObject *value;
+    gpi_sim_hdl hdl;
+    PyObject *retval;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
 
-    if (!PyArg_ParseTuple(args, "z", &name)) {
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
         DROP_GIL(gstate);
         return NULL;
     }
 
-    result = gpi_get_root_handle(name);
-    if (NULL == result) {
-       DROP_GIL(gstate);
-       Py_RETURN_NONE;
-    }
-
-
-    value = PyLong_FromVoidPtr(result);
+    retval = Py_BuildValue("i", gpi_get_packed_width(hdl));
 
     DROP_GIL(gstate);
 
-    return value;
+    return retval;
 }
 
-
-static PyObject *get_name_string(PyObject *self, PyObject *args)
+static PyObject *get_packed_val_vector(PyObject *self, PyObject *args)
 {
-    const char *result;
     gpi_sim_hdl hdl;
-    PyObject *retstr;
+    gpi_vecval_t *vec;
+    PyObject *aval;
+    PyObject *bval;
+    PyObject *retval;
+    int nwords;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
@@ -840,52 +1133,734 @@ static PyObject *get_name_string(PyObject *self, PyObject *args)
         return NULL;
     }
 
-    result = gpi_get_signal_name_str((gpi_sim_hdl)hdl);
-    retstr = Py_BuildValue("s", result);
-
-    DROP_GIL(gstate);
+    nwords = (gpi_get_packed_width(hdl) + 31) / 32;
+    if (nwords <= 0) {
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
 
-    return retstr;
-}
+    vec = (gpi_vecval_t *)malloc(nwords * sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
 
-static PyObject *get_type(PyObject *self, PyObject *args)
-{
-    int result;
-    gpi_sim_hdl hdl;
-    PyObject *pyresult;
+    if (gpi_get_packed_value_vector(hdl, vec, nwords)) {
+        free(vec);
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
 
-    PyGILState_STATE gstate;
-    gstate = TAKE_GIL();
+    aval = vecval_to_long(vec, nwords, 0);
+    bval = vecval_to_long(vec, nwords, 1);
+    free(vec);
 
-    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+    if (aval == NULL || bval == NULL) {
+        Py_XDECREF(aval);
+        Py_XDECREF(bval);
         DROP_GIL(gstate);
         return NULL;
     }
 
-    result = gpi_get_object_type((gpi_sim_hdl)hdl);
-    pyresult = Py_BuildValue("i", result);
+    retval = Py_BuildValue("(NN)", aval, bval);
 
     DROP_GIL(gstate);
 
-    return pyresult;
+    return retval;
 }
 
-static PyObject *get_const(PyObject *self, PyObject *args)
+static PyObject *set_packed_val_vector(PyObject *self, PyObject *args)
 {
-    int result;
     gpi_sim_hdl hdl;
-    PyObject *pyresult;
+    gpi_vecval_t *vec;
+    PyObject *value;
+    PyObject *unknown;
+    PyObject *res;
+    int nwords;
 
     PyGILState_STATE gstate;
     gstate = TAKE_GIL();
 
-    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+    if (!PyArg_ParseTuple(args, "lOO", &hdl, &value, &unknown)) {
         DROP_GIL(gstate);
         return NULL;
     }
 
-    result = gpi_is_constant((gpi_sim_hdl)hdl);
-    pyresult = Py_BuildValue("i", result);
+    nwords = (gpi_get_packed_width(hdl) + 31) / 32;
+    if (nwords <= 0) {
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    vec = (gpi_vecval_t *)malloc(nwords * sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    if (long_to_vecval(value, vec, nwords, 0) ||
+        long_to_vecval(unknown, vec, nwords, 1)) {
+        free(vec);
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    if (gpi_set_packed_value_vector(hdl, vec, nwords)) {
+        Py_INCREF(Py_None);
+        res = Py_None;
+    } else {
+        res = Py_BuildValue("s", "OK!");
+    }
+    free(vec);
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+// Integer if every bit is resolved, binary string otherwise
+static PyObject *signal_value_object(gpi_sim_hdl hdl)
+{
+    gpi_vecval_t *vec;
+    PyObject *result = NULL;
+    int nwords;
+    int i;
+
+    nwords = (gpi_get_num_elems(hdl) + 31) / 32;
+    if (nwords > 0) {
+        vec = (gpi_vecval_t *)malloc(nwords * sizeof(gpi_vecval_t));
+        if (vec == NULL)
+            return PyErr_NoMemory();
+
+        if (!gpi_get_signal_value_vector(hdl, vec, nwords)) {
+            for (i = 0; i < nwords; i++) {
+                if (vec[i].bval)
+                    break;
+            }
+            if (i == nwords)
+                result = vecval_to_long(vec, nwords, 0);
+        }
+        free(vec);
+
+        if (result != NULL || PyErr_Occurred())
+            return result;
+    }
+
+    return Py_BuildValue("s", gpi_get_signal_value_binstr(hdl));
+}
+
+static PyObject *get_signal_vals(PyObject *self, PyObject *args)
+{
+    PyObject *handles;
+    PyObject *seq;
+    PyObject *result;
+    Py_ssize_t count;
+    Py_ssize_t i;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "O", &handles)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    seq = PySequence_Fast(handles, "Handles must be a sequence");
+    if (seq == NULL) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    count = PySequence_Fast_GET_SIZE(seq);
+    result = PyTuple_New(count);
+    if (result == NULL) {
+        Py_DECREF(seq);
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    for (i = 0; i < count; i++) {
+        gpi_sim_hdl hdl = (gpi_sim_hdl)PyLong_AsLong(PySequence_Fast_GET_ITEM(seq, i));
+        PyObject *value;
+
+        if (hdl == NULL && PyErr_Occurred())
+            value = NULL;
+        else
+            value = signal_value_object(hdl);
+
+        if (value == NULL) {
+            Py_DECREF(result);
+            result = NULL;
+            break;
+        }
+
+        // Steals the reference
+        PyTuple_SET_ITEM(result, i, value);
+    }
+
+    Py_DECREF(seq);
+
+    DROP_GIL(gstate);
+
+    return result;
+}
+
+static PyObject *get_array_val_vector(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    gpi_vecval_t *vec;
+    PyObject *values = NULL;
+    PyObject *unknowns = NULL;
+    PyObject *retval = NULL;
+    int first;
+    int count;
+    int bits;
+    int nwords;
+    int i;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "liii", &hdl, &first, &count, &bits)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    nwords = (bits + 31) / 32;
+    if (nwords <= 0 || count <= 0) {
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    vec = (gpi_vecval_t *)malloc(count * nwords * sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    if (gpi_get_array_value_vector(hdl, first, count, vec, nwords)) {
+        free(vec);
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    values = PyList_New(count);
+    unknowns = PyList_New(count);
+    if (values == NULL || unknowns == NULL)
+        goto out;
+
+    for (i = 0; i < count; i++) {
+        PyObject *aval = vecval_to_long(&vec[i * nwords], nwords, 0);
+        PyObject *bval = vecval_to_long(&vec[i * nwords], nwords, 1);
+
+        if (aval == NULL || bval == NULL) {
+            Py_XDECREF(aval);
+            Py_XDECREF(bval);
+            goto out;
+        }
+
+        // Steals the references
+        PyList_SET_ITEM(values, i, aval);
+        PyList_SET_ITEM(unknowns, i, bval);
+    }
+
+    retval = Py_BuildValue("(OO)", values, unknowns);
+
+out:
+    free(vec);
+    Py_XDECREF(values);
+    Py_XDECREF(unknowns);
+
+    DROP_GIL(gstate);
+
+    return retval;
+}
+
+static PyObject *set_array_val_vector(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    gpi_vecval_t *vec;
+    PyObject *values;
+    PyObject *seq;
+    PyObject *res = NULL;
+    int first;
+    int bits;
+    int count;
+    int nwords;
+    int i;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "liiO", &hdl, &first, &bits, &values)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    seq = PySequence_Fast(values, "Array values must be a sequence of integers");
+    if (seq == NULL) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    nwords = (bits + 31) / 32;
+    count = (int)PySequence_Fast_GET_SIZE(seq);
+    if (nwords <= 0 || count <= 0) {
+        Py_DECREF(seq);
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    // Zero fills the unknown mask
+    vec = (gpi_vecval_t *)calloc(count * nwords, sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        Py_DECREF(seq);
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    for (i = 0; i < count; i++) {
+        if (long_to_vecval(PySequence_Fast_GET_ITEM(seq, i), &vec[i * nwords], nwords, 0))
+            goto out;
+    }
+
+    if (gpi_set_array_value_vector(hdl, first, count, vec, nwords)) {
+        Py_INCREF(Py_None);
+        res = Py_None;
+    } else {
+        res = Py_BuildValue("s", "OK!");
+    }
+
+out:
+    free(vec);
+    Py_DECREF(seq);
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+// Memory images hold each element as word_bytes little endian bytes
+static int bytes_to_vecval(const unsigned char *bytes, int word_bytes, gpi_vecval_t *vec, int nwords, int bits)
+{
+    int i;
+
+    memset(vec, 0, nwords * sizeof(gpi_vecval_t));
+
+    for (i = 0; i < word_bytes; i++) {
+        if (!bytes[i])
+            continue;
+        if (i >= nwords * 4)
+            return -1;
+        vec[i / 4].aval |= (uint32_t)bytes[i] << (8 * (i % 4));
+    }
+
+    if ((bits % 32) && (vec[nwords - 1].aval >> (bits % 32)))
+        return -1;
+
+    return 0;
+}
+
+static void vecval_to_bytes(const gpi_vecval_t *vec, int nwords, unsigned char *bytes, int word_bytes)
+{
+    int i;
+
+    for (i = 0; i < word_bytes; i++) {
+        if (i < nwords * 4)
+            bytes[i] = (unsigned char)(vec[i / 4].aval >> (8 * (i % 4)));
+        else
+            bytes[i] = 0;
+    }
+}
+
+static PyObject *get_array_val_buffer(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    gpi_vecval_t *vec;
+    PyObject *res = NULL;
+    unsigned char *data;
+    int first;
+    int count;
+    int bits;
+    int word_bytes;
+    int nwords;
+    int i;
+    int j;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "liiii", &hdl, &first, &count, &bits, &word_bytes)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    nwords = (bits + 31) / 32;
+    if (nwords <= 0 || count <= 0 || word_bytes <= 0) {
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    vec = (gpi_vecval_t *)malloc(count * nwords * sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    if (gpi_get_array_value_vector(hdl, first, count, vec, nwords)) {
+        free(vec);
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    for (i = 0; i < count; i++) {
+        for (j = 0; j < nwords; j++) {
+            if (vec[i * nwords + j].bval) {
+                PyErr_Format(PyExc_ValueError, "Unresolved value at index %d", first + i);
+                goto out;
+            }
+        }
+    }
+
+    res = PyBytes_FromStringAndSize(NULL, (Py_ssize_t)count * word_bytes);
+    if (res == NULL)
+        goto out;
+
+    data = (unsigned char *)PyBytes_AS_STRING(res);
+    for (i = 0; i < count; i++)
+        vecval_to_bytes(&vec[i * nwords], nwords, &data[i * word_bytes], word_bytes);
+
+out:
+    free(vec);
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *set_array_val_buffer(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    gpi_vecval_t *vec;
+    Py_buffer buffer;
+    PyObject *res = NULL;
+    const unsigned char *data;
+    int first;
+    int bits;
+    int word_bytes;
+    int count;
+    int nwords;
+    int i;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    // Accepts anything exposing a buffer so an mmap of the image is used in place
+    if (!PyArg_ParseTuple(args, "liiis*", &hdl, &first, &bits, &word_bytes, &buffer)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    nwords = (bits + 31) / 32;
+    if (nwords <= 0 || word_bytes <= 0) {
+        PyBuffer_Release(&buffer);
+        DROP_GIL(gstate);
+        Py_RETURN_NONE;
+    }
+
+    if (buffer.len % word_bytes) {
+        PyErr_Format(PyExc_ValueError, "Buffer length %d is not a multiple of %d bytes",
+                     (int)buffer.len, word_bytes);
+        PyBuffer_Release(&buffer);
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    count = (int)(buffer.len / word_bytes);
+    if (count == 0) {
+        PyBuffer_Release(&buffer);
+        DROP_GIL(gstate);
+        return Py_BuildValue("s", "OK!");
+    }
+
+    vec = (gpi_vecval_t *)malloc(count * nwords * sizeof(gpi_vecval_t));
+    if (vec == NULL) {
+        PyBuffer_Release(&buffer);
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    data = (const unsigned char *)buffer.buf;
+    for (i = 0; i < count; i++) {
+        if (bytes_to_vecval(&data[i * word_bytes], word_bytes, &vec[i * nwords], nwords, bits)) {
+            PyErr_Format(PyExc_OverflowError, "Value for index %d does not fit in %d bits", first + i, bits);
+            goto out;
+        }
+    }
+
+    if (gpi_set_array_value_vector(hdl, first, count, vec, nwords)) {
+        Py_INCREF(Py_None);
+        res = Py_None;
+    } else {
+        res = Py_BuildValue("s", "OK!");
+    }
+
+out:
+    free(vec);
+    PyBuffer_Release(&buffer);
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *set_signal_val_str(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    const char *binstr;
+    PyObject *res;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "ls", &hdl, &binstr)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    gpi_set_signal_value_str(hdl,binstr);
+    res = Py_BuildValue("s", "OK!");
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *set_signal_val_real(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    double value;
+    PyObject *res;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "ld", &hdl, &value)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    gpi_set_signal_value_real(hdl, value);
+    res = Py_BuildValue("s", "OK!");
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *set_signal_val_long(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    long value;
+    PyObject *res;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "ll", &hdl, &value)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    gpi_set_signal_value_long(hdl, value);
+    res = Py_BuildValue("s", "OK!");
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *get_definition_name(PyObject *self, PyObject *args)
+{
+    const char* result;
+    gpi_sim_hdl hdl;
+    PyObject *retstr;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_get_definition_name((gpi_sim_hdl)hdl);
+    retstr = Py_BuildValue("s", result);
+
+    DROP_GIL(gstate);
+
+    return retstr;
+}
+
+static PyObject *get_definition_file(PyObject *self, PyObject *args)
+{
+    const char* result;
+    gpi_sim_hdl hdl;
+    PyObject *retstr;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_get_definition_file((gpi_sim_hdl)hdl);
+    retstr = Py_BuildValue("s", result);
+
+    DROP_GIL(gstate);
+
+    return retstr;
+}
+
+static PyObject *get_handle_by_name(PyObject *self, PyObject *args)
+{
+    const char *name;
+    gpi_sim_hdl hdl;
+    gpi_sim_hdl result;
+    PyObject *res;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "ls", &hdl, &name)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_get_handle_by_name((gpi_sim_hdl)hdl, name);
+
+    res = PyLong_FromVoidPtr(result);
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *get_handle_by_index(PyObject *self, PyObject *args)
+{
+    int32_t index;
+    gpi_sim_hdl hdl;
+    gpi_sim_hdl result;
+    PyObject *value;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "li", &hdl, &index)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_get_handle_by_index((gpi_sim_hdl)hdl, index);
+
+    value = PyLong_FromVoidPtr(result);
+
+    DROP_GIL(gstate);
+
+    return value;
+}
+
+static PyObject *get_root_handle(PyObject *self, PyObject *args)
+{
+    const char *name;
+    gpi_sim_hdl result;
+    PyObject *value;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "z", &name)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_get_root_handle(name);
+    if (NULL == result) {
+       DROP_GIL(gstate);
+       Py_RETURN_NONE;
+    }
+
+
+    value = PyLong_FromVoidPtr(result);
+
+    DROP_GIL(gstate);
+
+    return value;
+}
+
+
+static PyObject *get_name_string(PyObject *self, PyObject *args)
+{
+    const char *result;
+    gpi_sim_hdl hdl;
+    PyObject *retstr;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_get_signal_name_str((gpi_sim_hdl)hdl);
+    retstr = Py_BuildValue("s", result);
+
+    DROP_GIL(gstate);
+
+    return retstr;
+}
+
+static PyObject *get_type(PyObject *self, PyObject *args)
+{
+    int result;
+    gpi_sim_hdl hdl;
+    PyObject *pyresult;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_get_object_type((gpi_sim_hdl)hdl);
+    pyresult = Py_BuildValue("i", result);
+
+    DROP_GIL(gstate);
+
+    return pyresult;
+}
+
+static PyObject *get_const(PyObject *self, PyObject *args)
+{
+    int result;
+    gpi_sim_hdl hdl;
+    PyObject *pyresult;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    result = gpi_is_constant((gpi_sim_hdl)hdl);
+    pyresult = Py_BuildValue("i", result);
 
     DROP_GIL(gstate);
 
@@ -1036,6 +2011,226 @@ static PyObject *deregister_callback(PyObject *self, PyObject *args)
     return value;
 }
 
+static PyObject *create_stimulus_queue(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl clk_hdl;
+    gpi_sim_hdl hdl;
+    unsigned int edge;
+    int low_water;
+    PyObject *function;
+    p_callback_data callback_data_p;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "lIiO", &clk_hdl, &edge, &low_water, &function)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    if (!PyCallable_Check(function)) {
+        PyErr_SetString(PyExc_TypeError, "Low water function must be callable");
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    callback_data_p = (p_callback_data)malloc(sizeof(s_callback_data));
+    if (callback_data_p == NULL) {
+        DROP_GIL(gstate);
+        return PyErr_NoMemory();
+    }
+
+    Py_INCREF(function);
+    callback_data_p->_saved_thread_state = PyThreadState_Get();
+    callback_data_p->id_value = COCOTB_ACTIVE_ID;
+    callback_data_p->function = function;
+    callback_data_p->args = PyTuple_New(0);
+    callback_data_p->kwargs = NULL;
+
+    hdl = gpi_create_stimulus_queue(clk_hdl, edge, low_water,
+                                    (gpi_function_t)handle_stimulus_low_water,
+                                    callback_data_p);
+    if (hdl == NULL) {
+        Py_DECREF(callback_data_p->function);
+        Py_DECREF(callback_data_p->args);
+        free(callback_data_p);
+        PyErr_SetString(PyExc_RuntimeError, "Unable to create a stimulus queue");
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    callback_data_p->cb_hdl = hdl;
+
+    PyObject *rv = PyLong_FromVoidPtr(hdl);
+
+    DROP_GIL(gstate);
+
+    return rv;
+}
+
+static PyObject *stimulus_queue_push(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    PyObject *handles;
+    PyObject *values;
+    PyObject *hdl_seq = NULL;
+    PyObject *val_seq = NULL;
+    PyObject *res = NULL;
+    gpi_sim_hdl *signals = NULL;
+    int *nwords = NULL;
+    long *vals = NULL;
+    gpi_vecval_t *vectors = NULL;
+    gpi_vecval_t *vec;
+    Py_ssize_t nsignals;
+    Py_ssize_t nvalues;
+    Py_ssize_t cycle_words = 0;
+    Py_ssize_t i;
+    int elems;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "lOO", &hdl, &handles, &values))
+        goto out;
+
+    hdl_seq = PySequence_Fast(handles, "Handles must be a sequence");
+    if (hdl_seq == NULL)
+        goto out;
+
+    val_seq = PySequence_Fast(values, "Values must be a sequence");
+    if (val_seq == NULL)
+        goto out;
+
+    nsignals = PySequence_Fast_GET_SIZE(hdl_seq);
+    nvalues = PySequence_Fast_GET_SIZE(val_seq);
+    if (nsignals == 0 || nvalues % nsignals) {
+        PyErr_Format(PyExc_ValueError, "%zd values can't be split into cycles of %zd signals",
+                     nvalues, nsignals);
+        goto out;
+    }
+
+    signals = (gpi_sim_hdl *)malloc(nsignals * sizeof(gpi_sim_hdl));
+    nwords = (int *)malloc(nsignals * sizeof(int));
+    vals = (long *)malloc((nvalues ? nvalues : 1) * sizeof(long));
+    if (signals == NULL || nwords == NULL || vals == NULL) {
+        PyErr_NoMemory();
+        goto out;
+    }
+
+    /* Signals wider than the 32 bits set_signal_value can write are
+       written as vectors so their values aren't truncated */
+    for (i = 0; i < nsignals; i++) {
+        signals[i] = (gpi_sim_hdl)PyLong_AsLong(PySequence_Fast_GET_ITEM(hdl_seq, i));
+        if (signals[i] == NULL && PyErr_Occurred())
+            goto out;
+        elems = gpi_get_num_elems(signals[i]);
+        nwords[i] = elems > 32 ? (elems + 31) / 32 : 0;
+        cycle_words += nwords[i];
+    }
+
+    if (cycle_words) {
+        vectors = (gpi_vecval_t *)calloc((nvalues / nsignals) * cycle_words, sizeof(gpi_vecval_t));
+        if (vectors == NULL) {
+            PyErr_NoMemory();
+            goto out;
+        }
+    }
+
+    vec = vectors;
+    for (i = 0; i < nvalues; i++) {
+        if (nwords[i % nsignals]) {
+            vals[i] = 0;
+            if (long_to_vecval(PySequence_Fast_GET_ITEM(val_seq, i), vec, nwords[i % nsignals], 0))
+                goto out;
+            vec += nwords[i % nsignals];
+            continue;
+        }
+        vals[i] = PyLong_AsLong(PySequence_Fast_GET_ITEM(val_seq, i));
+        if (vals[i] == -1 && PyErr_Occurred())
+            goto out;
+    }
+
+    res = Py_BuildValue("i", gpi_stimulus_queue_push(hdl, (int)nsignals, signals, nwords,
+                                                     (int)(nvalues / nsignals), vals, vectors));
+
+out:
+    free(signals);
+    free(nwords);
+    free(vals);
+    free(vectors);
+    Py_XDECREF(hdl_seq);
+    Py_XDECREF(val_seq);
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *stimulus_queue_length(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    PyObject *res;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    res = Py_BuildValue("i", gpi_stimulus_queue_length(hdl));
+
+    DROP_GIL(gstate);
+
+    return res;
+}
+
+static PyObject *stimulus_queue_clear(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    gpi_stimulus_queue_clear(hdl);
+
+    DROP_GIL(gstate);
+
+    Py_RETURN_NONE;
+}
+
+static PyObject *free_stimulus_queue(PyObject *self, PyObject *args)
+{
+    gpi_sim_hdl hdl;
+    p_callback_data callback_data_p;
+
+    PyGILState_STATE gstate;
+    gstate = TAKE_GIL();
+
+    if (!PyArg_ParseTuple(args, "l", &hdl)) {
+        DROP_GIL(gstate);
+        return NULL;
+    }
+
+    callback_data_p = (p_callback_data)gpi_free_stimulus_queue(hdl);
+    if (callback_data_p) {
+        callback_data_p->id_value = COCOTB_INACTIVE_ID;
+        Py_DECREF(callback_data_p->function);
+        Py_DECREF(callback_data_p->args);
+        free(callback_data_p);
+    }
+
+    DROP_GIL(gstate);
+
+    Py_RETURN_NONE;
+}
+
 static PyObject *log_level(PyObject *self, PyObject *args)
 {
     enum gpi_log_levels new_level;
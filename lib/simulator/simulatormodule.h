@@ -61,9 +61,23 @@ static PyObject *get_signal_val_long(PyObject *self, PyObject *args);
 static PyObject *get_signal_val_real(PyObject *self, PyObject *args);
 static PyObject *get_signal_val_str(PyObject *self, PyObject *args);
 static PyObject *get_signal_val_binstr(PyObject *self, PyObject *args);
+static PyObject *get_signal_val_vector(PyObject *self, PyObject *args);
 static PyObject *set_signal_val_long(PyObject *self, PyObject *args);
 static PyObject *set_signal_val_real(PyObject *self, PyObject *args);
 static PyObject *set_signal_val_str(PyObject *self, PyObject *args);
+static PyObject *set_signal_val_vector(PyObject *self, PyObject *args);
+static PyObject *get_array_val_vector(PyObject *self, PyObject *args);
+static PyObject *set_array_val_vector(PyObject *self, PyObject *args);
+static PyObject *get_array_val_buffer(PyObject *self, PyObject *args);
+static PyObject *get_signal_vals(PyObject *self, PyObject *args);
+static PyObject *has_native_vector(PyObject *self, PyObject *args);
+static PyObject *free_handle(PyObject *self, PyObject *args);
+static PyObject *clear_lookup_misses(PyObject *self, PyObject *args);
+static PyObject *get_lookup_misses(PyObject *self, PyObject *args);
+static PyObject *get_packed_width(PyObject *self, PyObject *args);
+static PyObject *get_packed_val_vector(PyObject *self, PyObject *args);
+static PyObject *set_packed_val_vector(PyObject *self, PyObject *args);
+static PyObject *set_array_val_buffer(PyObject *self, PyObject *args);
 static PyObject *get_definition_name(PyObject *self, PyObject *args);
 static PyObject *get_definition_file(PyObject *self, PyObject *args);
 static PyObject *get_handle_by_name(PyObject *self, PyObject *args);
@@ -83,11 +97,17 @@ static PyObject *register_rwsynch_callback(PyObject *self, PyObject *args);
 static PyObject *stop_simulator(PyObject *self, PyObject *args);
 
 static PyObject *iterate(PyObject *self, PyObject *args);
+static PyObject *find_handles(PyObject *self, PyObject *args);
 static PyObject *next(PyObject *self, PyObject *args);
 
 static PyObject *get_sim_time(PyObject *self, PyObject *args);
 static PyObject *get_precision(PyObject *self, PyObject *args);
 static PyObject *deregister_callback(PyObject *self, PyObject *args);
+static PyObject *create_stimulus_queue(PyObject *self, PyObject *args);
+static PyObject *stimulus_queue_push(PyObject *self, PyObject *args);
+static PyObject *stimulus_queue_length(PyObject *self, PyObject *args);
+static PyObject *stimulus_queue_clear(PyObject *self, PyObject *args);
+static PyObject *free_stimulus_queue(PyObject *self, PyObject *args);
 
 static PyObject *log_level(PyObject *self, PyObject *args);
 
@@ -97,9 +117,23 @@ static PyMethodDef SimulatorMethods[] = {
     {"get_signal_val_str", get_signal_val_str, METH_VARARGS, "Get the value of a signal as an ascii string"},
     {"get_signal_val_binstr", get_signal_val_binstr, METH_VARARGS, "Get the value of a signal as a binary string"},
     {"get_signal_val_real", get_signal_val_real, METH_VARARGS, "Get the value of a signal as a double precision float"},
+    {"get_signal_val_vector", get_signal_val_vector, METH_VARARGS, "Get the value of a signal as a tuple of integers (value, unknown mask), None if unavailable"},
     {"set_signal_val_long", set_signal_val_long, METH_VARARGS, "Set the value of a signal using a long"},
     {"set_signal_val_str", set_signal_val_str, METH_VARARGS, "Set the value of a signal using a binary string"},
     {"set_signal_val_real", set_signal_val_real, METH_VARARGS, "Set the value of a signal using a double precision float"},
+    {"set_signal_val_vector", set_signal_val_vector, METH_VARARGS, "Set the value of a signal using integers for the value and unknown mask"},
+    {"get_array_val_vector", get_array_val_vector, METH_VARARGS, "Get the values of consecutive array elements as a tuple of lists (values, unknown masks), None if unavailable"},
+    {"set_array_val_vector", set_array_val_vector, METH_VARARGS, "Set the values of consecutive array elements from a sequence of integers, None if unavailable"},
+    {"has_native_vector", has_native_vector, METH_VARARGS, "Get a flag indicating whether the simulator accesses a signal as a vector without going through a binary string"},
+    {"free_handle", free_handle, METH_VARARGS, "Free a handle which is no longer referenced"},
+    {"clear_lookup_misses", clear_lookup_misses, METH_VARARGS, "Forget the names which could not be found"},
+    {"get_lookup_misses", get_lookup_misses, METH_VARARGS, "Get the number of names remembered as not found"},
+    {"get_packed_width", get_packed_width, METH_VARARGS, "Get the width of an aggregate that can be accessed as a single vector, -1 if it can't"},
+    {"get_packed_val_vector", get_packed_val_vector, METH_VARARGS, "Get the value of a packed aggregate as a tuple of integers (value, unknown mask), None if unavailable"},
+    {"set_packed_val_vector", set_packed_val_vector, METH_VARARGS, "Set the value of a packed aggregate using integers for the value and unknown mask, None if unavailable"},
+    {"get_signal_vals", get_signal_vals, METH_VARARGS, "Get the values of a sequence of signals, each as an integer if fully resolved or a binary string otherwise"},
+    {"get_array_val_buffer", get_array_val_buffer, METH_VARARGS, "Get the values of consecutive array elements as a buffer of little endian words, None if unavailable"},
+    {"set_array_val_buffer", set_array_val_buffer, METH_VARARGS, "Set the values of consecutive array elements from a buffer of little endian words, None if unavailable"},
     {"get_definition_name", get_definition_name, METH_VARARGS, "Get the name of a GPI object's definition"},
     {"get_definition_file", get_definition_file, METH_VARARGS, "Get the file that sources the object's definition"},
     {"get_handle_by_name", get_handle_by_name, METH_VARARGS, "Get handle of a named object"},
@@ -119,12 +153,18 @@ static PyMethodDef SimulatorMethods[] = {
     {"stop_simulator", stop_simulator, METH_VARARGS, "Instruct the attached simulator to stop"},
     {"iterate", iterate, METH_VARARGS, "Get an iterator handle to loop over all members in an object"},
     {"next", next, METH_VARARGS, "Get the next object from the iterator"},
+    {"find_handles", find_handles, METH_VARARGS, "Search the hierarchy below an object for names matching a glob pattern"},
     {"log_level", log_level, METH_VARARGS, "Set the log level for GPI"},
 
     // FIXME METH_NOARGS => initialization from incompatible pointer type
     {"get_sim_time", get_sim_time, METH_VARARGS, "Get the current simulation time as an int tuple"},
     {"get_precision", get_precision, METH_VARARGS, "Get the precision of the simualator"},
     {"deregister_callback", deregister_callback, METH_VARARGS, "Deregister a callback"},
+    {"create_stimulus_queue", create_stimulus_queue, METH_VARARGS, "Create a queue of values written to signals on successive edges of a clock"},
+    {"stimulus_queue_push", stimulus_queue_push, METH_VARARGS, "Append cycles of values for a sequence of signals to a stimulus queue"},
+    {"stimulus_queue_length", stimulus_queue_length, METH_VARARGS, "Get the number of cycles still to be written by a stimulus queue"},
+    {"stimulus_queue_clear", stimulus_queue_clear, METH_VARARGS, "Drop the cycles still to be written by a stimulus queue"},
+    {"free_stimulus_queue", free_stimulus_queue, METH_VARARGS, "Stop and free a stimulus queue"},
     
     {"error_out", (PyCFunction)error_out, METH_NOARGS, NULL},
     
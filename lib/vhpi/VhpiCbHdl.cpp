@@ -747,6 +747,18 @@ GpiCbHdl * VhpiSignalObjHdl::value_change_cb(unsigned int edge)
     return cb;
 }
 
+GpiCbHdl * VhpiSignalObjHdl::new_value_change_cb(unsigned int edge)
+{
+    VhpiValueCbHdl *cb = new VhpiValueCbHdl(m_impl, this, edge);
+
+    if (cb->arm_callback()) {
+        delete cb;
+        return NULL;
+    }
+
+    return cb;
+}
+
 VhpiValueCbHdl::VhpiValueCbHdl(GpiImplInterface *impl,
                                VhpiSignalObjHdl *sig,
                                int edge) : GpiCbHdl(impl),
@@ -753,6 +753,16 @@ GpiObjHdl *VhpiImpl::native_check_create(int32_t index, GpiObjHdl *parent)
     return new_obj;
 }
 
+void VhpiImpl::free_handle(GpiObjHdl *obj_hdl)
+{
+    vhpiHandleT hdl = obj_hdl->get_handle<vhpiHandleT>();
+
+    delete obj_hdl;
+
+    if (hdl)
+        vhpi_release_handle(hdl);
+}
+
 GpiObjHdl *VhpiImpl::get_root_handle(const char* name)
 {
     vhpiHandleT root = NULL;
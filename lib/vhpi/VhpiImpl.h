@@ -201,6 +201,7 @@ public:
 
     /* Value change callback accessor */
     virtual GpiCbHdl *value_change_cb(unsigned int edge);
+    virtual GpiCbHdl *new_value_change_cb(unsigned int edge);
     virtual int initialise(std::string &name, std::string &fq_name);
 
 protected:
@@ -268,6 +269,7 @@ public:
     GpiObjHdl* native_check_create(std::string &name, GpiObjHdl *parent);
     GpiObjHdl* native_check_create(int32_t index, GpiObjHdl *parent);
     GpiObjHdl* native_check_create(void *raw_hdl, GpiObjHdl *parent);
+    void free_handle(GpiObjHdl *obj_hdl);
 
     const char * reason_to_string(int reason);
     const char * format_to_string(int format);
@@ -385,6 +385,118 @@ int VpiSignalObjHdl::set_signal_value(std::string &value)
     return 0;
 }
 
+/* Shared by signals and packed aggregates which are both plain vectors to VPI */
+static int vpi_get_vector(vpiHandle hdl, int bits, gpi_vecval_t *value, int nwords)
+{
+    s_vpi_value value_s = {vpiVectorVal};
+    int needed = (bits + 31) / 32;
+    int i;
+
+    if (needed > nwords) {
+        LOG_ERROR("VPI: %d bits will not fit into %d vector words", bits, nwords);
+        return -1;
+    }
+
+    vpi_get_value(hdl, &value_s);
+    check_vpi_error();
+
+    if (!value_s.value.vector)
+        return -1;
+
+    /* The vector is owned by the simulator so take a copy */
+    for (i = 0; i < needed; i++) {
+        value[i].aval = value_s.value.vector[i].aval;
+        value[i].bval = value_s.value.vector[i].bval;
+    }
+
+    /* Bits above the object size are undefined so mask them off */
+    if (bits % 32) {
+        uint32_t mask = (1U << (bits % 32)) - 1;
+        value[needed - 1].aval &= mask;
+        value[needed - 1].bval &= mask;
+    }
+
+    for (i = needed; i < nwords; i++) {
+        value[i].aval = 0;
+        value[i].bval = 0;
+    }
+
+    return 0;
+}
+
+static int vpi_put_vector(vpiHandle hdl, int bits, const gpi_vecval_t *value, int nwords)
+{
+    s_vpi_value value_s;
+    int needed = (bits + 31) / 32;
+    int i;
+
+    if (needed > nwords) {
+        LOG_ERROR("VPI: %d bits will not fit into %d vector words", bits, nwords);
+        return -1;
+    }
+
+    std::vector<s_vpi_vecval> writable(needed);
+
+    for (i = 0; i < needed; i++) {
+        writable[i].aval = value[i].aval;
+        writable[i].bval = value[i].bval;
+    }
+
+    value_s.value.vector = &writable[0];
+    value_s.format = vpiVectorVal;
+
+    vpi_put_value(hdl, &value_s, NULL, vpiNoDelay);
+    check_vpi_error();
+
+    return 0;
+}
+
+int VpiSignalObjHdl::get_signal_value_vector(gpi_vecval_t *value, int nwords)
+{
+    FENTER
+    int ret = vpi_get_vector(GpiObjHdl::get_handle<vpiHandle>(), m_num_elems, value, nwords);
+    FEXIT
+    return ret;
+}
+
+int VpiSignalObjHdl::set_signal_value_vector(const gpi_vecval_t *value, int nwords)
+{
+    FENTER
+    int ret = vpi_put_vector(GpiObjHdl::get_handle<vpiHandle>(), m_num_elems, value, nwords);
+    FEXIT
+    return ret;
+}
+
+int VpiObjHdl::get_packed_width(void)
+{
+    vpiHandle hdl = GpiObjHdl::get_handle<vpiHandle>();
+
+    if (m_type != GPI_STRUCTURE || !vpi_get(vpiPacked, hdl))
+        return -1;
+
+    return vpi_get(vpiSize, hdl);
+}
+
+int VpiObjHdl::get_packed_value_vector(gpi_vecval_t *value, int nwords)
+{
+    int bits = get_packed_width();
+
+    if (bits <= 0)
+        return -1;
+
+    return vpi_get_vector(GpiObjHdl::get_handle<vpiHandle>(), bits, value, nwords);
+}
+
+int VpiObjHdl::set_packed_value_vector(const gpi_vecval_t *value, int nwords)
+{
+    int bits = get_packed_width();
+
+    if (bits <= 0)
+        return -1;
+
+    return vpi_put_vector(GpiObjHdl::get_handle<vpiHandle>(), bits, value, nwords);
+}
+
 GpiCbHdl * VpiSignalObjHdl::value_change_cb(unsigned int edge)
 {
     VpiValueCbHdl *cb = NULL;
@@ -410,6 +522,18 @@ GpiCbHdl * VpiSignalObjHdl::value_change_cb(unsigned int edge)
     return cb;
 }
 
+GpiCbHdl * VpiSignalObjHdl::new_value_change_cb(unsigned int edge)
+{
+    VpiValueCbHdl *cb = new VpiValueCbHdl(m_impl, this, edge);
+
+    if (cb->arm_callback()) {
+        delete cb;
+        return NULL;
+    }
+
+    return cb;
+}
+
 VpiValueCbHdl::VpiValueCbHdl(GpiImplInterface *impl,
                              VpiSignalObjHdl *sig,
                              int edge) :GpiCbHdl(impl), 
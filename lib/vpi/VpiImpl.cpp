@@ -391,6 +391,16 @@ GpiObjHdl* VpiImpl::native_check_create(int32_t index, GpiObjHdl *parent)
     return new_obj;
 }
 
+void VpiImpl::free_handle(GpiObjHdl *obj_hdl)
+{
+    vpiHandle hdl = obj_hdl->get_handle<vpiHandle>();
+
+    delete obj_hdl;
+
+    if (hdl)
+        vpi_free_object(hdl);
+}
+
 GpiObjHdl *VpiImpl::get_root_handle(const char* name)
 {
     vpiHandle root;
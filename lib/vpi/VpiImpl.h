@@ -189,6 +189,10 @@ public:
     virtual ~VpiObjHdl() { }
 
     int initialise(std::string &name, std::string &fq_name);
+
+    int get_packed_width(void);
+    int get_packed_value_vector(gpi_vecval_t *value, int nwords);
+    int set_packed_value_vector(const gpi_vecval_t *value, int nwords);
 };
 
 class VpiSignalObjHdl : public GpiSignalObjHdl {
@@ -209,8 +213,13 @@ public:
     int set_signal_value(const double value);
     int set_signal_value(std::string &value);
 
+    int get_signal_value_vector(gpi_vecval_t *value, int nwords);
+    int set_signal_value_vector(const gpi_vecval_t *value, int nwords);
+    bool has_native_vector(void) { return true; }
+
     /* Value change callback accessor */
     GpiCbHdl *value_change_cb(unsigned int edge);
+    GpiCbHdl *new_value_change_cb(unsigned int edge);
     int initialise(std::string &name, std::string &fq_name);
 
 private:
@@ -286,6 +295,7 @@ public:
     GpiObjHdl* native_check_create(std::string &name, GpiObjHdl *parent);
     GpiObjHdl* native_check_create(int32_t index, GpiObjHdl *parent);
     GpiObjHdl* native_check_create(void *raw_hdl, GpiObjHdl *parent);
+    void free_handle(GpiObjHdl *obj_hdl);
     const char * reason_to_string(int reason);
     GpiObjHdl* create_gpi_obj_from_handle(vpiHandle new_hdl,
                                           std::string &name,
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+''' Copyright (c) 2013 Potential Ventures Ltd
+Copyright (c) 2013 SolarFlare Communications Inc
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of Potential Ventures Ltd,
+      SolarFlare Communications Inc nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL POTENTIAL VENTURES LTD BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
+
+# Compare encoding Avalon-ST packets into data words one BinaryValue per
+# beat, as AvalonSTPkts used to, against converting the whole packet up front
+# with packet_beats. Run from the root of the repository:
+#
+#     python tests/benchmarks/avalon_st_beats.py
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+# The encoder doesn't need the simulator
+os.environ["SPHINX_BUILD"] = "1"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from cocotb.binary import BinaryValue
+from cocotb.drivers.avalon import packet_beats
+
+
+def per_word_beats(packet, bus_width, big_endian=True):
+    """Build each word in a BinaryValue, with the sideband for every beat"""
+    data = memoryview(packet)
+    word = BinaryValue(bits=bus_width * 8, bigEndian=big_endian)
+    beats = []
+    offset = 0
+    while offset < len(data):
+        remaining = len(data) - offset
+        nbytes = min(remaining, bus_width)
+        word.from_bytes(data[offset:offset + nbytes])
+        offset += nbytes
+        beats.append((word.integer, offset == nbytes, remaining <= bus_width,
+                       bus_width - remaining if remaining <= bus_width else 0))
+    return beats
+
+
+def _time(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    print("{0:>6} {1:>6} {2:>12} {3:>12} {4:>8} {5:>10}".format(
+        "bytes", "width", "old (us)", "new (us)", "speedup", "MB/s"))
+    for length in (64, 1500, 9000):
+        packet = os.urandom(length)
+        for bus_width in (4, 8, 16):
+            number = max(20, 200000 // length)
+            old_time = _time(lambda: per_word_beats(packet, bus_width), number)
+            new_time = _time(lambda: packet_beats(packet, bus_width), number)
+            print("{0:>6} {1:>6} {2:>12.3f} {3:>12.3f} {4:>7.1f}x {5:>10.1f}".format(
+                length, bus_width, old_time, new_time, old_time / new_time,
+                length / new_time))
+
+
+if __name__ == "__main__":
+    main()
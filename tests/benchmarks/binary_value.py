@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+''' Copyright (c) 2013 Potential Ventures Ltd
+Copyright (c) 2013 SolarFlare Communications Inc
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of Potential Ventures Ltd,
+      SolarFlare Communications Inc nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL POTENTIAL VENTURES LTD BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
+
+# Compare the BinaryValue conversions against the string based implementation
+# they replaced, for 8, 64 and 1024 bit values. Run from the root of the
+# repository:
+#
+#     python tests/benchmarks/binary_value.py
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+# BinaryValue doesn't need the simulator
+os.environ["SPHINX_BUILD"] = "1"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from cocotb.binary import BinaryValue, resolve
+
+
+class StringBinaryValue(object):
+    """The unsigned little-endian conversions when values were held as strings"""
+    def __init__(self, bits):
+        self._bits = bits
+        self._str = "0" * bits
+        self._convert_to = {0: self._convert_to_unsigned}
+
+    @property
+    def integer(self):
+        return int(resolve(self._str), 2)
+
+    @integer.setter
+    def integer(self, value):
+        self._str = self._convert_to[0](value)
+
+    def _convert_to_unsigned(self, x):
+        x = bin(x)
+        if x[0] == '-':
+            raise ValueError('Attempt to assigned negative number to unsigned BinaryValue')
+        return self._adjust_unsigned(x[2:])
+
+    def _adjust_unsigned(self, x):
+        l = len(x)
+        if l <= self._bits:
+            return '0' * (self._bits - l) + x
+        return x[:l - self._bits]
+
+    def __getitem__(self, key):
+        # Slices were copied out into a new value
+        value = StringBinaryValue(key.start - key.stop + 1)
+        value._str = self._str[self._bits - 1 - key.start:self._bits - key.stop]
+        return value
+
+    def __setitem__(self, key, val):
+        # Writes went through a string splice and the binstr setter
+        val = "{:0{width}b}".format(val, width=1)
+        index = self._bits - 1 - key
+        self.binstr = self._str[:index] + val + self._str[index + 1:]
+
+    @property
+    def binstr(self):
+        return self._str
+
+    @binstr.setter
+    def binstr(self, string):
+        for char in string:
+            if char not in BinaryValue._permitted_chars:
+                raise ValueError("Attempting to assign character %s" % char)
+        self._str = string
+        self._adjust()
+
+    def _adjust(self):
+        l = len(self._str)
+        if l < self._bits:
+            self._str = "0" * (self._bits - l) + self._str
+        elif l > self._bits:
+            self._str = self._str[l - self._bits:]
+
+    @property
+    def buff(self):
+        bits = resolve(self._str)
+        if len(bits) % 8:
+            bits = "0" * (8 - len(bits) % 8) + bits
+        buff = ""
+        while bits:
+            buff = chr(int(bits[:8], 2)) + buff
+            bits = bits[8:]
+        return buff
+
+
+def _time(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    print("{0:>6} {1:<16} {2:>12} {3:>12} {4:>8}".format("bits", "conversion", "old (us)", "new (us)", "speedup"))
+    for bits in (8, 64, 1024):
+        value = (1 << bits) - 3
+        binstr = "{0:0{1}b}".format(value, bits)
+        old = StringBinaryValue(bits)
+        new = BinaryValue(bits=bits, bigEndian=False)
+        new.integer = value
+        old.integer = value
+        number = 20000 if bits < 1024 else 2000
+
+        def set_integer(vec):
+            vec.integer = value
+
+        def set_binstr(vec):
+            vec.binstr = binstr
+
+        def set_bit(vec):
+            vec[0] = 1
+
+        cases = [
+            ("integer get", lambda: old.integer, lambda: new.integer),
+            ("integer set", lambda: set_integer(old), lambda: set_integer(new)),
+            ("binstr set", lambda: set_binstr(old), lambda: set_binstr(new)),
+            ("set + get", lambda: (set_binstr(old), old.integer), lambda: (set_binstr(new), new.integer)),
+            ("buff get", lambda: old.buff, lambda: new.buff),
+            ("slice get", lambda: old[bits // 2 - 1:0].integer, lambda: new[bits // 2 - 1:0].integer),
+            ("bit set", lambda: set_bit(old), lambda: set_bit(new)),
+        ]
+        for name, old_stmt, new_stmt in cases:
+            old_time = _time(old_stmt, number)
+            new_time = _time(new_stmt, number)
+            print("{0:>6} {1:<16} {2:>12.3f} {3:>12.3f} {4:>7.1f}x".format(
+                bits, name, old_time, new_time, old_time / new_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+/*
+  The pins of an AD9361 data interface, for testing the AD9361 driver.
+
+  The receive pins are driven by the driver and the transmit pins by the
+  test, as they would be by the design.
+*/
+
+`timescale 1 ps / 1 ps
+
+module ad9361_module (
+    input         rx_clk_in_p,
+    input         rx_clk_in_n,
+    input         rx_frame_in_p,
+    input         rx_frame_in_n,
+    input  [5:0]  rx_data_in_p,
+    input  [5:0]  rx_data_in_n,
+
+    input         tx_clk_out_p,
+    input         tx_clk_out_n,
+    input         tx_frame_out_p,
+    input         tx_frame_out_n,
+    input  [5:0]  tx_data_out_p,
+    input  [5:0]  tx_data_out_n
+);
+
+endmodule
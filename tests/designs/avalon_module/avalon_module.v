@@ -0,0 +1,114 @@
+/*
+  Wraps burst_read_master with two Avalon-MM pass-throughs, so that an
+  AvalonMaster and an AvalonMemory can be tested against each other.
+
+  pipe_host_* is connected to pipe_mem_* without a burstcount signal, for
+  single and pipelined accesses. burst_host_* is connected to burst_mem_*
+  with one, for burst accesses.
+*/
+
+`timescale 1 ps / 1 ps
+
+module avalon_module (
+    input         clk,
+    input         reset,
+
+    input         control_fixed_location,
+    input  [31:0] control_read_base,
+    input  [31:0] control_read_length,
+    input         control_go,
+    output        control_done,
+    output        control_early_done,
+
+    input         user_read_buffer,
+    output [31:0] user_buffer_data,
+    output        user_data_available,
+
+    output [31:0] master_address,
+    output        master_read,
+    output [3:0]  master_byteenable,
+    input  [31:0] master_readdata,
+    input         master_readdatavalid,
+    output [4:0]  master_burstcount,
+    input         master_waitrequest,
+
+    input  [31:0] pipe_host_address,
+    input         pipe_host_read,
+    input         pipe_host_write,
+    input  [31:0] pipe_host_writedata,
+    input  [3:0]  pipe_host_byteenable,
+    output [31:0] pipe_host_readdata,
+    output        pipe_host_readdatavalid,
+    output        pipe_host_waitrequest,
+
+    output [31:0] pipe_mem_address,
+    output        pipe_mem_read,
+    output        pipe_mem_write,
+    output [31:0] pipe_mem_writedata,
+    output [3:0]  pipe_mem_byteenable,
+    input  [31:0] pipe_mem_readdata,
+    input         pipe_mem_readdatavalid,
+    input         pipe_mem_waitrequest,
+
+    input  [31:0] burst_host_address,
+    input         burst_host_read,
+    input         burst_host_write,
+    input  [31:0] burst_host_writedata,
+    input  [3:0]  burst_host_byteenable,
+    input  [4:0]  burst_host_burstcount,
+    output [31:0] burst_host_readdata,
+    output        burst_host_readdatavalid,
+    output        burst_host_waitrequest,
+
+    output [31:0] burst_mem_address,
+    output        burst_mem_read,
+    output        burst_mem_write,
+    output [31:0] burst_mem_writedata,
+    output [3:0]  burst_mem_byteenable,
+    output [4:0]  burst_mem_burstcount,
+    input  [31:0] burst_mem_readdata,
+    input         burst_mem_readdatavalid,
+    input         burst_mem_waitrequest
+);
+
+burst_read_master i_burst_read_master (
+    .clk                    (clk),
+    .reset                  (reset),
+    .control_fixed_location (control_fixed_location),
+    .control_read_base      (control_read_base),
+    .control_read_length    (control_read_length),
+    .control_go             (control_go),
+    .control_done           (control_done),
+    .control_early_done     (control_early_done),
+    .user_read_buffer       (user_read_buffer),
+    .user_buffer_data       (user_buffer_data),
+    .user_data_available    (user_data_available),
+    .master_address         (master_address),
+    .master_read            (master_read),
+    .master_byteenable      (master_byteenable),
+    .master_readdata        (master_readdata),
+    .master_readdatavalid   (master_readdatavalid),
+    .master_burstcount      (master_burstcount),
+    .master_waitrequest     (master_waitrequest)
+);
+
+assign pipe_mem_address          = pipe_host_address;
+assign pipe_mem_read             = pipe_host_read;
+assign pipe_mem_write            = pipe_host_write;
+assign pipe_mem_writedata        = pipe_host_writedata;
+assign pipe_mem_byteenable       = pipe_host_byteenable;
+assign pipe_host_readdata        = pipe_mem_readdata;
+assign pipe_host_readdatavalid   = pipe_mem_readdatavalid;
+assign pipe_host_waitrequest     = pipe_mem_waitrequest;
+
+assign burst_mem_address         = burst_host_address;
+assign burst_mem_read            = burst_host_read;
+assign burst_mem_write           = burst_host_write;
+assign burst_mem_writedata       = burst_host_writedata;
+assign burst_mem_byteenable      = burst_host_byteenable;
+assign burst_mem_burstcount      = burst_host_burstcount;
+assign burst_host_readdata       = burst_mem_readdata;
+assign burst_host_readdatavalid  = burst_mem_readdatavalid;
+assign burst_host_waitrequest    = burst_mem_waitrequest;
+
+endmodule
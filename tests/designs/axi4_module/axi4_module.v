@@ -0,0 +1,133 @@
+/*
+  Two AXI4 pass-throughs, so that the AMBA drivers and monitors can be
+  tested against each other.
+
+  host_* is connected to mem_*, for an AXI4Master and an AXI4Slave.
+  stream_in_* is connected to stream_out_*, for AXI4-Stream frames with
+  TKEEP and TUSER.
+*/
+
+`timescale 1 ps / 1 ps
+
+module axi4_module (
+    input          clk,
+
+    input          host_AWVALID,
+    output         host_AWREADY,
+    input  [3:0]   host_AWID,
+    input  [31:0]  host_AWADDR,
+    input  [7:0]   host_AWLEN,
+    input  [2:0]   host_AWSIZE,
+    input  [1:0]   host_AWBURST,
+    input  [2:0]   host_AWPROT,
+    input          host_WVALID,
+    output         host_WREADY,
+    input  [31:0]  host_WDATA,
+    input  [3:0]   host_WSTRB,
+    input          host_WLAST,
+    output         host_BVALID,
+    input          host_BREADY,
+    output [3:0]   host_BID,
+    output [1:0]   host_BRESP,
+    input          host_ARVALID,
+    output         host_ARREADY,
+    input  [3:0]   host_ARID,
+    input  [31:0]  host_ARADDR,
+    input  [7:0]   host_ARLEN,
+    input  [2:0]   host_ARSIZE,
+    input  [1:0]   host_ARBURST,
+    input  [2:0]   host_ARPROT,
+    output         host_RVALID,
+    input          host_RREADY,
+    output [3:0]   host_RID,
+    output [31:0]  host_RDATA,
+    output [1:0]   host_RRESP,
+    output         host_RLAST,
+
+    output         mem_AWVALID,
+    input          mem_AWREADY,
+    output [3:0]   mem_AWID,
+    output [31:0]  mem_AWADDR,
+    output [7:0]   mem_AWLEN,
+    output [2:0]   mem_AWSIZE,
+    output [1:0]   mem_AWBURST,
+    output [2:0]   mem_AWPROT,
+    output         mem_WVALID,
+    input          mem_WREADY,
+    output [31:0]  mem_WDATA,
+    output [3:0]   mem_WSTRB,
+    output         mem_WLAST,
+    input          mem_BVALID,
+    output         mem_BREADY,
+    input  [3:0]   mem_BID,
+    input  [1:0]   mem_BRESP,
+    output         mem_ARVALID,
+    input          mem_ARREADY,
+    output [3:0]   mem_ARID,
+    output [31:0]  mem_ARADDR,
+    output [7:0]   mem_ARLEN,
+    output [2:0]   mem_ARSIZE,
+    output [1:0]   mem_ARBURST,
+    output [2:0]   mem_ARPROT,
+    input          mem_RVALID,
+    output         mem_RREADY,
+    input  [3:0]   mem_RID,
+    input  [31:0]  mem_RDATA,
+    input  [1:0]   mem_RRESP,
+    input          mem_RLAST,
+
+    input          stream_in_tvalid,
+    output         stream_in_tready,
+    input  [31:0]  stream_in_tdata,
+    input  [3:0]   stream_in_tkeep,
+    input          stream_in_tlast,
+    input          stream_in_tuser,
+
+    output         stream_out_tvalid,
+    input          stream_out_tready,
+    output [31:0]  stream_out_tdata,
+    output [3:0]   stream_out_tkeep,
+    output         stream_out_tlast,
+    output         stream_out_tuser
+);
+
+assign mem_AWVALID        = host_AWVALID;
+assign host_AWREADY       = mem_AWREADY;
+assign mem_AWID           = host_AWID;
+assign mem_AWADDR         = host_AWADDR;
+assign mem_AWLEN          = host_AWLEN;
+assign mem_AWSIZE         = host_AWSIZE;
+assign mem_AWBURST        = host_AWBURST;
+assign mem_AWPROT         = host_AWPROT;
+assign mem_WVALID         = host_WVALID;
+assign host_WREADY        = mem_WREADY;
+assign mem_WDATA          = host_WDATA;
+assign mem_WSTRB          = host_WSTRB;
+assign mem_WLAST          = host_WLAST;
+assign host_BVALID        = mem_BVALID;
+assign mem_BREADY         = host_BREADY;
+assign host_BID           = mem_BID;
+assign host_BRESP         = mem_BRESP;
+assign mem_ARVALID        = host_ARVALID;
+assign host_ARREADY       = mem_ARREADY;
+assign mem_ARID           = host_ARID;
+assign mem_ARADDR         = host_ARADDR;
+assign mem_ARLEN          = host_ARLEN;
+assign mem_ARSIZE         = host_ARSIZE;
+assign mem_ARBURST        = host_ARBURST;
+assign mem_ARPROT         = host_ARPROT;
+assign host_RVALID        = mem_RVALID;
+assign mem_RREADY         = host_RREADY;
+assign host_RID           = mem_RID;
+assign host_RDATA         = mem_RDATA;
+assign host_RRESP         = mem_RRESP;
+assign host_RLAST         = mem_RLAST;
+
+assign stream_out_tvalid  = stream_in_tvalid;
+assign stream_in_tready   = stream_out_tready;
+assign stream_out_tdata   = stream_in_tdata;
+assign stream_out_tkeep   = stream_in_tkeep;
+assign stream_out_tlast   = stream_in_tlast;
+assign stream_out_tuser   = stream_in_tuser;
+
+endmodule
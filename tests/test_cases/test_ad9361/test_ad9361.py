@@ -0,0 +1,120 @@
+"""
+Tests of the AD9361 driver against the pins of its data interface
+"""
+
+import cocotb
+from cocotb.binary import _have_numpy
+from cocotb.drivers.ad9361 import AD9361
+from cocotb.result import TestFailure
+from cocotb.triggers import RisingEdge, ReadOnly, Timer
+
+
+@cocotb.coroutine
+def _record_rx(dut, edges):
+    """Record the data and frame pins after every edge of the receive clock"""
+    rising_p = RisingEdge(dut.rx_clk_in_p)
+    rising_n = RisingEdge(dut.rx_clk_in_n)
+    while True:
+        for edge in (rising_p, rising_n):
+            yield edge
+            yield ReadOnly()
+            edges.append((int(dut.rx_data_in_p), int(dut.rx_data_in_n),
+                          int(dut.rx_frame_in_p), int(dut.rx_frame_in_n)))
+
+
+def _check_rx(edges, expected):
+    """Compare the recorded edges to the expected (data, frame) of each"""
+    if len(edges) < len(expected):
+        raise TestFailure("Only %d of %d edges were driven" % (len(edges), len(expected)))
+    for index, ((data, frame), got) in enumerate(zip(expected, edges)):
+        if got != (data, data ^ 0x3F, frame, 1 - frame):
+            raise TestFailure("Edge %d drove data %d/%d and frame %d/%d, expected "
+                              "data %d and frame %d" % ((index,) + got + (data, frame)))
+
+
+@cocotb.test()
+def test_rx_single(dut):
+    """ One channel sends I[11:6], Q[11:6], I[5:0], Q[5:0] framing each sample """
+    ad = AD9361(dut)
+    i_data = [0, 1, -1, 2047, -2048, 100]
+    q_data = [-5, 2047, -2048, 0, 63, -64]
+
+    edges = []
+    recorder = cocotb.fork(_record_rx(dut, edges))
+    yield ad.rx_data_to_ad9361(i_data, q_data)
+    recorder.kill()
+
+    expected = []
+    for i, q in zip(i_data, q_data):
+        i, q = i & 0xFFF, q & 0xFFF
+        expected += [(i >> 6, 1), (q >> 6, 1), (i & 0x3F, 0), (q & 0x3F, 0)]
+    _check_rx(edges, expected)
+
+
+@cocotb.test()
+def test_rx_dual(dut):
+    """ Two channels send I[11:6], Q[5:0], I[5:0], Q[11:6] after a zero sample,
+    framing every other sample """
+    ad = AD9361(dut)
+    i_data, q_data = [1, -1, 2047], [-2048, 64, -65]
+    i_data2, q_data2 = [-300, 0, 5], [7, -7, 1000]
+
+    edges = []
+    recorder = cocotb.fork(_record_rx(dut, edges))
+    yield ad.rx_data_to_ad9361(i_data, q_data, i_data2, q_data2)
+    recorder.kill()
+
+    samples = [(0, 0)]
+    for index in range(len(i_data)):
+        samples += [(i_data[index], q_data[index]), (i_data2[index], q_data2[index])]
+    expected = []
+    for index, (i, q) in enumerate(samples):
+        i, q = i & 0xFFF, q & 0xFFF
+        frame = 1 - index % 2
+        expected += [(i >> 6, frame), (q & 0x3F, frame), (i & 0x3F, frame), (q >> 6, frame)]
+    _check_rx(edges, expected)
+
+
+@cocotb.coroutine
+def _drive_tx(dut, samples, half_period=1000):
+    """Send 12 bit sample codes on the transmit pins as the driver expects
+    them, Q[11:6] and I[11:6] while framed then Q[5:0] and I[5:0]"""
+    dut.tx_clk_out_p <= 0
+    dut.tx_clk_out_n <= 1
+    yield Timer(half_period)
+    for i, q in samples:
+        for data, frame, clock_p in ((q >> 6, 1, 1), (i >> 6, 1, 0),
+                                     (q & 0x3F, 0, 1), (i & 0x3F, 0, 0)):
+            dut.tx_data_out_p <= data
+            dut.tx_data_out_n <= data ^ 0x3F
+            dut.tx_frame_out_p <= frame
+            dut.tx_frame_out_n <= 1 - frame
+            yield Timer(half_period)
+            dut.tx_clk_out_p <= clock_p
+            dut.tx_clk_out_n <= 1 - clock_p
+            yield Timer(half_period)
+
+
+@cocotb.test(skip=not _have_numpy)
+def test_capture_tx(dut):
+    """ capture_tx converts the codes of transmitted samples to signed values """
+    ad = AD9361(dut)
+    samples = [(0, 0x7FF), (0x800, 0xFFF), (1, 0x801), (0x7FF, 0x800)]
+
+    for signed in (True, False):
+        capture = cocotb.fork(ad.capture_tx(len(samples), signed=signed))
+        yield _drive_tx(dut, samples)
+        i, q = yield capture.join()
+
+        if signed:
+            expected = [[x - 0x1000 if x & 0x800 else x for x in codes]
+                        for codes in zip(*samples)]
+        else:
+            expected = [list(codes) for codes in zip(*samples)]
+        if [i.tolist(), q.tolist()] != expected:
+            raise TestFailure("Captured I %s and Q %s, expected %s" %
+                              (i.tolist(), q.tolist(), expected))
+
+    # Transmitted samples are also queued for loopback, without a bound
+    if len(ad.lbqi) != 2 * len(samples):
+        raise TestFailure("%d samples were queued for loopback" % len(ad.lbqi))
@@ -4,12 +4,23 @@ A set of tests that demonstrate Array structure support
 
 import cocotb
 import logging
+import os
+import shutil
+import tempfile
 
 from cocotb.clock import Clock
 from cocotb.triggers import Timer, RisingEdge
 from cocotb.result import TestError, TestFailure
+from cocotb.binary import BinaryArray, BinaryRepresentation
+from cocotb.fixedpoint import FixedPointValue, FixedPointArray
 from cocotb.handle import HierarchyObject, HierarchyArrayObject, ModifiableObject, NonHierarchyIndexableObject, ConstantObject
 
+try:
+    import numpy as np
+    _have_numpy = True
+except ImportError:
+    _have_numpy = False
+
 def _check_type(tlog, hdl, expected):
     if not isinstance(hdl, expected):
         raise TestFailure(">{0!r} ({1})< should be >{2}<".format(hdl, hdl._type ,expected))
@@ -446,6 +457,170 @@ def test_direct_signal_indexing(dut):
         _check_type(tlog, dut.sig_rec.b[1], ModifiableObject)
         _check_type(tlog, dut.sig_rec.b[1][2], ModifiableObject)
 
+@cocotb.test(skip=not _have_numpy)
+def test_bulk_array_access(dut):
+    """Test reading and writing whole arrays and slices through NumPy"""
+
+    tlog = logging.getLogger("cocotb.test")
+
+    yield Timer(1000)
+
+    expected = [0x11, 0x22, 0x33, 0x44]
+    dut.sig_t3a.set_array(np.array(expected, dtype=np.uint64))
+
+    yield Timer(1000)
+
+    for idx in range(4):
+        _check_logic(tlog, dut.sig_t3a[idx + 1], expected[idx])
+
+    values = dut.sig_t3a.get_array()
+    if list(values) != expected:
+        raise TestFailure("Expected {0!r} to read {1} but got {2}".format(dut.sig_t3a, expected, list(values)))
+
+    values = dut.sig_t3a.get_array(start=2, count=2)
+    if list(values) != expected[1:3]:
+        raise TestFailure("Expected {0!r} to read {1} but got {2}".format(dut.sig_t3a, expected[1:3], list(values)))
+
+    # Arrays of arrays fall back to accessing each sub-array
+    expected = np.arange(16, dtype=np.uint64).reshape(4, 4)
+    dut.sig_t4.set_array(expected)
+
+    yield Timer(1000)
+
+    values = dut.sig_t4.get_array()
+    if values.shape != (4, 4) or not (values == expected).all():
+        raise TestFailure("Expected {0!r} to read {1} but got {2}".format(dut.sig_t4, expected.tolist(), values.tolist()))
+
+@cocotb.test(skip=not _have_numpy)
+def test_binary_array(dut):
+    """Test bulk reads into a BinaryArray and signed conversion of the result"""
+
+    tlog = logging.getLogger("cocotb.test")
+
+    yield Timer(1000)
+
+    dut.sig_t3a.set_array(BinaryArray([-1, 2, -3, 4], 8, binaryRepresentation=BinaryRepresentation.TWOS_COMPLEMENT))
+
+    yield Timer(1000)
+
+    _check_logic(tlog, dut.sig_t3a[1], 0xFF)
+    _check_logic(tlog, dut.sig_t3a[3], 0xFD)
+
+    values = BinaryArray.from_handle(dut.sig_t3a, binaryRepresentation=BinaryRepresentation.TWOS_COMPLEMENT)
+    if values.integer.tolist() != [-1, 2, -3, 4]:
+        raise TestFailure("Expected {0!r} to read [-1, 2, -3, 4] but got {1}".format(dut.sig_t3a, values.integer.tolist()))
+    if [vec.integer for vec in values.to_values()] != [-1, 2, -3, 4]:
+        raise TestFailure("Conversion of {0!r} to BinaryValues gave {1}".format(dut.sig_t3a, values.to_values()))
+
+@cocotb.test(skip=not _have_numpy)
+def test_binary_array_64bit(dut):
+    """Test unsigned 64 bit values which don't fit in a signed integer"""
+
+    yield Timer(1000)
+
+    values = BinaryArray([0, 1 << 63, 2**64 - 1], 64)
+    if values.integer.tolist() != [0, 1 << 63, 2**64 - 1]:
+        raise TestFailure("Expected [0, 2**63, 2**64-1] but got {0}".format(values.integer.tolist()))
+
+    values = BinaryArray([-1, -(1 << 63)], 64, binaryRepresentation=BinaryRepresentation.TWOS_COMPLEMENT)
+    if values.value.tolist() != [2**64 - 1, 1 << 63]:
+        raise TestFailure("Expected encodings [2**64-1, 2**63] but got {0}".format(values.value.tolist()))
+    if values.integer.tolist() != [-1, -(1 << 63)]:
+        raise TestFailure("Expected [-1, -2**63] but got {0}".format(values.integer.tolist()))
+
+    try:
+        BinaryArray([2**64], 64)
+    except ValueError:
+        pass
+    else:
+        raise TestFailure("2**64 should not fit in a 64 bit BinaryArray")
+
+@cocotb.test(skip=not _have_numpy)
+def test_fixed_point(dut):
+    """Test writing and reading back fixed point values"""
+
+    tlog = logging.getLogger("cocotb.test")
+
+    yield Timer(1000)
+
+    dut.sig_t3a.set_array(FixedPointArray([0.5, -0.25, 2.0, -1.0], int_bits=1, frac_bits=7))
+    dut.sig_t3a[3] = FixedPointValue(-0.375, int_bits=1, frac_bits=7)
+
+    yield Timer(1000)
+
+    _check_logic(tlog, dut.sig_t3a[1], 0x40)
+    _check_logic(tlog, dut.sig_t3a[2], 0xE0)
+
+    values = FixedPointArray.from_handle(dut.sig_t3a, int_bits=1, frac_bits=7)
+    if values.real.tolist() != [0.5, -0.25, -0.375, -1.0]:
+        raise TestFailure("Expected {0!r} to read [0.5, -0.25, -0.375, -1.0] but got {1}".format(dut.sig_t3a, values.real.tolist()))
+    if values[0].real != 0.5:
+        raise TestFailure("Expected the first element of {0!r} to be 0.5 but got {1}".format(values, values[0].real))
+
+@cocotb.test()
+def test_memory_image(dut):
+    """Test loading and dumping memory images"""
+
+    tlog = logging.getLogger("cocotb.test")
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        hexfile = os.path.join(tmpdir, "image.hex")
+        binfile = os.path.join(tmpdir, "image.bin")
+
+        with open(hexfile, "w") as f:
+            f.write("// Words for indices 2 and 3\n@2\n5a a5\n")
+
+        yield Timer(1000)
+
+        dut.sig_t3a.load_memory(hexfile)
+        yield Timer(1000)
+        _check_logic(tlog, dut.sig_t3a[2], 0x5A)
+        _check_logic(tlog, dut.sig_t3a[3], 0xA5)
+
+        dut.sig_t3a.dump_memory(binfile, start=2, count=2)
+        with open(binfile, "rb") as f:
+            image = f.read()
+        if image != b"\x5a\xa5":
+            raise TestFailure("Expected {0!r} to dump {1!r} but got {2!r}".format(dut.sig_t3a, b"\x5a\xa5", image))
+
+        # Deferred loads happen with the other writes
+        dut.sig_t3a.load_memory(binfile, start=1, immediate=False)
+        yield Timer(1000)
+        _check_logic(tlog, dut.sig_t3a[1], 0x5A)
+        _check_logic(tlog, dut.sig_t3a[2], 0xA5)
+    finally:
+        shutil.rmtree(tmpdir)
+
+@cocotb.test(skip=(cocotb.LANGUAGE in ["verilog"]))
+def test_struct_access(dut):
+    """Test reading and writing all of the fields of a record together"""
+
+    tlog = logging.getLogger("cocotb.test")
+
+    yield Timer(1000)
+
+    dut.sig_rec = {"a" : 1, "b" : [0x01, 0x23, 0x45]}
+
+    yield Timer(1000)
+
+    _check_logic(tlog, dut.sig_rec.a, 1)
+    _check_logic(tlog, dut.sig_rec.b[1], 0x23)
+
+    values = dut.sig_rec.get_packed()
+    if list(values.keys()) != ["a", "b"]:
+        raise TestFailure("Expected {0!r} to have fields ['a', 'b'] but got {1}".format(dut.sig_rec, list(values.keys())))
+    if values["a"] != 1:
+        raise TestFailure("Expected {0!r} field a to be 1 but got {1}".format(dut.sig_rec, values["a"]))
+
+    # Fields which aren't given keep their value
+    dut.sig_rec.setimmediatevalue({"a" : 0})
+
+    yield Timer(1000)
+
+    _check_logic(tlog, dut.sig_rec.a, 0)
+    _check_logic(tlog, dut.sig_rec.b[1], 0x23)
+
 @cocotb.test(skip=(cocotb.LANGUAGE in ["verilog"]))
 def test_extended_identifiers(dut):
     """Test accessing extended identifiers"""
@@ -35,7 +35,8 @@ Also used a regression test of cocotb capabilities
 """
 
 import cocotb
-from cocotb.drivers.avalon import AvalonMemory
+from cocotb.drivers.avalon import AvalonMemory, AvalonMaster
+from cocotb.memory import Memory
 from cocotb.triggers import (Timer, Join, RisingEdge, FallingEdge, Edge,
                              ReadOnly, ReadWrite)
 from cocotb.clock import Clock
@@ -122,3 +123,139 @@ def test_burst_read(dut):
     yield Timer(10)
     dut.user_read_buffer = 0
     yield Timer(10)
+
+
+# Every property is given as AvalonMemory shares them between instances
+_pass_through_properties = {
+    "burstCountUnits": "symbols",
+    "addressUnits": "symbols",
+    "readLatency": 1,
+    "WriteBurstWaitReq": False,
+    "MaxWaitReqLen": 4,
+}
+
+
+@cocotb.test()
+def test_memory_dict(dut):
+    """ AvalonMemory reads and writes through to a dict """
+    cocotb.fork(Clock(dut.clk, 10).start())
+
+    contents = {0x20 + i: i for i in range(8)}
+    AvalonMemory(dut, "pipe_mem", dut.clk, memory=contents,
+                 avl_properties=_pass_through_properties)
+    AvalonMemory(dut, "burst_mem", dut.clk, memory=contents,
+                 avl_properties=_pass_through_properties)
+    single = AvalonMaster(dut, "pipe_host", dut.clk)
+    burst = AvalonMaster(dut, "burst_host", dut.clk)
+
+    # Single accesses use byte addresses
+    value = yield single.read(0x20)
+    if value.integer != 0x03020100:
+        raise TestFailure("Read 0x%x from 0x20" % value.integer)
+
+    yield single.write(0x40, 0x44332211)
+    written = [contents.get(0x40 + i) for i in range(4)]
+    if written != [0x11, 0x22, 0x33, 0x44]:
+        raise TestFailure("Write to 0x40 left %s in the dict" % written)
+
+    # Changes made to the dict are seen by the bus
+    contents[0x24] = 0xAA
+    value = yield single.read(0x24)
+    if value.integer != 0x070605AA:
+        raise TestFailure("Read 0x%x from 0x24" % value.integer)
+
+    # A second memory given the same dict shares it
+    yield burst.write_burst(0x80, bytearray(range(16)))
+    written = [contents.get(0x80 + i) for i in range(16)]
+    if written != list(range(16)):
+        raise TestFailure("Burst write to 0x80 left %s in the dict" % written)
+
+    data = yield burst.read_burst(0x20, 2)
+    if bytearray(data) != bytearray([0, 1, 2, 3, 0xAA, 5, 6, 7]):
+        raise TestFailure("Burst read from 0x20 returned %r" % data)
+
+    # Whole words stored under one address aren't silently truncated
+    try:
+        AvalonMemory(dut, "pipe_mem", dut.clk, memory={0: 0xDEADBEEF},
+                     avl_properties=_pass_through_properties)
+    except ValueError:
+        pass
+    else:
+        raise TestFailure("A dict holding a word per address was accepted")
+
+
+@cocotb.coroutine
+def _count_outstanding_reads(dut, prefix, history):
+    """Record the reads accepted but not yet answered on each cycle"""
+    read = getattr(dut, prefix + "_read")
+    waitrequest = getattr(dut, prefix + "_waitrequest")
+    readdatavalid = getattr(dut, prefix + "_readdatavalid")
+    outstanding = 0
+    while True:
+        yield RisingEdge(dut.clk)
+        yield ReadOnly()
+        if int(readdatavalid):
+            outstanding -= 1
+        if int(read) and not int(waitrequest):
+            outstanding += 1
+        history.append(outstanding)
+
+
+@cocotb.test()
+def test_pipelined_reads(dut):
+    """ Pipelined AvalonMaster reads are matched to readdatavalid in order """
+    cocotb.fork(Clock(dut.clk, 10).start())
+
+    contents = {i: i for i in range(0x40)}
+    AvalonMemory(dut, "pipe_mem", dut.clk, memory=contents,
+                 readlatency_min=1, readlatency_max=4,
+                 avl_properties=_pass_through_properties)
+    master = AvalonMaster(dut, "pipe_host", dut.clk, max_pending_reads=4)
+
+    history = []
+    cocotb.fork(_count_outstanding_reads(dut, "pipe_host", history))
+
+    addresses = list(range(0, 0x40, 4))
+    reads = [cocotb.fork(master.read(address)) for address in addresses]
+    for address, read in zip(addresses, reads):
+        value = yield read.join()
+        expected = sum((address + i) << (8 * i) for i in range(4))
+        if value.integer != expected:
+            raise TestFailure("Read 0x%x from 0x%x, expected 0x%x" %
+                              (value.integer, address, expected))
+
+    most = max(history)
+    if most < 2:
+        raise TestFailure("Reads weren't pipelined")
+    if most > master.max_pending_reads:
+        raise TestFailure("%d reads were outstanding at once" % most)
+    # One read is issued per cycle while there is room for it
+    if len(history) > len(addresses) * 3:
+        raise TestFailure("%d reads took %d cycles" % (len(addresses), len(history)))
+
+
+@cocotb.test()
+def test_burst_access(dut):
+    """ AvalonMaster bursts are written and read back through burstcount """
+    cocotb.fork(Clock(dut.clk, 10).start())
+
+    memory = Memory()
+    AvalonMemory(dut, "burst_mem", dut.clk, memory=memory,
+                 avl_properties=_pass_through_properties)
+    master = AvalonMaster(dut, "burst_host", dut.clk)
+
+    data = bytearray(range(0x40, 0x80))
+    yield master.write_burst(0x100, data)
+    yield master.write_burst(0x200, bytearray(b"\xa5" * 4))
+
+    readback = yield master.read_burst(0x100, len(data) // 4)
+    if bytearray(readback) != data:
+        raise TestFailure("Burst read returned %r" % readback)
+
+    readback = yield master.read_burst(0x200, 1)
+    if bytearray(readback) != bytearray(b"\xa5" * 4):
+        raise TestFailure("Single beat burst read returned %r" % readback)
+
+    # The words are stored with their first byte in the lowest lane
+    if memory.read_word(0x104, 4, big_endian=False) != 0x47464544:
+        raise TestFailure("Burst write stored the wrong word at 0x104")
@@ -0,0 +1,293 @@
+"""
+A set of tests of the AXI4 and AXI4-Stream drivers and monitors, run
+against each other through the pass-throughs of axi4_module
+"""
+
+from itertools import repeat
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.drivers.amba import AXI4Master, AXI4Slave, AXIBurst, AXI4StreamMaster
+from cocotb.memory import Memory
+from cocotb.monitors.amba import AXI4StreamMonitor
+from cocotb.result import TestFailure
+from cocotb.triggers import RisingEdge, ReadOnly
+
+
+def _start(dut, **kwargs):
+    """Start the clock and return an AXI4Master driving an AXI4Slave"""
+    cocotb.fork(Clock(dut.clk, 10).start())
+    memory = Memory()
+    slave = AXI4Slave(dut, "mem", dut.clk, memory=memory, **kwargs)
+    master = AXI4Master(dut, "host", dut.clk)
+    return master, slave, memory
+
+
+@cocotb.test()
+def test_incr_burst(dut):
+    """ INCR bursts are written and read back, including a partial last beat """
+    master, slave, memory = _start(dut)
+
+    data = bytearray(range(256)) * 2
+    yield master.write(0x1000, data)
+    if memory.read(0x1000, len(data)) != data:
+        raise TestFailure("INCR write left the wrong data in memory")
+
+    readback = yield master.read(0x1000, len(data))
+    if bytearray(readback) != data:
+        raise TestFailure("INCR read returned the wrong data")
+
+    readback = yield master.read(0x1004, 6)
+    if bytearray(readback) != data[4:10]:
+        raise TestFailure("Read of 6 bytes returned %r" % readback)
+
+
+@cocotb.test()
+def test_wrap_burst(dut):
+    """ WRAP bursts wrap at the boundary of the burst size """
+    master, slave, memory = _start(dut)
+
+    yield master.write(0x308, bytearray(range(16)), burst=AXIBurst.WRAP)
+    expected = bytearray(range(8, 16)) + bytearray(range(8))
+    if memory.read(0x300, 16) != expected:
+        raise TestFailure("WRAP write left %r in memory" % memory.read(0x300, 16))
+
+    readback = yield master.read(0x304, 16, burst=AXIBurst.WRAP)
+    if bytearray(readback) != expected[4:] + expected[:4]:
+        raise TestFailure("WRAP read returned %r" % readback)
+
+
+@cocotb.test()
+def test_fixed_burst(dut):
+    """ Every beat of a FIXED burst is at the same address """
+    master, slave, memory = _start(dut)
+
+    yield master.write(0x40, bytearray(range(16)), burst=AXIBurst.FIXED)
+    if memory.read(0x40, 4) != bytearray(range(12, 16)):
+        raise TestFailure("FIXED write left %r in memory" % memory.read(0x40, 4))
+
+    readback = yield master.read(0x40, 8, burst=AXIBurst.FIXED)
+    if bytearray(readback) != bytearray(range(12, 16)) * 2:
+        raise TestFailure("FIXED read returned %r" % readback)
+
+
+@cocotb.test()
+def test_narrow_burst(dut):
+    """ Bursts narrower than the bus use the byte lanes of each address """
+    master, slave, memory = _start(dut)
+
+    memory.write(0x400, bytearray(8))
+    yield master.write(0x401, bytearray(b"abcdef"), size=0)
+    if memory.read(0x400, 8) != bytearray(b"\x00abcdef\x00"):
+        raise TestFailure("Narrow write left %r in memory" % memory.read(0x400, 8))
+
+    readback = yield master.read(0x400, 8, size=1)
+    if bytearray(readback) != bytearray(b"\x00abcdef\x00"):
+        raise TestFailure("Narrow read returned %r" % readback)
+
+    readback = yield master.read(0x402, 3, size=0)
+    if bytearray(readback) != bytearray(b"bcd"):
+        raise TestFailure("Byte read returned %r" % readback)
+
+
+@cocotb.test()
+def test_out_of_order(dut):
+    """ Responses to different IDs are returned out of order and matched up """
+    master, slave, memory = _start(dut, reorder=True, read_latency=16,
+                                   write_latency=16)
+
+    for index in range(16):
+        memory.write(0x2000 + 0x100 * index, bytearray([index]) * 16)
+
+    completed = []
+
+    @cocotb.coroutine
+    def read(index):
+        data = yield master.read(0x2000 + 0x100 * index, 16, id=index % 4)
+        if bytearray(data) != bytearray([index]) * 16:
+            raise TestFailure("Read %d with ID %d returned %r" %
+                              (index, index % 4, data))
+        completed.append(index)
+
+    @cocotb.coroutine
+    def write(index):
+        yield master.write(0x8000 + 0x100 * index, bytearray([index]) * 16,
+                           id=index % 4)
+        completed.append(index)
+
+    for access in (read, write):
+        del completed[:]
+        accesses = [cocotb.fork(access(index)) for index in range(16)]
+        for running in accesses:
+            yield running.join()
+
+        if sorted(completed) != list(range(16)):
+            raise TestFailure("Only %s completed" % completed)
+        if completed == list(range(16)):
+            raise TestFailure("Every %s completed in order" % access.__name__)
+        for axid in range(4):
+            same_id = [index for index in completed if index % 4 == axid]
+            if same_id != sorted(same_id):
+                raise TestFailure("ID %d completed out of order: %s" % (axid, same_id))
+
+    for index in range(16):
+        if memory.read(0x8000 + 0x100 * index, 16) != bytearray([index]) * 16:
+            raise TestFailure("Write %d left the wrong data in memory" % index)
+
+
+@cocotb.test()
+def test_slave_latency(dut):
+    """ AXI4Slave holds responses back for its latency """
+    master, slave, memory = _start(dut, read_latency=12, write_latency=20)
+
+    yield master.write(0x100, bytearray(4))
+    yield master.read(0x100, 4)
+
+    stats = slave.stats
+    if not 20 <= stats.max_write_latency <= 22:
+        raise TestFailure("Write took %d cycles with a latency of 20" %
+                          stats.max_write_latency)
+    if not 12 <= stats.max_read_latency <= 14:
+        raise TestFailure("Read took %d cycles with a latency of 12" %
+                          stats.max_read_latency)
+
+
+@cocotb.test()
+def test_slave_queue_depth(dut):
+    """ AXI4Slave accepts no more bursts than its queue depths """
+    master, slave, memory = _start(dut, read_latency=8, write_latency=8,
+                                   read_queue_depth=2, write_queue_depth=3)
+
+    for channel, depth in (("write", 3), ("read", 2)):
+        if channel == "write":
+            valid, ready = dut.host_AWVALID, dut.host_AWREADY
+            done = lambda: int(dut.host_BVALID) and int(dut.host_BREADY)
+            accesses = [cocotb.fork(master.write(0x100 * index, bytearray(16)))
+                        for index in range(8)]
+        else:
+            valid, ready = dut.host_ARVALID, dut.host_ARREADY
+            done = lambda: (int(dut.host_RVALID) and int(dut.host_RREADY) and
+                            int(dut.host_RLAST))
+            accesses = [cocotb.fork(master.read(0x100 * index, 16))
+                        for index in range(8)]
+
+        # Count the bursts accepted by the slave and not yet finished
+        accepted = outstanding = most = 0
+        while accepted < len(accesses) or outstanding:
+            yield RisingEdge(dut.clk)
+            yield ReadOnly()
+            if int(valid) and int(ready):
+                accepted += 1
+                outstanding += 1
+            if done():
+                outstanding -= 1
+            most = max(most, outstanding)
+        for access in accesses:
+            yield access.join()
+
+        if most != depth:
+            raise TestFailure("Up to %d %ss were outstanding with a queue depth of %d" %
+                              (most, channel, depth))
+
+
+@cocotb.test()
+def test_slave_in_order(dut):
+    """ AXI4Slave keeps bursts of different IDs in order unless reorder is set """
+    master, slave, memory = _start(dut, read_latency=8)
+
+    completed = []
+
+    @cocotb.coroutine
+    def read(index):
+        yield master.read(0x100 * index, 4, id=index)
+        completed.append(index)
+
+    reads = [cocotb.fork(read(index)) for index in range(8)]
+    for running in reads:
+        yield running.join()
+
+    if completed != list(range(8)):
+        raise TestFailure("Reads were reordered without reorder set: %s" % completed)
+
+
+@cocotb.test()
+def test_slave_statistics(dut):
+    """ AXISlaveStatistics counts the bursts, bytes and cycles """
+    master, slave, memory = _start(dut, read_latency=4)
+
+    for index in range(4):
+        yield master.write(0x100 * index, bytearray(32))
+    for index in range(3):
+        yield master.read(0x100 * index, 16)
+    yield master.read(0x3, 1, size=0)
+
+    stats = slave.stats
+    if (stats.writes, stats.write_bytes) != (4, 128):
+        raise TestFailure("Counted %d writes of %d bytes" % (stats.writes, stats.write_bytes))
+    if (stats.reads, stats.read_bytes) != (4, 49):
+        raise TestFailure("Counted %d reads of %d bytes" % (stats.reads, stats.read_bytes))
+    if stats.read_throughput != float(stats.read_bytes) / stats.cycles:
+        raise TestFailure("Read throughput is %f" % stats.read_throughput)
+    if stats.write_throughput != float(stats.write_bytes) / stats.cycles:
+        raise TestFailure("Write throughput is %f" % stats.write_throughput)
+    if not 4 <= stats.mean_read_latency <= stats.max_read_latency:
+        raise TestFailure("Mean read latency of %f with a maximum of %d" %
+                          (stats.mean_read_latency, stats.max_read_latency))
+    if not 0 < stats.mean_write_latency <= stats.max_write_latency:
+        raise TestFailure("Mean write latency of %f with a maximum of %d" %
+                          (stats.mean_write_latency, stats.max_write_latency))
+
+
+@cocotb.test()
+def test_stream_frames(dut):
+    """ AXI4-Stream frames are reassembled from TLAST, TKEEP and TUSER """
+    cocotb.fork(Clock(dut.clk, 10).start())
+    master = AXI4StreamMaster(dut, "stream_in", dut.clk,
+                              valid_generator=repeat((2, 1)))
+    received = []
+    AXI4StreamMonitor(dut, "stream_out", dut.clk, ready_generator=repeat((1, 2)),
+                      callback=received.append)
+
+    # Every length of short last beat, with TUSER given per frame or per beat
+    frames = []
+    for length in range(1, 10):
+        data = bytes(bytearray(range(length, 2 * length)))
+        beats = (length + 3) // 4
+        user = length % 2 if length % 3 else [beat % 2 for beat in range(beats)]
+        frames.append((data, user))
+
+    for frame in frames:
+        yield master.send(frame)
+    for cycle in range(8):
+        yield RisingEdge(dut.clk)
+
+    if len(received) != len(frames):
+        raise TestFailure("Received %d of %d frames" % (len(received), len(frames)))
+    for (data, user), (got, got_user) in zip(frames, received):
+        beats = (len(data) + 3) // 4
+        if not isinstance(user, list):
+            user = [user] * beats
+        if bytearray(got) != bytearray(data):
+            raise TestFailure("Sent %r but received %r" % (data, got))
+        if list(got_user) != user:
+            raise TestFailure("Sent TUSER %s but received %s" % (user, got_user))
+
+
+@cocotb.test()
+def test_stream_words(dut):
+    """ AXI4-Stream frames of whole beats are sent and received as values """
+    cocotb.fork(Clock(dut.clk, 10).start())
+    master = AXI4StreamMaster(dut, "stream_in", dut.clk)
+    received = []
+    AXI4StreamMonitor(dut, "stream_out", dut.clk, ready_generator=repeat((3, 1)),
+                      as_array=True, callback=received.append)
+
+    words = [0x01234567, 0x89abcdef, 0xffffffff, 0]
+    yield master.send((words, 1))
+    yield master.send((words[:1], 0))
+    for cycle in range(8):
+        yield RisingEdge(dut.clk)
+
+    expected = [(words, [1] * 4), (words[:1], [0])]
+    if [(list(got), list(user)) for got, user in received] != expected:
+        raise TestFailure("Received %s" % received)
@@ -0,0 +1,82 @@
+"""
+Tests of the AXI4-Stream driver and monitor on the input of the Viterbi
+decoder, whose TREADY applies backpressure
+"""
+
+import random
+from itertools import repeat
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.drivers.amba import AXI4StreamMaster
+from cocotb.monitors.amba import AXI4StreamMonitor
+from cocotb.result import TestFailure
+from cocotb.triggers import RisingEdge
+
+
+@cocotb.coroutine
+def _reset(dut):
+    dut.aresetn <= 0
+    dut.m_axis_output_tready <= 1
+    for cycle in range(4):
+        yield RisingEdge(dut.aclk)
+    dut.aresetn <= 1
+    yield RisingEdge(dut.aclk)
+
+
+@cocotb.test()
+def test_input_frames(dut):
+    """ Frames sent to the decoder are reassembled from TLAST """
+    cocotb.fork(Clock(dut.aclk, 10).start())
+    ctrl = AXI4StreamMaster(dut, "s_axis_ctrl", dut.aclk)
+    master = AXI4StreamMaster(dut, "s_axis_input", dut.aclk,
+                              valid_generator=repeat((5, 1)))
+    received = []
+    AXI4StreamMonitor(dut, "s_axis_input", dut.aclk, reset_n=dut.aresetn,
+                      callback=received.append)
+
+    yield _reset(dut)
+
+    # Window length of 64 with an acquisition length of 32
+    yield ctrl.send([(64 << 16) | 32])
+
+    frames = [bytes(bytearray(random.randint(0, 255) for byte in range(4 * beats)))
+              for beats in (96, 64, 128)]
+    for frame in frames:
+        yield master.send(frame)
+    yield RisingEdge(dut.aclk)
+
+    if len(received) != len(frames):
+        raise TestFailure("Received %d of %d frames" % (len(received), len(frames)))
+    for index, (frame, got) in enumerate(zip(frames, received)):
+        if bytearray(got) != bytearray(frame):
+            raise TestFailure("Frame %d of %d bytes was received as %d different bytes" %
+                              (index, len(frame), len(got)))
+
+
+@cocotb.test()
+def test_input_words(dut):
+    """ Frames of beat values are sent from lists and NumPy arrays """
+    cocotb.fork(Clock(dut.aclk, 10).start())
+    ctrl = AXI4StreamMaster(dut, "s_axis_ctrl", dut.aclk)
+    master = AXI4StreamMaster(dut, "s_axis_input", dut.aclk)
+    received = []
+    AXI4StreamMonitor(dut, "s_axis_input", dut.aclk, reset_n=dut.aresetn,
+                      as_array=True, callback=received.append)
+
+    yield _reset(dut)
+    yield ctrl.send([(64 << 16) | 32])
+
+    words = [random.getrandbits(32) for beat in range(80)]
+    yield master.send(words)
+    try:
+        import numpy as np
+    except ImportError:
+        pass
+    else:
+        yield master.send(np.array(words[::-1], dtype=np.uint32))
+        words += words[::-1]
+    yield RisingEdge(dut.aclk)
+
+    if [int(word) for frame in received for word in frame] != words:
+        raise TestFailure("Sent %d words but received %s" % (len(words), received))
@@ -29,6 +29,7 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
 import logging
 import sys
 import textwrap
+from itertools import repeat
 
 """
 A set of tests that demonstrate cocotb functionality
@@ -43,7 +44,11 @@ from cocotb.clock import Clock
 from cocotb.result import ReturnValue, TestFailure, TestError, TestSuccess
 from cocotb.utils import get_sim_time
 
-from cocotb.binary import BinaryValue
+from cocotb.binary import BinaryValue, BinaryRepresentation
+from cocotb.drivers import Driver, BitDriver, ValidatedBusDriver
+from cocotb.memory import Memory
+from cocotb.stimulus import StimulusQueue
+from cocotb.handle import StructObject
 
 # Tests relating to providing meaningful errors if we forget to use the
 # yield keyword correctly to turn a function into a coroutine
@@ -667,9 +672,399 @@ def test_binary_value(dut):
     dut._log.info("vec[15:8] = 'b%s" % vec[15:8].binstr)
     dut._log.info("vec = 'b%s" % vec.binstr)
 
+    dut._log.info("Checking assignment pads values narrower than bits.")
+    vec = BinaryValue(value=45, bits=8, bigEndian=False,
+                      binaryRepresentation=BinaryRepresentation.SIGNED_MAGNITUDE)
+    vec[7] = 1
+    if vec.binstr != '01101101':
+        raise TestFailure("Set bit 7 of 45 but readback %s" % vec.binstr)
+    vec = BinaryValue(value=259, bits=7, bigEndian=False)
+    vec[3] = 1
+    if vec.binstr != '0000101':
+        raise TestFailure("Set bit 3 of 259 in 7 bits but readback %s" % vec.binstr)
+
+    for key in [16, slice(16, 0), slice(0, 7)]:
+        try:
+            vec = BinaryValue(value=0, bits=16, bigEndian=False)
+            vec[key] = 1
+        except IndexError:
+            pass
+        else:
+            raise TestFailure("Expecting IndexError assigning vec[%s]" % str(key))
+    try:
+        vec[3:0] = 16
+    except ValueError:
+        pass
+    else:
+        raise TestFailure("Expecting ValueError assigning 16 to vec[3:0]")
+
     yield Timer(100) #Make it do something with time
 
 
+@cocotb.test()
+def test_wide_vector_access(dut):
+    """
+    Wide values are written and read back as vectors, values containing
+    unresolved bits still go through the binary string
+    """
+    signal = dut.stream_in_data_wide
+
+    for value in [0x8000000000000000, 0xFFFFFFFFFFFFFFFF, 0x0123456789ABCDEF,
+                  BinaryValue(0xFEDCBA9876543210, len(signal), bigEndian=False)]:
+        signal.setimmediatevalue(value)
+        yield Timer(1)
+        if signal.value.integer != int(value):
+            raise TestFailure("Expecting 0x%x but got 0x%x on %s" % (
+                int(value), signal.value.integer, str(signal)))
+        if len(signal.value.binstr) != len(signal):
+            raise TestFailure("Read back %d bits from a %d bit signal" % (
+                len(signal.value.binstr), len(signal)))
+
+    binstr = "x" * 32 + "01" * 16
+    signal.setimmediatevalue(BinaryValue(binstr, len(signal)))
+    yield Timer(1)
+    if signal.value.binstr.lower() != binstr:
+        raise TestFailure("Expecting %s but got %s on %s" % (
+            binstr, signal.value.binstr, str(signal)))
+
+
+@cocotb.test()
+def test_value_cache(dut):
+    """
+    Repeated reads within a time step are served from the value cache until
+    a write is made
+    """
+    from cocotb.handle import value_cache
+
+    enabled = value_cache.enabled
+    value_cache.enabled = True
+    try:
+        dut.stream_in_data <= 0x5A
+        yield Timer(1)
+        yield ReadOnly()
+
+        hits = value_cache.hits
+        first = dut.stream_in_data.value
+        second = dut.stream_in_data.value
+        if value_cache.hits != hits + 1:
+            raise TestFailure("Expected %d cache hits but got %d" % (hits + 1, value_cache.hits))
+
+        # Each reader can modify its own value
+        first[0] = 1
+        first.integer = 0
+        if second is first or second.integer != 0x5A:
+            raise TestFailure("Modifying one cached read changed another to 0x%x" % second.integer)
+        if dut.stream_in_data.value.integer != 0x5A:
+            raise TestFailure("Modifying a cached read changed the cache")
+
+        yield Timer(1)
+        dut.stream_in_data.setimmediatevalue(0xA5)
+        if dut.stream_in_data.value.integer != 0xA5:
+            raise TestFailure("Read a stale value 0x%x after writing 0xA5" % (
+                dut.stream_in_data.value.integer))
+    finally:
+        value_cache.enabled = enabled
+
+
+@cocotb.test()
+def test_bus_capture(dut):
+    """Drive a bus and read all of its signals at once"""
+    from cocotb.bus import Bus
+
+    class _Txn(object):
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    bus = Bus(dut, "stream_in", ["valid", "data", "data_wide"])
+    bus.drive(_Txn(valid=1, data=0x58, data_wide=0x8000000000000001))
+    # Bit writes in the same time step are merged with the bus write
+    dut.stream_in_data[1] = 1
+    yield Timer(1)
+
+    capture = bus.capture()
+    if capture.valid != 1 or capture["data"] != 0x5A or capture.data_wide.integer != 0x8000000000000001:
+        raise TestFailure("Bus capture returned %r" % (capture))
+    if not isinstance(capture, dict) or sorted(capture) != ["data", "data_wide", "valid"]:
+        raise TestFailure("Bus capture isn't a dict of the signals: %r" % (capture))
+
+    txn = _Txn(valid=BinaryValue(), data=0, data_wide=0)
+    bus.sample(txn)
+    if txn.valid.integer != 1 or txn.data != 0x5A:
+        raise TestFailure("Bus sample returned valid=%s data=%s" % (txn.valid, txn.data))
+
+
+@cocotb.test()
+def test_bit_writes_coalesced(dut):
+    """Bit and slice writes to one vector are written together in ReadWrite"""
+    dut.stream_in_data <= 0
+    yield Timer(1)
+
+    dut.stream_in_data[0] = 1
+    dut.stream_in_data[3] = 1
+    dut.stream_in_data[7:4] = 0xA
+
+    pending = [hdl for hdl in cocotb.scheduler._writes if hdl is dut.stream_in_data]
+    if len(cocotb.scheduler._writes) != 1 or len(pending) != 1:
+        raise TestFailure("Expected a single pending write to stream_in_data but got %d" % (
+            len(cocotb.scheduler._writes)))
+
+    yield Timer(1)
+    if dut.stream_in_data.value.integer != 0xA9:
+        raise TestFailure("Expected 0xA9 but read 0x%x" % dut.stream_in_data.value.integer)
+
+    # A bit write after a whole vector write modifies the pending value
+    dut.stream_in_data <= 0x0F
+    dut.stream_in_data[7] = 1
+    yield Timer(1)
+    if dut.stream_in_data.value.integer != 0x8F:
+        raise TestFailure("Expected 0x8F but read 0x%x" % dut.stream_in_data.value.integer)
+
+    # Assigning to the handle of a bit is merged in the same way
+    dut.stream_in_data[0] <= 0
+    dut.stream_in_data[6] <= 1
+    if len(cocotb.scheduler._writes) != 1:
+        raise TestFailure("Expected a single pending write but got %d" % (
+            len(cocotb.scheduler._writes)))
+    yield Timer(1)
+    if dut.stream_in_data.value.integer != 0xCE:
+        raise TestFailure("Expected 0xCE but read 0x%x" % dut.stream_in_data.value.integer)
+
+    # Bits that aren't 0 or 1 are left as they are
+    if cocotb.LANGUAGE == "verilog":
+        dut.stream_in_data <= BinaryValue("zzzzxxxx")
+        yield Timer(1)
+        dut.stream_in_data[0] = 1
+        dut.stream_in_data[7] <= 0
+        yield Timer(1)
+        if dut.stream_in_data.value.binstr.lower() != "0zzzxxx1":
+            raise TestFailure("Expected 0zzzxxx1 but read %s" % dut.stream_in_data.value.binstr)
+
+
+class TimedDriver(Driver):
+    """Takes 10 time steps to send each transaction"""
+    def __init__(self):
+        Driver.__init__(self)
+        self.sent = []
+
+    @cocotb.coroutine
+    def _driver_send(self, transaction, sync=True):
+        yield Timer(10)
+        self.sent.append(transaction)
+
+
+@cocotb.test()
+def test_driver_stream(dut):
+    """Transactions are taken from a stream as the driver sends them"""
+    driver = TimedDriver()
+    pulled = []
+
+    def transactions():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+
+    done = driver.stream(transactions(), max_outstanding=2)
+    yield Timer(55)
+    if len(pulled) > len(driver.sent) + 2:
+        raise TestFailure("Took %d transactions from the stream but only sent %d" % (
+            len(pulled), len(driver.sent)))
+
+    yield done.wait()
+    if driver.sent != list(range(20)):
+        raise TestFailure("Stream sent %s" % driver.sent)
+    if driver.stats.sent_transactions != 20 or driver.stats.peak_occupancy > 2:
+        raise TestFailure("Unexpected statistics: sent %d, peak occupancy %d" % (
+            driver.stats.sent_transactions, driver.stats.peak_occupancy))
+
+    # With a queue depth appending blocks while the queue is too deep
+    driver.queue_depth = 2
+    for i in range(4):
+        waiter = driver.append(i)
+    yield waiter
+    if len(driver._sendQ) > 2:
+        raise TestFailure("Queue holds %d transactions" % len(driver._sendQ))
+    if not driver.stats.full_waits:
+        raise TestFailure("Appending never had to wait")
+
+    # Clearing the driver finishes the streams it drops
+    driver.queue_depth = None
+    first = driver.stream(iter(range(10)), max_outstanding=2)
+    second = driver.stream(iter(range(10)))
+    yield Timer(15)
+    driver.clear()
+    if not first.fired or not second.fired:
+        raise TestFailure("Clearing the driver left a stream unfinished")
+    driver.kill()
+
+
+@cocotb.test()
+def test_memory_model(dut):
+    """Sparse memory words, bursts and uninitialised reads"""
+    yield Timer(1)
+    mem = Memory(page_size=16)
+
+    # A burst which straddles pages
+    mem.write_words(12, [0x11223344, 0x55667788], 4)
+    if mem.read_words(12, 2, 4) != [0x11223344, 0x55667788]:
+        raise TestFailure("Burst read back %s" % mem.read_words(12, 2, 4))
+    if mem.allocated != 32:
+        raise TestFailure("Expected 2 pages to be allocated but got %d bytes" % mem.allocated)
+
+    # Only enabled byte lanes are written
+    mem.write_word(12, 0xAABBCCDD, 4, byteenable=0x5)
+    if mem.read_word(12, 4) != 0x11BB33DD:
+        raise TestFailure("Byte enables gave 0x%x" % mem.read_word(12, 4))
+
+    if mem.is_initialised(8, 8) or not mem.is_initialised(12, 8):
+        raise TestFailure("Wrong initialised state")
+    mem.read(0, 16)
+    if mem.uninitialised_reads != 1:
+        raise TestFailure("Expected 1 uninitialised read but counted %d" % mem.uninitialised_reads)
+
+
+
+@cocotb.test()
+def test_stimulus_queue(dut):
+    """A stimulus queue writes one value per rising edge, refilling as it runs low"""
+    cocotb.fork(Clock(dut.clk, 100).start())
+    queue = StimulusQueue(dut.clk, [dut.stream_in_data], low_water=8, chunk_size=16)
+    queue.feed(n % 256 for n in range(100))
+
+    seen = []
+    yield RisingEdge(dut.clk)
+    while len(seen) < 100:
+        yield FallingEdge(dut.clk)
+        seen.append(int(dut.stream_in_data))
+
+    yield queue.drained()
+    queue.close()
+
+    if seen != list(range(100)):
+        raise TestFailure("Stimulus queue wrote %s" % seen)
+
+
+@cocotb.test()
+def test_bit_driver_playback(dut):
+    """A BitDriver played back from a stimulus queue follows its generator"""
+    cocotb.fork(Clock(dut.clk, 100).start())
+    driver = BitDriver(dut.stream_in_valid, dut.clk, use_stimulus_queue=True)
+    driver.start(repeat((2, 1)))
+
+    seen = []
+    yield RisingEdge(dut.clk)
+    for i in range(12):
+        yield FallingEdge(dut.clk)
+        seen.append(int(dut.stream_in_valid))
+    driver.stop()
+
+    if sum(seen[:3]) != 2 or seen[3:] != seen[:-3]:
+        raise TestFailure("BitDriver drove %s for cycles of 2 on and 1 off" % seen)
+
+    # Nothing is driven once stopped
+    last = int(dut.stream_in_valid)
+    for i in range(4):
+        yield FallingEdge(dut.clk)
+        if int(dut.stream_in_valid) != last:
+            raise TestFailure("BitDriver kept driving after it was stopped")
+
+
+class StreamInDriver(ValidatedBusDriver):
+    _signals = ["valid", "data"]
+    _optional_signals = ["data_wide"]
+
+
+@cocotb.test()
+def test_driver_play(dut):
+    """Played back rows are driven with valid, leaving the gaps the valid generator asks for"""
+    cocotb.fork(Clock(dut.clk, 100).start())
+    dut.stream_in_valid <= 0
+    driver = StreamInDriver(dut, "stream_in", dut.clk, valid_generator=repeat((2, 1)))
+    yield RisingEdge(dut.clk)
+
+    seen = []
+
+    @cocotb.coroutine
+    def record():
+        while True:
+            yield FallingEdge(dut.clk)
+            valid = int(dut.stream_in_valid)
+            seen.append((valid, int(dut.stream_in_data) if valid else None))
+
+    recorder = cocotb.fork(record())
+    yield driver.play([(n,) for n in range(1, 9)], ["data"])
+    for i in range(2):
+        yield FallingEdge(dut.clk)
+    recorder.kill()
+
+    valids = "".join(str(valid) for valid, data in seen).strip("0")
+    if valids != "11011011011":
+        raise TestFailure("Valid was driven as %s" % valids)
+    data = [data for valid, data in seen if valid]
+    if data != list(range(1, 9)):
+        raise TestFailure("Played back %s" % data)
+    if int(dut.stream_in_valid):
+        raise TestFailure("Valid was left high after the last row")
+
+
+@cocotb.test()
+def test_driver_play_wide(dut):
+    """Rows are played back onto signals wider than 32 bits without truncation"""
+    cocotb.fork(Clock(dut.clk, 100).start())
+    dut.stream_in_valid <= 0
+    driver = StreamInDriver(dut, "stream_in", dut.clk)
+    yield RisingEdge(dut.clk)
+
+    values = [0x0123456789ABCDEF, 0xFFFFFFFFFFFFFFFF, 0x8000000000000001, -2]
+    seen = []
+
+    @cocotb.coroutine
+    def record():
+        while True:
+            yield FallingEdge(dut.clk)
+            if int(dut.stream_in_valid):
+                seen.append(int(dut.stream_in_data_wide))
+
+    recorder = cocotb.fork(record())
+    yield driver.play([(value,) for value in values], ["data_wide"])
+    yield FallingEdge(dut.clk)
+    recorder.kill()
+
+    expected = [value & 0xFFFFFFFFFFFFFFFF for value in values]
+    if seen != expected:
+        raise TestFailure("Played back %s, expected %s" % (
+            [hex(value) for value in seen], [hex(value) for value in expected]))
+
+
+@cocotb.test(skip=cocotb.LANGUAGE != "verilog" or cocotb.SIM_NAME in ["Icarus Verilog"])
+def test_packed_struct(dut):
+    """Read, write and split a packed struct in single VPI calls"""
+    yield Timer(10)
+
+    structure = dut.inout_if
+    if not isinstance(structure, StructObject):
+        raise TestFailure("%r isn't a StructObject" % structure)
+    if structure._native_width() != 2:
+        raise TestFailure("Expected %r to be accessed as a 2 bit vector" % structure)
+
+    dut.inout_if = {"a_in": 1, "b_out": 0}
+    yield Timer(10)
+
+    values = structure.get_packed()
+    if list(values.keys()) != ["a_in", "b_out"]:
+        raise TestFailure("Expected fields ['a_in', 'b_out'] but got %s" % list(values.keys()))
+    if values["a_in"] != 1 or values["b_out"] != 0:
+        raise TestFailure("Split %r into %s" % (structure, dict(values)))
+    if int(structure.a_in) != 1 or int(structure.b_out) != 0:
+        raise TestFailure("Fields of %r don't match the packed write" % structure)
+
+    # Fields which aren't given keep their value
+    structure.setimmediatevalue({"b_out": 1})
+    yield Timer(10)
+
+    values = structure.get_packed()
+    if values["a_in"] != 1 or values["b_out"] != 1:
+        raise TestFailure("Split %r into %s after writing b_out" % (structure, dict(values)))
+
 # This is essentially six.exec_
 if sys.version_info.major == 3:
     # this has to not be a syntax error in py2
@@ -27,6 +27,8 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE. '''
 
 import cocotb
 import logging
+import re
+import simulator
 from cocotb.triggers import Timer
 from cocotb.result import TestError, TestFailure
 from cocotb.handle import IntegerObject, ConstantObject, HierarchyObject
@@ -53,6 +55,117 @@ def discover_module_values(dut):
     if count < 2:
         raise TestFailure("Expected to discover things in the DUT")
 
+@cocotb.test()
+def find_by_pattern(dut):
+    """Find signals below the dut by glob and regular expression"""
+    yield Timer(0)
+
+    found = dut._find("stream_in_*", max_depth=1)
+    names = set(thing._name for thing in found)
+    if "stream_in_data" not in names or "stream_in_valid" not in names:
+        raise TestFailure("Expected to find stream_in signals but found %s" % sorted(names))
+    if any(not name.startswith("stream_in_") for name in names):
+        raise TestFailure("Found objects not matching the pattern: %s" % sorted(names))
+    if found[0] is not getattr(dut, found[0]._name):
+        raise TestFailure("Found handle differs from the one in the hierarchy")
+
+    again = dut._find("stream_in_*", max_depth=1)
+    if len(again) != len(found) or any(a is not b for a, b in zip(again, found)):
+        raise TestFailure("Repeated search returned different handles")
+
+    found = dut._find(re.compile(r"stream_out_data_\w+$"))
+    names = sorted(thing._name for thing in found)
+    if names != ["stream_out_data_comb", "stream_out_data_registered"]:
+        raise TestFailure("Regular expression search found %s" % names)
+
+    # Objects released by the search can still be looked up
+    dut.stream_out_ready <= 1
+    yield Timer(1)
+    if int(dut.stream_out_ready) != 1:
+        raise TestFailure("Signal visited by a search could not be written")
+
+    try:
+        dut._find("stream_in_*", max_depth=0)
+    except ValueError:
+        pass
+    else:
+        raise TestFailure("Searching to a depth of 0 should raise ValueError")
+
+@cocotb.test()
+def bounded_handle_cache(dut):
+    """Least recently used signal handles are dropped from the hierarchy"""
+    from cocotb.handle import handle_cache
+    yield Timer(0)
+
+    names = ["stream_in_valid", "stream_in_ready", "stream_out_ready", "stream_in_data"]
+    limit = handle_cache.limit
+    handle_cache.limit = 2
+    try:
+        for name in names:
+            dut._sub_handles.pop(name, None)
+
+        held = dut.stream_in_valid
+        evictions = handle_cache.evictions
+        for name in names[1:]:
+            getattr(dut, name)
+
+        if handle_cache.evictions != evictions + 2:
+            raise TestFailure("Expected 2 handles to be dropped but %d were" % (handle_cache.evictions - evictions))
+        if "stream_in_valid" in dut._sub_handles:
+            raise TestFailure("Least recently used handle was not dropped")
+
+        # A dropped handle which is still referenced remains usable
+        held <= 1
+        yield Timer(1)
+        if dut.stream_in_valid is not held:
+            raise TestFailure("Looking up a dropped handle in use gave a new object")
+        if int(dut.stream_in_valid) != 1:
+            raise TestFailure("Write through a dropped handle was lost")
+    finally:
+        handle_cache.limit = limit
+
+@cocotb.test()
+def lookup_misses_cached(dut):
+    """Names which can't be found are remembered until the handle cache drops handles"""
+    from cocotb.handle import handle_cache
+    yield Timer(0)
+
+    def _lookup_missing():
+        try:
+            dut.no_such_signal
+        except AttributeError:
+            pass
+        else:
+            raise TestFailure("Found a signal named no_such_signal")
+
+    _lookup_missing()
+    misses = simulator.get_lookup_misses()
+    if not misses:
+        raise TestFailure("A name which could not be found was not remembered")
+    _lookup_missing()
+    if simulator.get_lookup_misses() != misses:
+        raise TestFailure("Looking up a remembered miss again changed the count from %d to %d" %
+                          (misses, simulator.get_lookup_misses()))
+
+    names = ["stream_in_valid", "stream_in_ready", "stream_out_ready"]
+    limit = handle_cache.limit
+    handle_cache.limit = 2
+    try:
+        for name in names:
+            dut._sub_handles.pop(name, None)
+        for name in names:
+            getattr(dut, name)
+        if simulator.get_lookup_misses():
+            raise TestFailure("%d misses were remembered after handles were dropped" %
+                              simulator.get_lookup_misses())
+    finally:
+        handle_cache.limit = limit
+
+    _lookup_missing()
+    if simulator.get_lookup_misses() != 1:
+        raise TestFailure("Expected the miss to be remembered again but %d are" %
+                          simulator.get_lookup_misses())
+
 @cocotb.test(skip=True)
 def ipython_embed(dut):
     yield Timer(0)